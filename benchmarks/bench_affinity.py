@@ -0,0 +1,70 @@
+"""Benchmark model-affinity scheduling against a simulated Ollama node.
+
+The simulated node holds one model at a time and pays ``LOAD_TIME`` whenever a
+request targets a different model than the one resident. Requests for several
+models arrive interleaved; the benchmark compares sending them directly with
+sending them through ModelAffinityScheduler.
+
+Usage:
+    poetry run python benchmarks/bench_affinity.py
+"""
+import asyncio
+import time
+
+from simplemodelrouter.affinity import ModelAffinityScheduler
+from simplemodelrouter.base import LLMProvider, CompletionResponse
+
+LOAD_TIME = 0.05
+GENERATE_TIME = 0.005
+MODELS = ["llama2", "mistral", "codellama"]
+REQUESTS = 150
+
+class SimulatedNode(LLMProvider):
+    """Single-slot node that must swap models to serve a different one."""
+
+    def __init__(self):
+        super().__init__(api_key="", default_model=MODELS[0])
+        self.resident = None
+        self.loads = 0
+        self._lock = asyncio.Lock()
+
+    async def chat(self, messages, model=None, temperature=0.7, stream=False, **kwargs):
+        raise NotImplementedError
+
+    async def complete(self, prompt, model=None, temperature=0.7, stream=False, **kwargs):
+        async with self._lock:
+            if model != self.resident:
+                self.loads += 1
+                self.resident = model
+                await asyncio.sleep(LOAD_TIME)
+            await asyncio.sleep(GENERATE_TIME)
+        return CompletionResponse(text="ok", model=model, usage={})
+
+    async def close(self):
+        pass
+
+async def run(provider: LLMProvider) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        provider.complete("hi", model=MODELS[i % len(MODELS)]) for i in range(REQUESTS)
+    ))
+    return time.perf_counter() - start
+
+async def main():
+    direct = SimulatedNode()
+    elapsed = await run(direct)
+    print(f"direct:    {elapsed:.2f}s  {REQUESTS / elapsed:7.1f} req/s  loads={direct.loads}")
+
+    node = SimulatedNode()
+    scheduler = ModelAffinityScheduler(node, max_batch=32, max_wait=1.0)
+    elapsed = await run(scheduler)
+    stats = scheduler.stats()
+    print(
+        f"scheduled: {elapsed:.2f}s  {REQUESTS / elapsed:7.1f} req/s  loads={node.loads}  "
+        f"switches={stats['model_switches']}  "
+        f"mean_wait={stats['mean_queue_wait'] * 1000:.1f}ms  "
+        f"max_wait={stats['max_queue_wait'] * 1000:.1f}ms"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""Benchmark the installed JSON codecs on typical request and response shapes.
+
+Measures encoding a chat request body, decoding a non-streaming chat response
+and decoding a single streamed chunk, for every codec whose library is
+installed (stdlib json, orjson, msgspec).
+
+Usage:
+    poetry run python benchmarks/bench_codec.py
+"""
+import timeit
+
+from simplemodelrouter.codec import available_codecs, set_codec
+
+REQUEST = {
+    "model": "gpt-4o",
+    "messages": [
+        {"role": "system", "content": "You are a helpful assistant."},
+        *(
+            {"role": "user" if i % 2 else "assistant", "content": "Some conversation text. " * 40}
+            for i in range(20)
+        ),
+    ],
+    "temperature": 0.7,
+    "stream": False,
+}
+RESPONSE = (
+    b'{"id":"chatcmpl-1","object":"chat.completion","created":1700000000,"model":"gpt-4o",'
+    b'"choices":[{"index":0,"message":{"role":"assistant","content":"'
+    + b"A fairly long answer. " * 100
+    + b'"},"finish_reason":"stop"}],'
+    b'"usage":{"prompt_tokens":812,"completion_tokens":400,"total_tokens":1212}}'
+)
+CHUNK = (
+    '{"id":"chatcmpl-1","object":"chat.completion.chunk","created":1700000000,'
+    '"model":"gpt-4o","choices":[{"index":0,"delta":{"content":" token"},"finish_reason":null}]}'
+)
+
+def bench(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def main():
+    print(f"{'codec':8s} {'encode req':>12s} {'decode resp':>12s} {'decode chunk':>13s}")
+    for name in available_codecs():
+        codec = set_codec(name)
+        encode = bench(lambda: codec.encode(REQUEST), 2000)
+        decode = bench(lambda: codec.decode(RESPONSE), 2000)
+        chunk = bench(lambda: codec.decode(CHUNK), 50000)
+        print(f"{name:8s} {encode:9.2f} us {decode:9.2f} us {chunk:10.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark request body encoding for growing multi-turn histories.
+
+Simulates an agent loop of 200 turns. Each turn adds a user and an assistant
+message and builds the next request body, either by re-encoding the whole
+message list (the previous behaviour) or from a Conversation that encodes each
+message once.
+
+Usage:
+    poetry run python benchmarks/bench_conversation.py
+"""
+import json
+import time
+
+from simplemodelrouter.base import Message
+from simplemodelrouter.conversation import Conversation, encode_body
+
+TURNS = 200
+USER = "Please look at the following output and decide on the next step. " * 8
+ASSISTANT = "I will run the tests again with verbose logging enabled and compare. " * 12
+
+def full_reencode() -> float:
+    messages = []
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        messages.append(Message(role="user", content=USER))
+        payload = {
+            "model": "gpt-4o",
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "temperature": 0.7,
+            "stream": False,
+        }
+        json.dumps(payload).encode("utf-8")
+        messages.append(Message(role="assistant", content=ASSISTANT))
+    return time.perf_counter() - start
+
+def conversation() -> float:
+    history = Conversation()
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        history.add("user", USER)
+        encode_body({
+            "model": "gpt-4o",
+            "messages": history,
+            "temperature": 0.7,
+            "stream": False,
+        })
+        history.add("assistant", ASSISTANT)
+    return time.perf_counter() - start
+
+def main():
+    for name, run in (("full re-encode", full_reencode), ("conversation", conversation)):
+        best = min(run() for _ in range(5))
+        print(f"{name:15s} {best * 1000:8.2f} ms for {TURNS} turns "
+              f"({best / TURNS * 1e6:7.1f} us/turn)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark incremental JSON parsing of a streamed structured reply.
+
+Compares JSONStreamParser against re-parsing the accumulated buffer after
+every delta, which is the simplest way to get early results but is quadratic
+in the reply length. The reply is a JSON array of objects fed in small
+token-sized deltas.
+
+Usage:
+    poetry run python benchmarks/bench_jsonstream.py
+"""
+import json
+import time
+
+from simplemodelrouter.jsonstream import JSONStreamParser
+
+def make_deltas(items: int, size: int = 4):
+    text = json.dumps([
+        {"id": i, "title": f"Result number {i}", "tags": ["alpha", "beta"], "score": i / 7}
+        for i in range(items)
+    ])
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def incremental(deltas) -> int:
+    parser = JSONStreamParser()
+    return sum(e.kind == "item" for d in deltas for e in parser.feed(d))
+
+def reparse(deltas) -> int:
+    buffer = ""
+    for delta in deltas:
+        buffer += delta
+        try:
+            json.loads(buffer)
+        except ValueError:
+            pass
+    return 1
+
+def timed(func, deltas) -> float:
+    start = time.perf_counter()
+    func(deltas)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    print(f"{'items':>6s} {'deltas':>7s} {'incremental':>12s} {'re-parse':>10s}")
+    for items in (50, 200, 400):
+        deltas = make_deltas(items)
+        print(
+            f"{items:6d} {len(deltas):7d} {timed(incremental, deltas):9.1f} ms"
+            f" {timed(reparse, deltas):7.1f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
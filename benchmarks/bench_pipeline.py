@@ -0,0 +1,75 @@
+"""Benchmark streamed post-processing against re-scanning an accumulated buffer.
+
+Streams a long response in small chunks through a stop sequence check, a
+secret redaction and a profanity filter. The naive version appends each chunk
+to a buffer and re-applies every check to the whole buffer, releasing all but
+the last few characters; its cost grows with the square of the response
+length. The pipeline keeps its matcher state across chunks and only looks at
+each character once.
+
+Usage:
+    poetry run python benchmarks/bench_pipeline.py
+"""
+import re
+import time
+
+from simplemodelrouter.pipeline import ProfanityStage, RedactStage, StopStage, StreamPipeline
+
+STOP = ["\n\nUser:", "<|end|>"]
+SECRETS = ["sk-live-0123456789abcdef", "ghp_0123456789abcdefghij"]
+WORDS = ["darn", "heck", "frick", "dang"]
+SENTENCE = "The quick brown fox jumps over the lazy dog while the build runs. "
+CHUNK = 4
+
+def chunks(length: int):
+    text = (SENTENCE * (length // len(SENTENCE) + 1))[:length]
+    return [text[i:i + CHUNK] for i in range(0, length, CHUNK)]
+
+def naive(stream) -> str:
+    words = re.compile(r"\b(%s)\b" % "|".join(WORDS), re.IGNORECASE)
+    hold = max(map(len, STOP + SECRETS + WORDS))
+    buffer, text, released = "", "", 0
+    output = []
+    for chunk in stream:
+        buffer += chunk
+        text = buffer
+        stop = min((i for i in (text.find(s) for s in STOP) if i >= 0), default=-1)
+        if stop >= 0:
+            text = text[:stop]
+        for secret in SECRETS:
+            text = text.replace(secret, "[REDACTED]")
+        text = words.sub(lambda m: "*" * len(m.group()), text)
+        end = len(text) if stop >= 0 else max(len(text) - hold, released)
+        output.append(text[released:end])
+        released = end
+        if stop >= 0:
+            return "".join(output)
+    output.append(text[released:])
+    return "".join(output)
+
+def pipeline(stream) -> str:
+    stages = [stage.fork() for stage in PIPELINE.stages]
+    output = []
+    for chunk in stream:
+        text, stopped = PIPELINE._feed(stages, chunk)
+        output.append(text)
+        if stopped:
+            return "".join(output)
+    output.append(PIPELINE._flush(stages))
+    return "".join(output)
+
+PIPELINE = StreamPipeline([StopStage(STOP), RedactStage(SECRETS), ProfanityStage(WORDS)])
+
+def main():
+    print(f"{'characters':>10s} {'naive':>12s} {'pipeline':>12s}")
+    for length in (2_000, 8_000, 32_000):
+        stream = chunks(length)
+        timings = []
+        for run in (naive, pipeline):
+            start = time.perf_counter()
+            run(stream)
+            timings.append(time.perf_counter() - start)
+        print(f"{length:10d} {timings[0] * 1e3:9.1f} ms {timings[1] * 1e3:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
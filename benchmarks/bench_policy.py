@@ -0,0 +1,30 @@
+"""Benchmark the per-request cost of model selection.
+
+Usage:
+    poetry run python benchmarks/bench_policy.py
+"""
+import timeit
+
+from simplemodelrouter.base import Message
+from simplemodelrouter.policy import ModelInfo, ModelRegistry, PolicyEngine
+
+def main():
+    for size in (3, 20, 100):
+        registry = ModelRegistry(
+            ModelInfo(f"model-{i}", "openai", 0.1 * i, 0.3 * i, 8192 * (1 + i % 4),
+                      frozenset({"tools"}) if i % 2 else frozenset())
+            for i in range(size)
+        )
+        engine = PolicyEngine(registry, latency_slo=1.0)
+        for i in range(0, size, 3):
+            engine.observe(f"model-{i}", 0.5 + (i % 5) * 0.3)
+
+        messages = [Message(role="user", content="Summarize this. " * 50)] * 4
+        number = 20000
+        seconds = timeit.timeit(
+            lambda: engine.choose(messages, capabilities=["tools"]), number=number
+        )
+        print(f"{size:4d} models: {seconds / number * 1e6:7.2f} us/selection")
+
+if __name__ == "__main__":
+    main()
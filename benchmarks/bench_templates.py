@@ -0,0 +1,55 @@
+"""Benchmark building templated requests and their cache keys.
+
+Each request has a long static system prompt, a few-shot example and a short
+user message filled in from three values. The baseline formats the messages
+with ``str.format``, encodes the whole body and hashes it to get a cache key.
+The template renders into a Conversation that reuses the static encodings and
+derives the cache key from a precomputed hash of the template.
+
+Usage:
+    poetry run python benchmarks/bench_templates.py
+"""
+import hashlib
+import time
+
+from simplemodelrouter.base import Message
+from simplemodelrouter.conversation import Conversation, encode_body
+from simplemodelrouter.templates import PromptTemplate
+
+REQUESTS = 20000
+SYSTEM = "You are a careful assistant that classifies support tickets. " * 60
+EXAMPLE = "Ticket: The app crashes on start.\nCategory: bug"
+USER = "Ticket #{ticket} from {customer}: {body}\nCategory:"
+
+def values(i: int) -> dict:
+    return {"ticket": i, "customer": f"customer-{i % 100}", "body": "I cannot log in since the update."}
+
+def baseline() -> float:
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        messages = [
+            Message(role="system", content=SYSTEM),
+            Message(role="user", content=EXAMPLE),
+            Message(role="user", content=USER.format(**values(i))),
+        ]
+        body = encode_body({"model": "gpt-4o", "messages": Conversation(messages), "temperature": 0.0})
+        hashlib.sha256(body).hexdigest()
+    return time.perf_counter() - start
+
+def template() -> float:
+    prompt = PromptTemplate([("system", SYSTEM), ("user", EXAMPLE), ("user", USER)])
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        v = values(i)
+        encode_body({"model": "gpt-4o", "messages": prompt.render(**v), "temperature": 0.0})
+        prompt.cache_key(**v)
+    return time.perf_counter() - start
+
+def main():
+    for name, run in (("format + hash", baseline), ("template", template)):
+        best = min(run() for _ in range(3))
+        print(f"{name:15s} {best * 1000:8.1f} ms for {REQUESTS} requests "
+              f"({best / REQUESTS * 1e6:6.2f} us/request)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark construction cost and memory of streamed response chunks.
+
+Compares the slotted response types with the previous plain dataclasses and,
+when pydantic is installed, the pydantic models that ``types.py`` used to
+define. Each chunk is a ChatResponse wrapping a Message, as yielded for every
+streamed token. Memory is measured with tracemalloc over 100,000 retained
+chunks whose strings are allocated beforehand, so only the objects count.
+
+Usage:
+    poetry run python benchmarks/bench_types.py
+"""
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict
+
+from simplemodelrouter.types import ChatResponse, Message
+
+CHUNKS = 100_000
+
+@dataclass
+class PlainMessage:
+    role: str
+    content: str
+
+@dataclass
+class PlainChatResponse:
+    message: PlainMessage
+    model: str
+    usage: Dict[str, int]
+
+def variants():
+    yield "slots dataclass", Message, ChatResponse
+    yield "plain dataclass", PlainMessage, PlainChatResponse
+    try:
+        from pydantic import BaseModel
+    except ImportError:
+        return
+
+    class PydanticMessage(BaseModel):
+        role: str
+        content: str
+
+    class PydanticChatResponse(BaseModel):
+        message: PydanticMessage
+        model: str
+        usage: Dict[str, int]
+
+    yield "pydantic", PydanticMessage, PydanticChatResponse
+
+def main():
+    tokens = [f"tok{i}" for i in range(CHUNKS)]
+    print(f"{'type':16s} {'construct':>12s} {'memory':>14s}")
+    for name, message, response in variants():
+        def make(content: str = "tok"):
+            return response(message=message(role="assistant", content=content), model="gpt-4o", usage={})
+
+        per_chunk = min(timeit.repeat(make, number=20_000, repeat=5)) / 20_000
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        chunks = [make(token) for token in tokens]
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del chunks
+
+        print(f"{name:16s} {per_chunk * 1e9:9.0f} ns {(after - before) / CHUNKS:8.0f} B/chunk")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark short streamed requests over loopback TCP versus a Unix domain socket.
+
+Starts a minimal local HTTP/1.1 server answering every request with a short
+chunked NDJSON stream, in the format of Ollama's /api/chat, listening on both
+127.0.0.1 and a Unix domain socket. OllamaProvider then sends the same
+streamed chat requests over each, sequentially and with concurrency, and
+reports the latency per request and the throughput.
+
+Usage:
+    poetry run python benchmarks/bench_uds.py
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from simplemodelrouter import OllamaProvider, Message
+
+REQUESTS = 2000
+CONCURRENCY = 16
+TOKENS = 16
+
+CHUNKS = b"".join(
+    b"%x\r\n%s\r\n" % (len(line), line)
+    for line in [
+        *(b'{"message": {"role": "assistant", "content": "tok "}, "done": false}\n' for _ in range(TOKENS)),
+        b'{"message": {"role": "assistant", "content": ""}, "done": true}\n',
+    ]
+) + b"0\r\n\r\n"
+HEAD = b"HTTP/1.1 200 OK\r\ncontent-type: application/x-ndjson\r\ntransfer-encoding: chunked\r\n\r\n"
+
+async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            for line in head.lower().split(b"\r\n"):
+                if line.startswith(b"content-length:"):
+                    await reader.readexactly(int(line.split(b":")[1]))
+            writer.write(HEAD + CHUNKS)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def run(provider: OllamaProvider, concurrency: int) -> tuple:
+    messages = [Message(role="user", content="Hi")]
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            async for _ in await provider.chat(messages, stream=True):
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(50)))  # warm up the pool
+    latencies.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    return statistics.median(latencies) * 1e3, REQUESTS / elapsed
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sock")
+        tcp = await asyncio.start_server(serve, "127.0.0.1", 0)
+        uds = await asyncio.start_unix_server(serve, path)
+        port = tcp.sockets[0].getsockname()[1]
+
+        providers = {
+            "tcp": OllamaProvider(base_url=f"http://127.0.0.1:{port}"),
+            "uds": OllamaProvider(uds=path),
+        }
+        print(f"{REQUESTS} streamed requests of {TOKENS} tokens")
+        print(f"{'transport':10s} {'concurrency':>11s} {'p50':>10s} {'throughput':>14s}")
+        for concurrency in (1, CONCURRENCY):
+            for name, provider in providers.items():
+                p50, throughput = await run(provider, concurrency)
+                print(f"{name:10s} {concurrency:11d} {p50:7.3f} ms {throughput:9.0f} req/s")
+
+        for provider in providers.values():
+            await provider.close()
+        tcp.close()
+        uds.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,35 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
 from .base import LLMProvider, Message, ChatResponse, CompletionResponse
-from .providers.openai import OpenAIProvider
-from .providers.anthropic import AnthropicProvider
-from .providers.ollama import OllamaProvider
+from .types import NormalizedRequest
+from .registry import available_providers, create_provider, get_provider, register_provider
+
+if TYPE_CHECKING:
+    from .providers.openai import OpenAIProvider
+    from .providers.anthropic import AnthropicProvider
+    from .providers.ollama import OllamaProvider
+    from .router import Router
+
+# Imported on first attribute access so that `import simplemodelrouter` does not
+# pay for httpx or providers that are never used.
+_LAZY_ATTRIBUTES = {
+    "OpenAIProvider": ".providers.openai",
+    "AnthropicProvider": ".providers.anthropic",
+    "OllamaProvider": ".providers.ollama",
+    "Router": ".router",
+}
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 __version__ = "0.1.0"
 __all__ = [
@@ -12,5 +40,10 @@ __all__ = [
     "OpenAIProvider",
     "AnthropicProvider",
     "OllamaProvider",
-    "NormalizedRequest"
+    "Router",
+    "NormalizedRequest",
+    "available_providers",
+    "create_provider",
+    "get_provider",
+    "register_provider"
 ]
@@ -0,0 +1,175 @@
+import asyncio
+from abc import abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+from .base import LLMProvider
+from .deadline import Deadline
+
+T = TypeVar("T")
+
+class AdmissionSlot:
+    """A request's hold on one of an AdmissionProvider's slots."""
+
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+
+    def responded(self) -> None:
+        """Called when the response, or the first chunk of a stream, arrives."""
+        pass
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        """Return the slot once the request is done.
+
+        Args:
+            error: Exception that ended the request, if any
+        """
+        self._release()
+
+class SlotStream(Generic[T]):
+    """Stream holding an admission slot until it is exhausted, fails or is closed.
+
+    The slot is released exactly once, including when the stream is closed or
+    dropped before it was ever iterated.
+    """
+
+    def __init__(self, stream: AsyncIterator[T], slot: AdmissionSlot):
+        """Initialize the stream.
+
+        Args:
+            stream: Provider stream to yield from
+            slot: Slot to release once the stream is done
+        """
+        self._stream = stream
+        self._slot: Optional[AdmissionSlot] = slot
+
+    def __aiter__(self) -> "SlotStream[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        if self._slot is None:
+            raise StopAsyncIteration
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._release()
+            raise
+        except BaseException as e:
+            self._release(e)
+            raise
+        self._slot.responded()
+        return chunk
+
+    async def aclose(self) -> None:
+        """Close the provider stream and release the slot."""
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+    def _release(self, error: Optional[BaseException] = None) -> None:
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            slot.release(error)
+
+    def __del__(self) -> None:
+        self._release()
+
+class AdmissionProvider(LLMProvider):
+    """Provider wrapper admitting requests through a queue of waiters.
+
+    Subclasses implement the admission policy: how a waiting request is
+    queued, how one that gave up is removed, and which waiters are granted a
+    slot whenever ``_dispatch`` runs. This class handles waiting with a
+    timeout or deadline, giving a slot back when it is granted just as the
+    request gives up, and holding the slot until the response or stream is
+    done.
+    """
+
+    def __init__(self, provider: LLMProvider):
+        """Initialize the wrapper.
+
+        Args:
+            provider: Provider to admit requests to
+        """
+        super().__init__(provider.api_key, provider.base_url, provider.default_model)
+        self.provider = provider
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently admitted to the provider."""
+        return self._in_flight
+
+    @abstractmethod
+    def _enqueue(self, key: Hashable, waiter: asyncio.Future) -> None:
+        """Queue a waiter for the request described by ``key``."""
+        pass
+
+    def _discard(self, key: Hashable, waiter: asyncio.Future) -> None:
+        """Remove a cancelled waiter; by default ``_dispatch`` skips it when it comes up."""
+        pass
+
+    @abstractmethod
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters with ``_grant`` while the policy allows."""
+        pass
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        """Admit a waiter."""
+        self._in_flight += 1
+        waiter.set_result(None)
+
+    def _release(self) -> None:
+        """Return a slot and admit waiting requests."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _slot(self) -> AdmissionSlot:
+        """Return the slot of a request that has just been admitted."""
+        return AdmissionSlot(self._release)
+
+    async def _acquire(self, key: Hashable = None, timeout: Optional[float] = None) -> AdmissionSlot:
+        """Wait until the policy admits a request.
+
+        Raises:
+            asyncio.TimeoutError: If no slot is granted within ``timeout`` seconds
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._enqueue(key, waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # granted a slot just as we gave up
+            else:
+                waiter.cancel()
+                self._discard(key, waiter)
+            raise
+        return self._slot()
+
+    async def _run(
+        self,
+        key: Hashable,
+        stream: bool,
+        deadline: Optional[Deadline],
+        call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run a provider call once it is admitted, holding its slot until it is done."""
+        acquire = self._acquire(key)
+        slot = await (acquire if deadline is None else deadline.wait(acquire))
+        try:
+            result = await call()
+        except BaseException as e:
+            slot.release(e)
+            raise
+
+        if stream:
+            return SlotStream(result, slot)
+        slot.responded()
+        slot.release()
+        return result
+
+    async def close(self) -> None:
+        """Close the underlying provider."""
+        await self.provider.close()
@@ -0,0 +1,160 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple, Union
+
+from .admission import AdmissionProvider
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .conversation import Conversation
+from .deadline import Deadline, DeadlineLike
+
+class ModelAffinityScheduler(AdmissionProvider):
+    """Schedule requests to a single node in model-grouped runs.
+
+    Requests are queued per model. The scheduler keeps serving the active model
+    until its queue is empty or ``max_batch`` requests have been served in the
+    current run, then switches to the model with the oldest waiting request. A
+    request that has waited longer than ``max_wait`` forces a switch, which
+    bounds the wait any model can see. The node only switches model once its
+    in-flight requests for the previous model have finished.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = 1,
+        max_batch: int = 16,
+        max_wait: float = 2.0
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            provider: Provider node to schedule requests for
+            max_concurrency: Maximum in-flight requests on the node
+            max_batch: Maximum requests served per model run while others wait
+            max_wait: Seconds a request may wait before forcing a model switch
+        """
+        super().__init__(provider)
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queues: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {}
+        self._active_model: Optional[str] = None
+        self._run_length = 0
+
+        self.requests = 0
+        self.model_switches = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return model-switch and queue-wait statistics."""
+        return {
+            "requests": self.requests,
+            "model_switches": self.model_switches,
+            "queued": sum(len(q) for q in self._queues.values()),
+            "total_queue_wait": self.total_queue_wait,
+            "mean_queue_wait": self.total_queue_wait / self.requests if self.requests else 0.0,
+            "max_queue_wait": self.max_queue_wait,
+        }
+
+    def _enqueue(self, model: str, waiter: asyncio.Future) -> None:
+        """Queue a waiter behind the other requests for its model."""
+        self._queues.setdefault(model, deque()).append((asyncio.get_running_loop().time(), waiter))
+
+    def _discard(self, model: str, waiter: asyncio.Future) -> None:
+        """Remove a cancelled request from its queue."""
+        queue = self._queues.get(model)
+        if queue is None:
+            return
+        for entry in queue:
+            if entry[1] is waiter:
+                queue.remove(entry)
+                break
+        if not queue:
+            del self._queues[model]
+        self._dispatch()
+
+    def _next_model(self) -> Optional[str]:
+        """Return the model whose next request should be granted, if any."""
+        if not self._queues:
+            return None
+
+        now = asyncio.get_running_loop().time()
+        active = self._active_model
+        if active in self._queues:
+            others = [m for m in self._queues if m != active]
+            if not others:
+                return active
+            target = min(others, key=lambda m: self._queues[m][0][0])
+            starved = now - self._queues[target][0][0] >= self.max_wait
+            if not starved and self._run_length < self.max_batch:
+                return active
+        else:
+            target = min(self._queues, key=lambda m: self._queues[m][0][0])
+
+        # Let the previous model's in-flight requests drain before switching
+        if self._in_flight > 0:
+            return None
+        return target
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued requests according to the affinity policy."""
+        while self._in_flight < self.max_concurrency:
+            model = self._next_model()
+            if model is None:
+                return
+
+            queue = self._queues[model]
+            enqueued_at, future = queue.popleft()
+            if not queue:
+                del self._queues[model]
+
+            if model != self._active_model:
+                if self._active_model is not None:
+                    self.model_switches += 1
+                self._active_model = model
+                self._run_length = 0
+
+            wait = asyncio.get_running_loop().time() - enqueued_at
+            self.requests += 1
+            self.total_queue_wait += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+
+            self._run_length += 1
+            self._grant(future)
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        deadline: DeadlineLike = None,
+        **kwargs
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        """Queue a chat request and send it when its model is scheduled."""
+        deadline = Deadline.coerce(deadline)
+        key = model or self.provider.default_model
+        return await self._run(key, stream, deadline, lambda: self.provider.chat(
+            messages, model=model, temperature=temperature, stream=stream,
+            deadline=deadline, **kwargs
+        ))
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        deadline: DeadlineLike = None,
+        **kwargs
+    ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
+        """Queue a completion request and send it when its model is scheduled."""
+        deadline = Deadline.coerce(deadline)
+        key = model or self.provider.default_model
+        return await self._run(key, stream, deadline, lambda: self.provider.complete(
+            prompt, model=model, temperature=temperature, stream=stream,
+            deadline=deadline, **kwargs
+        ))
+
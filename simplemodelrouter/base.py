@@ -1,26 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Dict, List, Optional, Union
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Union
 
-@dataclass
-class Message:
-    """Represents a chat message."""
-    role: str
-    content: str
+from .types import ChatResponse, CompletionResponse, Message
 
-@dataclass
-class CompletionResponse:
-    """Represents a completion response from an LLM."""
-    text: str
-    model: str
-    usage: Dict[str, int]
-
-@dataclass
-class ChatResponse:
-    """Represents a chat response from an LLM."""
-    message: Message
-    model: str
-    usage: Dict[str, int]
+if TYPE_CHECKING:
+    from .conversation import Conversation
+    from .deadline import DeadlineLike
+    from .jsonstream import JSONEvent
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
@@ -42,22 +28,32 @@ class LLMProvider(ABC):
         self.base_url = base_url
         self.default_model = default_model
 
+    @property
+    def name(self) -> str:
+        """Short provider name used in reports, e.g. "openai" for OpenAIProvider."""
+        name = type(self).__name__
+        return (name[:-len("Provider")] if name.endswith("Provider") else name).lower()
+
     @abstractmethod
     async def chat(
         self,
-        messages: List[Message],
+        messages: Union[List[Message], "Conversation"],
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: "DeadlineLike" = None,
         **kwargs
     ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
         """Send a chat request to the LLM.
         
         Args:
-            messages: List of messages in the conversation
+            messages: List of messages in the conversation, or a Conversation
+                with pre-encoded history
             model: Optional model override
             temperature: Sampling temperature
             stream: Whether to stream the response
+            deadline: Optional per-call deadline, as seconds or a Deadline with
+                separate connect, first-token and idle timeouts
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -72,6 +68,7 @@ class LLMProvider(ABC):
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: "DeadlineLike" = None,
         **kwargs
     ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
         """Send a completion request to the LLM.
@@ -81,6 +78,8 @@ class LLMProvider(ABC):
             model: Optional model override
             temperature: Sampling temperature
             stream: Whether to stream the response
+            deadline: Optional per-call deadline, as seconds or a Deadline with
+                separate connect, first-token and idle timeouts
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -88,6 +87,36 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def stream_json(
+        self,
+        messages: Union[List[Message], "Conversation"],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator["JSONEvent"]:
+        """Stream a chat reply that is a JSON document, parsing it incrementally.
+
+        Array elements are yielded as soon as they are closed, along with
+        partial snapshots of the document, instead of waiting for the whole
+        reply. Ask for JSON output in the prompt or with provider parameters
+        such as OpenAI's ``response_format``.
+
+        Args:
+            messages: List of messages in the conversation, or a Conversation
+            model: Optional model override
+            temperature: Sampling temperature
+            **kwargs: Additional parameters passed to ``chat``
+
+        Returns:
+            AsyncIterator[JSONEvent] of completed items, partial snapshots and
+            the finished document
+        """
+        from .jsonstream import parse_stream
+
+        stream = await self.chat(messages, model=model, temperature=temperature, stream=True, **kwargs)
+        async for event in parse_stream(stream):
+            yield event
+
     @abstractmethod
     async def close(self) -> None:
         """Close any open connections."""
@@ -0,0 +1,258 @@
+"""Resumable bulk runner for JSONL request files.
+
+Each input line is a JSON object with an ``id`` and either ``messages`` (a
+list of ``{"role", "content"}`` objects) for a chat request or ``prompt`` for
+a completion. Optional ``model`` and ``temperature`` fields and a ``params``
+object of provider-specific parameters are passed through. Lines without an
+id are identified by their line number, as are lines that are not valid JSON
+objects, which are reported as errors without stopping the run.
+
+Each result is appended to the output file as soon as it arrives, as
+``{"id", "response"}`` or ``{"id", "error"}``. The ids of successful requests
+are then appended to a checkpoint file, and a rerun skips them. Failed
+requests are not checkpointed, so a rerun retries them. A crash between
+writing a result and checkpointing it can duplicate that one result.
+
+Usage:
+    python -m simplemodelrouter.batch requests.jsonl results.jsonl --provider openai --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+from .base import LLMProvider, Message
+from .codec import get_codec
+from .registry import available_providers, create_provider
+
+@dataclass
+class BatchStats:
+    """Progress of a batch run."""
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Requests finished per second in this run."""
+        elapsed = self.elapsed
+        return (self.completed + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds until every remaining request has been sent."""
+        remaining = self.total - self.skipped - self.completed - self.failed
+        throughput = self.throughput
+        return remaining / throughput if throughput > 0 else None
+
+    def summary(self) -> str:
+        done = self.skipped + self.completed + self.failed
+        eta = "?" if self.eta is None else f"{self.eta:.0f}s"
+        return (
+            f"{done}/{self.total} done ({self.completed} ok, {self.failed} failed, "
+            f"{self.skipped} resumed) {self.throughput:.1f} req/s, ETA {eta}"
+        )
+
+def count_lines(path: str, block_size: int = 1 << 20) -> int:
+    """Count the non-blank lines in a file, the records a run will read, without loading it whole."""
+    with open(path, "rb", buffering=block_size) as f:
+        return sum(1 for line in f if not line.isspace())
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Read the ids recorded in a checkpoint file."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+class BatchRunner:
+    """Send every request of a JSONL file through a provider with bounded concurrency."""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        concurrency: int = 16,
+        progress_interval: float = 5.0,
+        on_progress: Optional[Callable[[BatchStats], None]] = None
+    ):
+        """Initialize the runner.
+
+        Args:
+            provider: Provider requests are sent to
+            concurrency: Maximum requests in flight
+            progress_interval: Seconds between progress reports
+            on_progress: Called with the current stats every ``progress_interval``
+                and once at the end
+        """
+        self.provider = provider
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+
+    def _read(
+        self,
+        path: str,
+        done: Set[str],
+        stats: BatchStats
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield the pending records of the input file one line at a time.
+
+        Yields:
+            ``(id, record, None)`` for each record, or ``(line number, None, error)``
+            for a line that is not a JSON object
+        """
+        decode = get_codec().decode
+        with open(path, "rb") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = decode(line)
+                except Exception as e:  # each codec raises its own decode error
+                    yield str(number), None, f"{type(e).__name__}: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield str(number), None, f"TypeError: record must be an object, not {type(record).__name__}"
+                    continue
+                request_id = str(record.get("id", number))
+                if request_id in done:
+                    stats.skipped += 1
+                    continue
+                yield request_id, record, None
+
+    async def _send(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one record and return its response as a dict."""
+        params = dict(record.get("params") or {})
+        for key in ("model", "temperature"):
+            if key in record:
+                params[key] = record[key]
+
+        if "messages" in record:
+            messages = [Message.from_dict(m) for m in record["messages"]]
+            response = await self.provider.chat(messages, **params)
+        elif "prompt" in record:
+            response = await self.provider.complete(record["prompt"], **params)
+        else:
+            raise ValueError("Record has neither 'messages' nor 'prompt'")
+        return response.to_dict()
+
+    async def run(
+        self,
+        input_path: str,
+        output_path: str,
+        checkpoint_path: Optional[str] = None
+    ) -> BatchStats:
+        """Process the input file, resuming from the checkpoint if there is one.
+
+        Args:
+            input_path: JSONL file of requests
+            output_path: JSONL file results are appended to
+            checkpoint_path: File completed ids are appended to, defaults to
+                the output path with a ``.done`` suffix
+
+        Returns:
+            Final statistics of the run
+        """
+        checkpoint_path = checkpoint_path or output_path + ".done"
+        stats = BatchStats(total=count_lines(input_path))
+        done = load_checkpoint(checkpoint_path)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        encode = get_codec().encode
+
+        with open(output_path, "ab") as output, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            def write(result: Dict[str, Any]) -> None:
+                output.write(encode(result) + b"\n")
+                output.flush()
+
+            async def worker() -> None:
+                while (item := await queue.get()) is not None:
+                    request_id, record, error = item
+                    if error is None:
+                        try:
+                            response = await self._send(record)
+                        except Exception as e:
+                            error = f"{type(e).__name__}: {e}"
+                    if error is not None:
+                        stats.failed += 1
+                        write({"id": request_id, "error": error})
+                        continue
+                    write({"id": request_id, "response": response})
+                    checkpoint.write(request_id + "\n")
+                    checkpoint.flush()
+                    stats.completed += 1
+
+            async def produce() -> None:
+                for item in self._read(input_path, done, stats):
+                    await queue.put(item)
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+            tasks = [asyncio.create_task(produce())]
+            tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            reporter = asyncio.create_task(self._report(stats))
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in (*tasks, reporter):
+                    task.cancel()
+                await asyncio.gather(*tasks, reporter, return_exceptions=True)
+
+        if self.on_progress:
+            self.on_progress(stats)
+        return stats
+
+    async def _report(self, stats: BatchStats) -> None:
+        while self.on_progress:
+            await asyncio.sleep(self.progress_interval)
+            self.on_progress(stats)
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m simplemodelrouter.batch",
+        description="Send the requests of a JSONL file through a provider, resumably."
+    )
+    parser.add_argument("input", help="JSONL file of requests")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--provider", default="openai", help=f"one of {', '.join(available_providers())}")
+    parser.add_argument("--model", help="default model for records that do not set one")
+    parser.add_argument("--api-key", help="API key, defaults to $<PROVIDER>_API_KEY")
+    parser.add_argument("--base-url", help="API base URL override")
+    parser.add_argument("--concurrency", type=int, default=16, help="maximum requests in flight")
+    parser.add_argument("--checkpoint", help="checkpoint file, defaults to OUTPUT.done")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress reports")
+    args = parser.parse_args(argv)
+
+    kwargs: Dict[str, Any] = {}
+    api_key = args.api_key or os.environ.get(f"{args.provider.upper()}_API_KEY")
+    if api_key:
+        kwargs["api_key"] = api_key
+    if args.base_url:
+        kwargs["base_url"] = args.base_url
+    if args.model:
+        kwargs["default_model"] = args.model
+
+    def report(stats: BatchStats) -> None:
+        print(stats.summary(), file=sys.stderr, flush=True)
+
+    async def run() -> BatchStats:
+        provider = create_provider(args.provider, **kwargs)
+        try:
+            runner = BatchRunner(provider, args.concurrency, args.progress_interval, report)
+            return await runner.run(args.input, args.output, args.checkpoint)
+        finally:
+            await provider.close()
+
+    stats = asyncio.run(run())
+    return 1 if stats.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Asynchronous batch submission of chat requests.
+
+OpenAI's Batch API and Anthropic's Message Batches process large sets of
+requests within hours at a discount. ``OpenAIBatch`` and ``AnthropicBatch``
+submit requests to them, poll until the batch ends and stream back one
+BatchResult per request, keyed by the request's id. ``LocalBatch`` offers the
+same interface for any provider by sending the requests concurrently, and
+``batch_backend`` picks the right backend for a provider.
+"""
+import asyncio
+import logging
+import secrets
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from .base import LLMProvider, Message, ChatResponse
+from .codec import get_codec
+from .conversation import Conversation
+from .providers.anthropic import AnthropicProvider, _split_system
+from .providers.openai import OpenAIProvider
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BatchRequest:
+    """One chat request of a batch."""
+    id: str
+    messages: List[Message]
+    model: Optional[str] = None
+    temperature: float = 0.7
+    params: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class BatchResult:
+    """Outcome of one request of a batch: a response or an error."""
+    id: str
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+class BatchError(Exception):
+    """Raised when an upstream batch fails as a whole."""
+
+def _check_ids(requests: Sequence[BatchRequest]) -> None:
+    ids: Set[str] = set()
+    for request in requests:
+        if request.id in ids:
+            raise ValueError(f"Duplicate batch request id {request.id!r}")
+        ids.add(request.id)
+
+class BatchBackend(ABC):
+    """Runs a set of chat requests and streams back their results."""
+
+    @abstractmethod
+    def run(self, requests: Sequence[BatchRequest]) -> AsyncIterator[BatchResult]:
+        """Run the requests, yielding one result per request as results become available.
+
+        Args:
+            requests: Requests with unique ids
+
+        Returns:
+            AsyncIterator[BatchResult] in no particular order
+        """
+        pass
+
+class LocalBatch(BatchBackend):
+    """Run a batch by sending its requests to a provider concurrently."""
+
+    def __init__(self, provider: LLMProvider, concurrency: int = 16):
+        """Initialize the backend.
+
+        Args:
+            provider: Provider the requests are sent to
+            concurrency: Maximum requests in flight
+        """
+        self.provider = provider
+        self.concurrency = concurrency
+
+    async def run(self, requests: Sequence[BatchRequest]) -> AsyncIterator[BatchResult]:
+        _check_ids(requests)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(request: BatchRequest) -> BatchResult:
+            async with semaphore:
+                try:
+                    response = await self.provider.chat(
+                        request.messages, model=request.model,
+                        temperature=request.temperature, **request.params
+                    )
+                except Exception as e:
+                    return BatchResult(request.id, error=f"{type(e).__name__}: {e}")
+                return BatchResult(request.id, response=response)
+
+        tasks = [asyncio.ensure_future(send(request)) for request in requests]
+        try:
+            for result in asyncio.as_completed(tasks):
+                yield await result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+class UpstreamBatch(BatchBackend):
+    """Batch backend submitting to a provider's batch endpoint and polling it.
+
+    Polling starts every ``poll_interval`` seconds and backs off by
+    ``backoff`` up to ``max_poll_interval``.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 300.0,
+        backoff: float = 1.5
+    ):
+        """Initialize the backend.
+
+        Args:
+            provider: Provider whose batch endpoint is used
+            poll_interval: Seconds before the first status check
+            max_poll_interval: Longest wait between status checks
+            backoff: Factor the wait grows by after each check
+        """
+        self.provider = provider
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+
+    @abstractmethod
+    async def submit(self, requests: Sequence[BatchRequest]) -> str:
+        """Create an upstream batch and return its id."""
+        pass
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> Dict[str, Any]:
+        """Return the upstream batch object."""
+        pass
+
+    @abstractmethod
+    def finished(self, batch: Dict[str, Any]) -> bool:
+        """Whether the batch object has reached a final state."""
+        pass
+
+    @abstractmethod
+    def results(self, batch: Dict[str, Any]) -> AsyncIterator[BatchResult]:
+        """Yield the results of a finished batch."""
+        pass
+
+    async def wait(self, batch_id: str) -> Dict[str, Any]:
+        """Poll a batch with exponential backoff until it finishes."""
+        interval = self.poll_interval
+        while True:
+            await asyncio.sleep(interval)
+            batch = await self.status(batch_id)
+            if self.finished(batch):
+                return batch
+            interval = min(interval * self.backoff, self.max_poll_interval)
+
+    async def run(self, requests: Sequence[BatchRequest]) -> AsyncIterator[BatchResult]:
+        _check_ids(requests)
+        batch_id = await self.submit(requests)
+        logger.info("Submitted batch %s with %d requests", batch_id, len(requests))
+        batch = await self.wait(batch_id)
+
+        missing = {request.id for request in requests}
+        async for result in self.results(batch):
+            missing.discard(result.id)
+            yield result
+        for request_id in sorted(missing):
+            yield BatchResult(request_id, error=f"No result returned by batch {batch_id}")
+
+    def _body(self, request: BatchRequest) -> Dict[str, Any]:
+        """Request body as it would be sent to the synchronous endpoint."""
+        return {
+            "model": request.model or self.provider.default_model,
+            "messages": [{"role": m.role, "content": m.content} for m in request.messages],
+            "temperature": request.temperature,
+            **request.params
+        }
+
+class OpenAIBatch(UpstreamBatch):
+    """Run chat requests through OpenAI's Batch API."""
+
+    provider: OpenAIProvider
+    endpoint = "/v1/chat/completions"
+    final_states = ("completed", "failed", "expired", "cancelled")
+
+    async def submit(self, requests: Sequence[BatchRequest]) -> str:
+        encode = get_codec().encode
+        lines = b"".join(
+            encode({
+                "custom_id": request.id,
+                "method": "POST",
+                "url": self.endpoint,
+                "body": self._body(request),
+            }) + b"\n"
+            for request in requests
+        )
+        boundary = secrets.token_hex(16)
+        upload = await self.provider._request(
+            "POST", "/files",
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", lines, "application/jsonl")}
+        )
+        file_id = get_codec().decode(upload.content)["id"]
+        batch = await self.provider._post("/batches", {
+            "input_file_id": file_id,
+            "endpoint": self.endpoint,
+            "completion_window": "24h",
+        })
+        return batch["id"]
+
+    async def status(self, batch_id: str) -> Dict[str, Any]:
+        return await self.provider._get(f"/batches/{batch_id}")
+
+    def finished(self, batch: Dict[str, Any]) -> bool:
+        return batch["status"] in self.final_states
+
+    async def results(self, batch: Dict[str, Any]) -> AsyncIterator[BatchResult]:
+        if batch["status"] == "failed":
+            errors = (batch.get("errors") or {}).get("data") or []
+            raise BatchError(
+                f"Batch {batch['id']} failed: " + "; ".join(e.get("message", "") for e in errors)
+            )
+
+        decode = get_codec().decode
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            async for line in self.provider._get_lines(f"/files/{file_id}/content"):
+                if not line.strip():
+                    continue
+                data = decode(line)
+                response = data.get("response") or {}
+                if data.get("error") or response.get("status_code") != 200:
+                    error = data.get("error") or response.get("body", {}).get("error")
+                    yield BatchResult(data["custom_id"], error=str(error))
+                else:
+                    yield BatchResult(
+                        data["custom_id"],
+                        response=self.provider._parse_chat(response["body"])
+                    )
+
+class AnthropicBatch(UpstreamBatch):
+    """Run chat requests through Anthropic's Message Batches API."""
+
+    provider: AnthropicProvider
+
+    def _body(self, request: BatchRequest) -> Dict[str, Any]:
+        """Request body, with system messages moved to the top-level ``system`` field."""
+        body = super()._body(request)
+        system, messages = _split_system(Conversation(request.messages))
+        body["messages"] = [
+            m if isinstance(m, dict) else {"role": m.role, "content": m.content}
+            for m in messages
+        ]
+        if system:
+            body.setdefault("system", system)
+        return body
+
+    async def submit(self, requests: Sequence[BatchRequest]) -> str:
+        batch = await self.provider._post("/messages/batches", {
+            "requests": [
+                {"custom_id": request.id, "params": self._body(request)}
+                for request in requests
+            ]
+        })
+        return batch["id"]
+
+    async def status(self, batch_id: str) -> Dict[str, Any]:
+        return await self.provider._get(f"/messages/batches/{batch_id}")
+
+    def finished(self, batch: Dict[str, Any]) -> bool:
+        return batch["processing_status"] == "ended"
+
+    async def results(self, batch: Dict[str, Any]) -> AsyncIterator[BatchResult]:
+        decode = get_codec().decode
+        async for line in self.provider._get_lines(f"/messages/batches/{batch['id']}/results"):
+            if not line.strip():
+                continue
+            data = decode(line)
+            result = data["result"]
+            if result["type"] == "succeeded":
+                yield BatchResult(
+                    data["custom_id"],
+                    response=self.provider._parse_chat(result["message"])
+                )
+            else:
+                yield BatchResult(data["custom_id"], error=str(result.get("error") or result["type"]))
+
+def batch_backend(provider: LLMProvider, **kwargs: Any) -> BatchBackend:
+    """Return the upstream batch backend for a provider, or a LocalBatch fallback.
+
+    Args:
+        provider: Provider to run batches on
+        **kwargs: Arguments passed to the backend constructor
+    """
+    if isinstance(provider, OpenAIProvider):
+        return OpenAIBatch(provider, **kwargs)
+    if isinstance(provider, AnthropicProvider):
+        return AnthropicBatch(provider, **kwargs)
+    return LocalBatch(provider, **kwargs)
@@ -0,0 +1,198 @@
+"""HTTP record/replay cassettes for deterministic offline tests and benchmarks.
+
+A cassette is a JSONL file with one request/response exchange per line. Each
+response keeps its streamed body as the chunks that arrived, together with the
+time offset of every chunk from the start of the request, so replays reproduce
+chunk boundaries and, optionally, upstream timing::
+
+    {"request": {"method": "POST", "url": "...", "body": "..."},
+     "response": {"status": 200, "headers": [["content-type", "..."]],
+                  "encoding": "utf-8", "headers_at": 0.21,
+                  "chunks": [[0.35, "data: ..."], [0.38, "data: ..."]]}}
+
+Request headers are never recorded, so API keys do not end up in cassettes.
+"""
+import asyncio
+import base64
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+# Response headers that only describe the original connection
+_SKIPPED_HEADERS = {"date", "set-cookie", "connection", "keep-alive", "transfer-encoding"}
+
+class CassetteError(Exception):
+    """Raised when a replayed request has no matching recorded exchange."""
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Read the exchanges recorded in a cassette file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _request_key(method: str, url: httpx.URL, body: Optional[str]) -> Tuple:
+    """Key used to match replayed requests to recorded exchanges."""
+    path = url.raw_path.decode("ascii")
+    return (method, path) if body is None else (method, path, body)
+
+def _encode_chunks(chunks: List[Tuple[float, bytes]]) -> Tuple[str, List[List[Any]]]:
+    """Store chunks as text when the body is UTF-8, as base64 otherwise."""
+    try:
+        return "utf-8", [[round(t, 6), c.decode("utf-8")] for t, c in chunks]
+    except UnicodeDecodeError:
+        return "base64", [[round(t, 6), base64.b64encode(c).decode("ascii")] for t, c in chunks]
+
+def _decode_chunk(encoding: str, data: str) -> bytes:
+    return data.encode("utf-8") if encoding == "utf-8" else base64.b64decode(data)
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Response body that records chunks and their timing as they are read."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, exchange: Dict, started: float, save):
+        self._stream = stream
+        self._exchange = exchange
+        self._started = started
+        self._save = save
+        self._chunks: List[Tuple[float, bytes]] = []
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._chunks.append((time.monotonic() - self._started, chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+        if self._exchange is not None:
+            encoding, chunks = _encode_chunks(self._chunks)
+            self._exchange["response"]["encoding"] = encoding
+            self._exchange["response"]["chunks"] = chunks
+            self._save(self._exchange)
+            self._exchange = None
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport that forwards requests and appends each exchange to a cassette."""
+
+    def __init__(self, path: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Initialize the recorder.
+
+        Args:
+            path: Cassette file to append exchanges to
+            transport: Transport that performs the real requests
+        """
+        self.path = path
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    def _save(self, exchange: Dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(exchange, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        body = await request.aread()
+        response = await self._transport.handle_async_request(request)
+
+        exchange = {
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "body": body.decode("utf-8", errors="replace"),
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": [
+                    [k, v] for k, v in response.headers.items()
+                    if k.lower() not in _SKIPPED_HEADERS
+                ],
+                "headers_at": round(time.monotonic() - started, 6),
+            },
+        }
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, exchange, started, self._save),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Response body serving recorded chunks, optionally at recorded timing."""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], started: float, speed: Optional[float]):
+        self._chunks = chunks
+        self._started = started
+        self._speed = speed
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for offset, chunk in self._chunks:
+            if self._speed:
+                delay = self._started + offset / self._speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield chunk
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Transport that answers requests from a cassette instead of the network.
+
+    Requests are matched on method and URL path (and on the body when
+    ``match_body`` is set). Exchanges with the same key are served in recorded
+    order; with ``loop`` set, they are served round-robin indefinitely.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        realtime: bool = False,
+        speed: float = 1.0,
+        match_body: bool = False,
+        loop: bool = False
+    ):
+        """Initialize the replayer.
+
+        Args:
+            path: Cassette file to replay
+            realtime: Reproduce the recorded header and chunk timing
+            speed: Timing multiplier when replaying in realtime (2.0 is twice as fast)
+            match_body: Also match requests on their body
+            loop: Serve exchanges repeatedly instead of once each
+        """
+        self.speed = speed if realtime else None
+        self.match_body = match_body
+        self.loop = loop
+        self._exchanges: Dict[Tuple, Deque[Dict]] = {}
+        for exchange in load_cassette(path):
+            request = exchange["request"]
+            key = _request_key(
+                request["method"],
+                httpx.URL(request["url"]),
+                request["body"] if match_body else None
+            )
+            self._exchanges.setdefault(key, deque()).append(exchange["response"])
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        body = (await request.aread()).decode("utf-8", errors="replace")
+        key = _request_key(request.method, request.url, body if self.match_body else None)
+
+        queue = self._exchanges.get(key)
+        if not queue:
+            raise CassetteError(f"No recorded response for {request.method} {request.url}")
+        recorded = queue.popleft()
+        if self.loop:
+            queue.append(recorded)
+
+        if self.speed:
+            delay = started + recorded.get("headers_at", 0.0) / self.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        encoding = recorded.get("encoding", "utf-8")
+        chunks = [(t, _decode_chunk(encoding, c)) for t, c in recorded.get("chunks", [])]
+        return httpx.Response(
+            status_code=recorded["status"],
+            headers=recorded.get("headers", []),
+            stream=_ReplayStream(chunks, started, self.speed),
+        )
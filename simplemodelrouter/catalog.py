@@ -0,0 +1,173 @@
+import asyncio
+import difflib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Context windows of well-known model families, matched by name prefix
+CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o3": 200000,
+    "claude-3": 200000,
+    "claude-sonnet-4": 200000,
+    "claude-opus-4": 200000,
+}
+
+def known_context_window(name: str) -> Optional[int]:
+    """Return the context window of a well-known model family, if any."""
+    matches = [prefix for prefix in CONTEXT_WINDOWS if name.startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else None
+
+@dataclass(frozen=True)
+class CatalogModel:
+    """A model a provider reports as available."""
+    name: str
+    context_window: Optional[int] = None
+
+class UnknownModelError(ValueError):
+    """Raised when a model is not in a provider's catalog."""
+
+    def __init__(self, model: str, provider: str, suggestions: List[str]):
+        self.model = model
+        self.provider = provider
+        self.suggestions = suggestions
+        hint = f"; did you mean {', '.join(map(repr, suggestions))}?" if suggestions else ""
+        super().__init__(f"Unknown model {model!r} for {provider}{hint}")
+
+class ModelCatalog:
+    """Cached list of the models a provider serves, refreshed in the background.
+
+    Lookups never wait on the network. When the cache is older than
+    ``refresh_interval`` a lookup schedules a refresh and answers from the
+    current data. Until the first refresh completes the catalog knows nothing,
+    and every model is accepted as is.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Iterable[CatalogModel]]],
+        provider: str = "provider",
+        refresh_interval: float = 300.0,
+        aliases: Optional[Dict[str, str]] = None,
+        normalize: Callable[[str], str] = lambda name: name
+    ):
+        """Initialize the catalog.
+
+        Args:
+            fetch: Coroutine function listing the provider's models
+            provider: Provider name used in error messages
+            refresh_interval: Seconds after which the cached list is refreshed
+            aliases: Alternative names mapped to catalog model names
+            normalize: Function mapping a model name to its canonical form,
+                e.g. adding Ollama's default ``:latest`` tag
+        """
+        self.fetch = fetch
+        self.provider = provider
+        self.refresh_interval = refresh_interval
+        self.aliases = dict(aliases or {})
+        self.normalize = normalize
+        self.refreshed_at: Optional[float] = None
+        self._models: Dict[str, CatalogModel] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the catalog has been fetched at least once."""
+        return self.refreshed_at is not None
+
+    def models(self) -> List[CatalogModel]:
+        """Return the cached models."""
+        return list(self._models.values())
+
+    async def refresh(self) -> None:
+        """Fetch the provider's models and replace the cache."""
+        models = await self.fetch()
+        self._models = {self.normalize(m.name): m for m in models}
+        self.refreshed_at = time.monotonic()
+
+    def _refresh_if_stale(self) -> None:
+        """Schedule a background refresh if the cache is stale and none is running."""
+        if self.refreshed_at is not None and time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_logged())
+        except RuntimeError:
+            pass  # no event loop to refresh from
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("Failed to refresh %s model catalog: %s", self.provider, e)
+
+    def _lookup(self, model: str) -> Optional[CatalogModel]:
+        name = self.aliases.get(model, model)
+        return self._models.get(self.normalize(name))
+
+    def contains(self, model: str) -> Optional[bool]:
+        """Whether the provider serves a model, or None if the catalog is not loaded yet."""
+        self._refresh_if_stale()
+        if not self.loaded:
+            return None
+        return self._lookup(model) is not None
+
+    def resolve(self, model: str) -> str:
+        """Resolve aliases and validate a model name against the cached catalog.
+
+        Args:
+            model: Requested model name or alias
+
+        Returns:
+            The name to send upstream
+
+        Raises:
+            UnknownModelError: If the catalog is loaded and lacks the model
+        """
+        self._refresh_if_stale()
+        name = self.aliases.get(model, model)
+        if not self.loaded:
+            return name
+        entry = self._lookup(model)
+        if entry is None:
+            suggestions = difflib.get_close_matches(name, list(self._models), n=3)
+            raise UnknownModelError(model, self.provider, suggestions)
+        return entry.name
+
+    def context_window(self, model: str) -> Optional[int]:
+        """Return a model's context window, if known."""
+        entry = self._lookup(model)
+        if entry is not None and entry.context_window is not None:
+            return entry.context_window
+        return known_context_window(self.aliases.get(model, model))
+
+    def start(self) -> None:
+        """Refresh the catalog every ``refresh_interval`` seconds in the background."""
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while True:
+            await self._refresh_logged()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        """Stop background refreshes."""
+        for task in (self._poll_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._poll_task = self._refresh_task = None
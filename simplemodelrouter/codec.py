@@ -0,0 +1,119 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Union
+
+class JSONCodec(ABC):
+    """Encodes request bodies and decodes response bodies and stream chunks."""
+
+    name: str
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON."""
+        pass
+
+    @abstractmethod
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Decode a JSON document."""
+        pass
+
+class StdlibCodec(JSONCodec):
+    """Codec using the standard library ``json`` module."""
+
+    name = "json"
+
+    def __init__(self):
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        self._loads = json.loads
+
+    def encode(self, obj: Any) -> bytes:
+        return self._dumps(obj).encode("utf-8")
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+class OrjsonCodec(JSONCodec):
+    """Codec using ``orjson``."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def encode(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+class MsgspecCodec(JSONCodec):
+    """Codec using ``msgspec.json``."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._dumps = msgspec.json.Encoder().encode
+        self._loads = msgspec.json.Decoder().decode
+
+    def encode(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+# Preference order used when no codec has been selected explicitly
+_CODECS: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": StdlibCodec,
+}
+_codec: Optional[JSONCodec] = None
+
+def available_codecs() -> List[str]:
+    """Return the names of the codecs whose backing library is installed."""
+    names = []
+    for name, factory in _CODECS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def set_codec(codec: Union[str, JSONCodec]) -> JSONCodec:
+    """Select the codec used by all providers.
+
+    Args:
+        codec: Codec instance, or the name of a built-in codec
+
+    Returns:
+        The selected codec
+
+    Raises:
+        ValueError: If the codec name is unknown
+        ImportError: If the codec's library is not installed
+    """
+    global _codec
+    if isinstance(codec, str):
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec {codec!r}; choose from {', '.join(_CODECS)}")
+        codec = _CODECS[codec]()
+    _codec = codec
+    return codec
+
+def get_codec() -> JSONCodec:
+    """Return the selected codec, picking the fastest installed one on first use."""
+    global _codec
+    if _codec is None:
+        for factory in _CODECS.values():
+            try:
+                _codec = factory()
+                break
+            except ImportError:
+                continue
+    return _codec
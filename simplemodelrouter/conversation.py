@@ -0,0 +1,185 @@
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+
+from .base import Message
+from .codec import get_codec
+
+def _encode(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON with the selected codec."""
+    return get_codec().encode(obj)
+
+class Conversation:
+    """Message history that caches the JSON encoding of every message.
+
+    Each message is encoded once, when it is added. Request bodies are built by
+    splicing the cached fragments, so the serialization cost of a turn is
+    proportional to the new messages rather than to the whole history.
+    Messages must not be mutated after they have been added.
+
+    Messages longer than ``cache_limit`` characters are not cached, so a very
+    large context is never held twice; they are encoded when a body is built,
+    in slices when the body is streamed.
+
+    ``cache_prefix`` is the number of leading messages that are identical
+    across requests, such as a template's system prompt. Providers with
+    explicit prompt caching mark the end of that prefix as a cache breakpoint.
+    """
+
+    cache_limit = 1 << 18
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        """Initialize the conversation.
+
+        Args:
+            messages: Initial messages
+        """
+        self._messages: List[Message] = []
+        self._encoded: List[Optional[bytes]] = []
+        self.cache_prefix = 0
+        self.extend(messages)
+
+    @classmethod
+    def coerce(cls, messages: Union[Sequence[Message], "Conversation"]) -> "Conversation":
+        """Return messages as a Conversation, wrapping plain lists."""
+        if isinstance(messages, Conversation):
+            return messages
+        return cls(messages)
+
+    def append(self, message: Message) -> None:
+        """Add a message, encoding it once."""
+        if isinstance(message.content, str) and len(message.content) > self.cache_limit:
+            self._encoded.append(None)
+        else:
+            self._encoded.append(_encode({"role": message.role, "content": message.content}))
+        self._messages.append(message)
+
+    def _append_encoded(self, message: Message, encoded: Optional[bytes]) -> None:
+        """Add a message with an encoding computed elsewhere, e.g. by a template."""
+        self._encoded.append(encoded)
+        self._messages.append(message)
+
+    def copy(self) -> "Conversation":
+        """Return a copy sharing the cached message encodings."""
+        conversation = Conversation()
+        conversation._messages = list(self._messages)
+        conversation._encoded = list(self._encoded)
+        conversation.cache_prefix = self.cache_prefix
+        return conversation
+
+    def add(self, role: str, content: str) -> Message:
+        """Create, add and return a message."""
+        message = Message(role=role, content=content)
+        self.append(message)
+        return message
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        """Add several messages."""
+        for message in messages:
+            self.append(message)
+
+    @property
+    def messages(self) -> List[Message]:
+        """A copy of the messages in the conversation."""
+        return list(self._messages)
+
+    def encoded(self) -> bytes:
+        """Return the messages as an encoded JSON array."""
+        return b"[" + b",".join(
+            encoded if encoded is not None else _encode({"role": m.role, "content": m.content})
+            for m, encoded in zip(self._messages, self._encoded)
+        ) + b"]"
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    @overload
+    def __getitem__(self, index: int) -> Message: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "Conversation": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Message, "Conversation"]:
+        """Return a message, or a contiguous slice as a Conversation sharing the cached encodings."""
+        if not isinstance(index, slice):
+            return self._messages[index]
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            raise ValueError("Conversation slices must be contiguous")
+        conversation = Conversation()
+        conversation._messages = self._messages[start:stop]
+        conversation._encoded = self._encoded[start:stop]
+        conversation.cache_prefix = max(0, min(self.cache_prefix, stop) - start)
+        return conversation
+
+def encode_body(payload: Dict[str, Any]) -> bytes:
+    """Encode a JSON request body, splicing in pre-encoded conversation messages.
+
+    Args:
+        payload: Request payload; its ``messages`` entry may be a Conversation
+
+    Returns:
+        The UTF-8 encoded JSON body
+    """
+    messages = payload.get("messages")
+    if not isinstance(messages, Conversation):
+        return _encode(payload)
+
+    head = _encode({k: v for k, v in payload.items() if k != "messages"})
+    separator = b"," if len(head) > 2 else b""
+    return b"".join((head[:-1], separator, b'"messages":', messages.encoded(), b"}"))
+
+def body_size_hint(payload: Dict[str, Any]) -> int:
+    """Cheaply estimate the encoded size of a request body from its message contents."""
+    return sum(
+        len(m.content if isinstance(m, Message) else m.get("content") or "")
+        for m in payload.get("messages") or ()
+    )
+
+def _iter_message(role: str, content: Any, chunk_size: int) -> Iterator[bytes]:
+    """Encode one message, slicing long string contents so no full copy is made."""
+    if not isinstance(content, str) or len(content) <= chunk_size:
+        yield _encode({"role": role, "content": content})
+        return
+    codec = get_codec()
+    yield b'{"role":' + codec.encode(role) + b',"content":"'
+    for start in range(0, len(content), chunk_size):
+        yield codec.encode(content[start:start + chunk_size])[1:-1]
+    yield b'"}'
+
+def iter_encode_body(payload: Dict[str, Any], chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Encode a JSON request body incrementally.
+
+    Yields the same bytes as ``encode_body``, in pieces of roughly
+    ``chunk_size`` characters, so a body can be uploaded without ever holding
+    a complete copy of large message contents.
+
+    Args:
+        payload: Request payload; its ``messages`` may be a Conversation, or a
+            list of Message objects or ``{"role", "content"}`` dicts
+        chunk_size: Number of characters of message content encoded at a time
+    """
+    messages = payload.get("messages")
+    if messages is None:
+        yield _encode(payload)
+        return
+
+    head = _encode({k: v for k, v in payload.items() if k != "messages"})
+    yield head[:-1] + (b"," if len(head) > 2 else b"") + b'"messages":['
+    fragments = messages._encoded if isinstance(messages, Conversation) else [None] * len(messages)
+    for i, (message, encoded) in enumerate(zip(messages, fragments)):
+        if i:
+            yield b","
+        if encoded is not None:
+            yield encoded
+        elif isinstance(message, Message):
+            yield from _iter_message(message.role, message.content, chunk_size)
+        else:
+            yield from _iter_message(message["role"], message["content"], chunk_size)
+    yield b"]}"
+
+async def aiter_encode_body(payload: Dict[str, Any], chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    """Async version of ``iter_encode_body``, usable as httpx request content."""
+    for chunk in iter_encode_body(payload, chunk_size):
+        yield chunk
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a request's deadline or one of its phase timeouts expires."""
+
+class Deadline:
+    """Per-call time budget with separate connect, first-token and idle timeouts.
+
+    The total budget starts when the deadline is created and bounds every phase
+    of a call: acquiring a pooled connection, sending the request, waiting for
+    the first streamed chunk and reading each following chunk.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect: Optional[float] = None,
+        ttft: Optional[float] = None,
+        idle: Optional[float] = None
+    ):
+        """Initialize the deadline.
+
+        Args:
+            timeout: Total seconds allowed for the call, or None for no limit
+            connect: Seconds allowed to establish a connection
+            ttft: Seconds allowed until the first streamed chunk arrives
+            idle: Seconds allowed between streamed chunks
+        """
+        self.started = time.monotonic()
+        self.expires_at = self.started + timeout if timeout is not None else None
+        self.connect = connect
+        self.ttft = ttft
+        self.idle = idle
+
+    @classmethod
+    def coerce(cls, deadline: "DeadlineLike") -> Optional["Deadline"]:
+        """Accept a Deadline, a number of seconds, or None."""
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(timeout=deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the total budget, or None if unlimited."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the total budget is used up."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: Optional[float]) -> Optional[float]:
+        """Bound a phase timeout by the remaining total budget."""
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
+
+    def ttft_remaining(self) -> Optional[float]:
+        """Seconds left until the first chunk must arrive, bounded by the total budget."""
+        if self.ttft is None:
+            return self.cap(None)
+        return self.cap(max(0.0, self.started + self.ttft - time.monotonic()))
+
+    async def wait(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Await with a timeout bounded by the remaining budget.
+
+        Raises:
+            DeadlineExceeded: If the timeout expires first
+        """
+        timeout = self.cap(timeout)
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(f"deadline exceeded after {timeout:.3f}s") from e
+
+    async def iterate(self, iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Yield from a stream, enforcing the first-chunk and idle timeouts.
+
+        The source iterator is closed as soon as a timeout fires or the consumer
+        stops iterating.
+        """
+        try:
+            timeout = self.ttft_remaining()
+            while True:
+                try:
+                    item = await self.wait(iterator.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                yield item
+                timeout = self.idle
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+DeadlineLike = Union[Deadline, float, None]
@@ -0,0 +1,254 @@
+"""Incremental JSON parsing of streamed model output.
+
+The parser consumes text deltas as they arrive and builds the document in
+place, looking at every character once. Array elements are reported as soon
+as they are closed, so work on the first item of a long list can start while
+the rest is still being generated.
+
+Text before the first ``{`` or ``[`` (such as a Markdown code fence) and
+anything after the top-level value is ignored.
+"""
+import json
+import re
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+_WHITESPACE = " \t\r\n"
+_NUMBER_END = re.compile(r"[^0-9eE+\-.]")
+_LITERAL_END = re.compile(r"[^a-z]")
+_STRING_SPECIAL = re.compile(r'["\\]')
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# Parser states
+_START, _VALUE, _ARRAY_START, _OBJECT_START, _KEY, _COLON, _AFTER, _STRING, _NUMBER, _LITERAL, _DONE = range(11)
+
+class JSONStreamError(ValueError):
+    """Raised when streamed output is not valid JSON."""
+
+@dataclass
+class JSONEvent:
+    """Something that became available while parsing.
+
+    ``kind`` is one of:
+
+    - ``"item"``: the array element at ``path`` is complete
+    - ``"partial"``: the document changed; ``value`` is the root, holding every
+      value completed so far and updated in place as parsing continues
+    - ``"done"``: the document is complete and ``value`` is the root
+    """
+    kind: str
+    path: Path
+    value: Any
+
+class JSONStreamParser:
+    """Linear-time incremental JSON parser."""
+
+    def __init__(self):
+        self.value: Any = None
+        self._stack: List[list] = []  # [container, key or index] per open container
+        self._state = _START
+        self._chunks: List[str] = []
+        self._is_key = False
+        self._escaped = False
+        self._has_escapes = False
+        self._offset = 0
+        self._events: List[JSONEvent] = []
+        self._changed = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the top-level value is complete."""
+        return self._state == _DONE
+
+    def feed(self, text: str) -> List[JSONEvent]:
+        """Parse the next piece of text and return the events it produced."""
+        i, n = 0, len(text)
+        while i < n and self._state != _DONE:
+            state = self._state
+            if state == _STRING:
+                i = self._scan_string(text, i)
+                continue
+            if state == _NUMBER or state == _LITERAL:
+                pattern = _NUMBER_END if state == _NUMBER else _LITERAL_END
+                match = pattern.search(text, i)
+                end = match.start() if match else n
+                self._chunks.append(text[i:end])
+                i = end
+                if match:
+                    self._finish_scalar(i)
+                continue
+
+            c = text[i]
+            i += 1
+            if c in _WHITESPACE:
+                continue
+            if state == _START:
+                if c == "{" or c == "[":
+                    self._open(c)
+            elif state == _VALUE or state == _ARRAY_START:
+                if c == "]" and state == _ARRAY_START:
+                    self._close()
+                else:
+                    self._start_value(c, i - 1)
+            elif state == _OBJECT_START or state == _KEY:
+                if c == '"':
+                    self._start_string(is_key=True)
+                elif c == "}" and state == _OBJECT_START:
+                    self._close()
+                else:
+                    self._error("expected a key", i - 1)
+            elif state == _COLON:
+                if c != ":":
+                    self._error("expected ':'", i - 1)
+                self._state = _VALUE
+            elif state == _AFTER:
+                container = self._stack[-1][0]
+                if c == ",":
+                    self._state = _VALUE if isinstance(container, list) else _KEY
+                elif c == ("]" if isinstance(container, list) else "}"):
+                    self._close()
+                else:
+                    self._error("expected ',' or a closing bracket", i - 1)
+        self._offset += n
+
+        events, self._events = self._events, []
+        if self._changed and self._state != _DONE:
+            events.append(JSONEvent("partial", (), self.value))
+        self._changed = False
+        return events
+
+    def close(self) -> None:
+        """Check the document is complete once the stream has ended."""
+        if self._state != _DONE:
+            self._error("unexpected end of output", 0)
+
+    def _error(self, message: str, index: int) -> None:
+        raise JSONStreamError(f"Invalid JSON in streamed output at offset {self._offset + index}: {message}")
+
+    def _start_value(self, c: str, index: int) -> None:
+        if c == "{" or c == "[":
+            self._open(c)
+        elif c == '"':
+            self._start_string(is_key=False)
+        elif c == "-" or c.isdigit():
+            self._chunks.append(c)
+            self._state = _NUMBER
+        elif c in "tfn":
+            self._chunks.append(c)
+            self._state = _LITERAL
+        else:
+            self._error(f"unexpected {c!r}", index)
+
+    def _start_string(self, is_key: bool) -> None:
+        self._is_key = is_key
+        self._has_escapes = False
+        self._state = _STRING
+
+    def _scan_string(self, text: str, i: int) -> int:
+        """Consume string contents up to the closing quote or the end of the text."""
+        n = len(text)
+        while i < n:
+            if self._escaped:
+                self._escaped = False
+                self._chunks.append(text[i])
+                i += 1
+                continue
+            match = _STRING_SPECIAL.search(text, i)
+            if match is None:
+                self._chunks.append(text[i:])
+                return n
+            end = match.start()
+            self._chunks.append(text[i:end])
+            if text[end] == "\\":
+                self._chunks.append("\\")
+                self._escaped = self._has_escapes = True
+                i = end + 1
+                continue
+
+            raw = "".join(self._chunks)
+            self._chunks = []
+            value = json.loads(f'"{raw}"') if self._has_escapes else raw
+            if self._is_key:
+                self._stack[-1][1] = value
+                self._state = _COLON
+            else:
+                self._add(value)
+            return end + 1
+        return n
+
+    def _finish_scalar(self, index: int) -> None:
+        raw = "".join(self._chunks)
+        self._chunks = []
+        if self._state == _LITERAL:
+            if raw not in _LITERALS:
+                self._error(f"unknown literal {raw!r}", index)
+            self._add(_LITERALS[raw])
+            return
+        try:
+            self._add(json.loads(raw))
+        except ValueError:
+            self._error(f"invalid number {raw!r}", index)
+
+    def _attach(self, value: Any) -> None:
+        """Place a value in its parent container, or make it the root."""
+        self._changed = True
+        if not self._stack:
+            self.value = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            frame[1] = len(container)
+            container.append(value)
+        else:
+            container[frame[1]] = value
+
+    def _complete(self, value: Any) -> None:
+        """Report a finished value and move past it."""
+        if not self._stack:
+            self._state = _DONE
+            self._events.append(JSONEvent("done", (), value))
+            return
+        if isinstance(self._stack[-1][0], list):
+            path = tuple(frame[1] for frame in self._stack)
+            self._events.append(JSONEvent("item", path, value))
+        self._state = _AFTER
+
+    def _add(self, value: Any) -> None:
+        self._attach(value)
+        self._complete(value)
+
+    def _open(self, c: str) -> None:
+        container: Union[dict, list] = {} if c == "{" else []
+        self._attach(container)
+        self._stack.append([container, None])
+        self._state = _OBJECT_START if c == "{" else _ARRAY_START
+
+    def _close(self) -> None:
+        container, _ = self._stack.pop()
+        self._complete(container)
+
+async def parse_stream(stream: AsyncIterator[Any]) -> AsyncIterator[JSONEvent]:
+    """Parse a stream of text, ChatResponse or CompletionResponse chunks as JSON.
+
+    The whole stream is consumed even after the document is complete, so that
+    end-of-stream usage still reaches wrappers such as MeteredProvider.
+
+    Raises:
+        JSONStreamError: If the output is not valid JSON or ends early
+    """
+    parser = JSONStreamParser()
+    async with aclosing(stream):
+        async for chunk in stream:
+            if isinstance(chunk, str):
+                text = chunk
+            elif hasattr(chunk, "message"):
+                text = chunk.message.content
+            else:
+                text = chunk.text
+            for event in parser.feed(text):
+                yield event
+    parser.close()
@@ -0,0 +1,285 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from .admission import AdmissionProvider, AdmissionSlot
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .conversation import Conversation
+
+THROTTLE_STATUSES = (429, 503)
+
+class LimitExceeded(Exception):
+    """Raised when a request is rejected because the concurrency limit is reached."""
+
+class Limit(ABC):
+    """Algorithm adjusting a concurrency limit from request samples."""
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+
+    def _clamp(self, value: float) -> int:
+        return int(max(self.min_limit, min(self.max_limit, value)))
+
+    @abstractmethod
+    def on_sample(self, rtt: float, in_flight: int, dropped: bool) -> None:
+        """Update the limit from one finished request.
+
+        Args:
+            rtt: Request latency in seconds (time to first token for streams)
+            in_flight: Requests in flight when the request started
+            dropped: Whether the request was throttled or timed out
+        """
+        pass
+
+class AIMDLimit(Limit):
+    """Additive increase, multiplicative decrease.
+
+    The limit grows by one after each successful request made while at least
+    half of it was in use, and shrinks by ``backoff_ratio`` on every throttled
+    request or one slower than ``timeout``.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff_ratio: float = 0.9,
+        timeout: Optional[float] = None
+    ):
+        """Initialize the limit.
+
+        Args:
+            initial: Starting limit
+            min_limit: Lowest allowed limit
+            max_limit: Highest allowed limit
+            backoff_ratio: Factor the limit is multiplied by on a drop
+            timeout: Latency in seconds above which a request counts as a drop
+        """
+        super().__init__(initial, min_limit, max_limit)
+        self.backoff_ratio = backoff_ratio
+        self.timeout = timeout
+
+    def on_sample(self, rtt: float, in_flight: int, dropped: bool) -> None:
+        if dropped or (self.timeout is not None and rtt > self.timeout):
+            self.limit = self._clamp(self.limit * self.backoff_ratio)
+        elif in_flight * 2 >= self.limit:
+            self.limit = self._clamp(self.limit + 1)
+
+class GradientLimit(Limit):
+    """Limit following the gradient between long-term and current latency.
+
+    While latency stays near its long-term average the limit grows by
+    ``queue_size``. When latency rises above ``tolerance`` times the average,
+    queueing has started upstream and the limit shrinks in proportion, by at
+    most half per sample. Changes are smoothed, and the long-term average
+    decays after a sustained spike so the limit can recover.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        long_window: int = 600,
+        queue_size: int = 4
+    ):
+        """Initialize the limit.
+
+        Args:
+            initial: Starting limit
+            min_limit: Lowest allowed limit
+            max_limit: Highest allowed limit
+            smoothing: Weight of each new limit estimate, between 0 and 1
+            tolerance: Latency increase over the long-term average that is tolerated
+            long_window: Number of samples the long-term average spans
+            queue_size: Headroom added to the limit when latency is stable
+        """
+        super().__init__(initial, min_limit, max_limit)
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.queue_size = queue_size
+        self._alpha = 2.0 / (long_window + 1)
+        self._estimate = float(initial)
+        self.long_rtt: Optional[float] = None
+
+    def on_sample(self, rtt: float, in_flight: int, dropped: bool) -> None:
+        if self.long_rtt is None:
+            self.long_rtt = rtt
+        else:
+            self.long_rtt += self._alpha * (rtt - self.long_rtt)
+            if self.long_rtt / max(rtt, 1e-9) > 2:
+                self.long_rtt *= 0.95  # recover from a latency spike
+
+        if dropped:
+            estimate = self._estimate * 0.5
+        elif in_flight < self._estimate / 2:
+            return  # too little load to learn anything about the limit
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / max(rtt, 1e-9)))
+            estimate = self._estimate * gradient + self.queue_size
+
+        self._estimate = max(self.min_limit, min(
+            self.max_limit,
+            self._estimate * (1 - self.smoothing) + estimate * self.smoothing
+        ))
+        self.limit = self._clamp(self._estimate)
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether an error means the upstream is overloaded (429/503 or a timeout)."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in THROTTLE_STATUSES
+
+class _SampledSlot(AdmissionSlot):
+    """Slot feeding the latency of its request into the provider's limit."""
+
+    def __init__(self, provider: "LimitedProvider"):
+        super().__init__(provider._release)
+        self._provider = provider
+        self._in_flight = provider._in_flight
+        self._started = asyncio.get_running_loop().time()
+        self._sample: Optional[Tuple[float, int, bool]] = None
+
+    def _elapsed(self) -> float:
+        return asyncio.get_running_loop().time() - self._started
+
+    def responded(self) -> None:
+        if self._sample is None:
+            self._sample = (self._elapsed(), self._in_flight, False)
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        if self._sample is None and isinstance(error, Exception) and is_throttled(error):
+            self._sample = (self._elapsed(), self._in_flight, True)
+        self._provider._record(self._sample)
+        super().release(error)
+
+class LimitedProvider(AdmissionProvider):
+    """Provider wrapper enforcing an adaptive concurrency limit.
+
+    Requests beyond the current limit wait up to ``max_wait`` seconds for a
+    slot and are then rejected with LimitExceeded, so excess load fails fast
+    instead of queueing upstream. Every request feeds its latency, or time to
+    first token for streams, and whether it was throttled into the limit
+    algorithm. Streams hold their slot until they finish.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        limit: Optional[Limit] = None,
+        max_wait: float = 0.0
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            provider: Provider to limit
+            limit: Limit algorithm, a GradientLimit by default
+            max_wait: Seconds a request may wait for a slot before being rejected
+        """
+        super().__init__(provider)
+        self.limit = limit or GradientLimit()
+        self.max_wait = max_wait
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._requests = 0
+        self._rejections = 0
+        self._drops = 0
+        self._last_rtt: Optional[float] = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the current limit, load and rejection counters."""
+        return {
+            "limit": self.limit.limit,
+            "in_flight": self._in_flight,
+            "queued": sum(1 for f in self._waiters if not f.done()),
+            "requests": self._requests,
+            "rejections": self._rejections,
+            "drops": self._drops,
+            "rtt": self._last_rtt,
+        }
+
+    def _enqueue(self, key: None, waiter: asyncio.Future) -> None:
+        self._waiters.append(waiter)
+
+    def _discard(self, key: None, waiter: asyncio.Future) -> None:
+        self._waiters.remove(waiter)
+
+    def _dispatch(self) -> None:
+        """Admit waiters in arrival order while the limit allows."""
+        while self._waiters and self._in_flight < self.limit.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._grant(future)
+
+    def _slot(self) -> AdmissionSlot:
+        self._requests += 1
+        return _SampledSlot(self)
+
+    def _record(self, sample: Optional[Tuple[float, int, bool]]) -> None:
+        """Update the limit from a (rtt, in_flight, dropped) sample."""
+        if sample is None:
+            return
+        rtt, in_flight, dropped = sample
+        self._last_rtt = rtt
+        self._drops += dropped
+        self.limit.on_sample(rtt, in_flight, dropped)
+
+    async def _acquire(self, key: None = None, timeout: Optional[float] = None) -> AdmissionSlot:
+        """Take a slot, waiting up to ``max_wait`` seconds.
+
+        Raises:
+            LimitExceeded: If no slot is free within ``max_wait``
+        """
+        if self.max_wait <= 0:
+            if self._waiters or self._in_flight >= self.limit.limit:
+                self._rejections += 1
+                raise LimitExceeded(f"Concurrency limit of {self.limit.limit} reached")
+            return await super()._acquire(key)
+        try:
+            return await super()._acquire(key, self.max_wait)
+        except asyncio.TimeoutError:
+            self._rejections += 1
+            raise LimitExceeded(f"No slot free within {self.max_wait}s") from None
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        """Send a chat request once a slot is free.
+
+        Raises:
+            LimitExceeded: If no slot frees up within ``max_wait``
+        """
+        return await self._run(None, stream, None, lambda: self.provider.chat(
+            messages, model=model, temperature=temperature, stream=stream, **kwargs
+        ))
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
+        """Send a completion request once a slot is free.
+
+        Raises:
+            LimitExceeded: If no slot frees up within ``max_wait``
+        """
+        return await self._run(None, stream, None, lambda: self.provider.complete(
+            prompt, model=model, temperature=temperature, stream=stream, **kwargs
+        ))
+
@@ -0,0 +1,327 @@
+"""Open-loop load generator for providers and the Router.
+
+Requests are sent at scheduled arrival times whether or not earlier requests
+have finished, as real traffic arrives, so queueing delays show up in the
+latencies instead of slowing the generator down. Arrivals follow a Poisson
+process at a given rate, or are replayed from a JSONL trace file with one
+request per line::
+
+    {"timestamp": 0.0, "prompt_tokens": 512, "stream": true}
+    {"timestamp": 0.8, "prompt_tokens": 64, "stream": false, "model": "llama3", "params": {}}
+
+Timestamps are in seconds and relative to the first line. Prompts are
+synthesized with roughly ``prompt_tokens`` tokens.
+
+The report gives p50/p95/p99 time to first token (for streamed requests) and
+total latency, throughput and errors grouped by type or HTTP status, as JSON
+on stdout or in ``--output`` and as a summary on stderr.
+
+Usage:
+    python -m simplemodelrouter.loadgen --provider ollama --rate 20 --duration 60
+    python -m simplemodelrouter.loadgen --provider openai --trace trace.jsonl --speed 2
+    python -m simplemodelrouter.loadgen --provider ollama --base-url http://a:11434 --base-url http://b:11434 --rate 50
+    python -m simplemodelrouter.loadgen --provider openai --api-key test --cassette chat_stream.jsonl --rate 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .base import LLMProvider, Message
+from .codec import get_codec
+from .registry import available_providers, create_provider
+
+@dataclass
+class Arrival:
+    """One request of a load test."""
+    at: float  # seconds after the start of the test
+    prompt_tokens: int = 128
+    stream: bool = True
+    model: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class RequestResult:
+    """Outcome of one request."""
+    at: float
+    offset: float  # seconds into the run the request was scheduled, after speed-up
+    lag: float  # seconds the request started after its scheduled time
+    latency: float
+    ttft: Optional[float] = None
+    chunks: int = 0
+    error: Optional[str] = None
+
+def poisson_arrivals(
+    rate: float,
+    duration: Optional[float] = None,
+    count: Optional[int] = None,
+    prompt_tokens: int = 128,
+    stream: bool = True,
+    seed: Optional[int] = None
+) -> Iterator[Arrival]:
+    """Generate arrivals of a Poisson process.
+
+    Args:
+        rate: Mean requests per second
+        duration: Seconds of arrivals to generate
+        count: Number of arrivals to generate; at least one of
+            ``duration`` and ``count`` is required
+        prompt_tokens: Prompt size of every request
+        stream: Whether requests stream their responses
+        seed: Random seed, for reproducible schedules
+    """
+    if duration is None and count is None:
+        raise ValueError("Pass a duration or a count")
+    rng = random.Random(seed)
+    at = 0.0
+    generated = 0
+    while count is None or generated < count:
+        at += rng.expovariate(rate)
+        if duration is not None and at > duration:
+            return
+        yield Arrival(at, prompt_tokens, stream)
+        generated += 1
+
+def load_trace(path: str) -> List[Arrival]:
+    """Read arrivals from a JSONL trace file, relative to its first timestamp."""
+    decode = get_codec().decode
+    arrivals = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = decode(line)
+            arrivals.append(Arrival(
+                at=float(record["timestamp"]),
+                prompt_tokens=int(record.get("prompt_tokens", 128)),
+                stream=bool(record.get("stream", True)),
+                model=record.get("model"),
+                params=record.get("params") or {}
+            ))
+    arrivals.sort(key=lambda a: a.at)
+    start = arrivals[0].at if arrivals else 0.0
+    for arrival in arrivals:
+        arrival.at -= start
+    return arrivals
+
+def make_prompt(tokens: int) -> str:
+    """Synthesize a prompt of roughly ``tokens`` tokens."""
+    words = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel")
+    return " ".join(words[i % len(words)] for i in range(max(tokens, 1)))
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Return the q-th percentile of values, interpolating linearly, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def _error_name(error: BaseException) -> str:
+    """Group errors by HTTP status when there is one, else by type."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return f"HTTP {status}" if status is not None else type(error).__name__
+
+@dataclass
+class LoadReport:
+    """Results of a load test."""
+    results: List[RequestResult]
+    duration: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        ok = [r for r in self.results if r.error is None]
+        latencies = [r.latency for r in ok]
+        ttfts = [r.ttft for r in ok if r.ttft is not None]
+        span = max((r.offset for r in self.results), default=0.0)
+
+        def distribution(values: List[float]) -> Dict[str, Optional[float]]:
+            return {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "mean": sum(values) / len(values) if values else None,
+                "max": max(values, default=None),
+            }
+
+        return {
+            "requests": len(self.results),
+            "completed": len(ok),
+            "failed": len(self.results) - len(ok),
+            "duration": self.duration,
+            "offered_rate": len(self.results) / span if span > 0 else None,
+            "throughput": len(ok) / self.duration if self.duration > 0 else 0.0,
+            "ttft": distribution(ttfts),
+            "latency": distribution(latencies),
+            "schedule_lag_p99": percentile([r.lag for r in self.results], 99),
+            "errors": dict(Counter(r.error for r in self.results if r.error is not None)),
+        }
+
+    def summary(self) -> str:
+        data = self.to_dict()
+
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.0f}ms"
+
+        lines = [
+            f"{data['requests']} requests in {data['duration']:.1f}s: "
+            f"{data['completed']} ok, {data['failed']} failed, {data['throughput']:.1f} req/s",
+        ]
+        for name in ("ttft", "latency"):
+            d = data[name]
+            lines.append(
+                f"{name:8s} p50 {ms(d['p50'])}  p95 {ms(d['p95'])}  p99 {ms(d['p99'])}  max {ms(d['max'])}"
+            )
+        if data["errors"]:
+            lines.append("errors   " + ", ".join(f"{k}: {v}" for k, v in sorted(data["errors"].items())))
+        return "\n".join(lines)
+
+class LoadGenerator:
+    """Drives a provider or Router with requests at scheduled arrival times."""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        model: Optional[str] = None,
+        speed: float = 1.0,
+        timeout: Optional[float] = None
+    ):
+        """Initialize the load generator.
+
+        Args:
+            provider: Provider or Router to send requests to
+            model: Model for arrivals that do not set one
+            speed: Arrival time multiplier (2.0 replays a trace twice as fast)
+            timeout: Seconds after which a request counts as failed
+        """
+        self.provider = provider
+        self.model = model
+        self.speed = speed
+        self.timeout = timeout
+
+    async def _send(self, arrival: Arrival, offset: float, scheduled: float) -> RequestResult:
+        start = time.perf_counter()
+        result = RequestResult(at=arrival.at, offset=offset, lag=start - scheduled, latency=0.0)
+        messages = [Message(role="user", content=make_prompt(arrival.prompt_tokens))]
+        model = arrival.model or self.model
+
+        async def request() -> None:
+            response = await self.provider.chat(messages, model=model, stream=arrival.stream, **arrival.params)
+            if not arrival.stream:
+                return
+            async for chunk in response:
+                # Empty chunks, such as OpenAI's opening role delta, carry no token yet
+                if result.ttft is None and chunk.message.content:
+                    result.ttft = time.perf_counter() - start
+                result.chunks += 1
+
+        try:
+            await asyncio.wait_for(request(), self.timeout)
+        except Exception as e:
+            result.error = _error_name(e)
+        result.latency = time.perf_counter() - start
+        return result
+
+    async def run(self, arrivals: Iterable[Arrival]) -> LoadReport:
+        """Send every arrival at its scheduled time and wait for all responses.
+
+        Args:
+            arrivals: Arrivals in order of their ``at`` time
+
+        Returns:
+            The report of the run
+        """
+        started = time.perf_counter()
+        tasks = []
+        for arrival in arrivals:
+            offset = arrival.at / self.speed
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._send(arrival, offset, scheduled)))
+        results = await asyncio.gather(*tasks)
+        return LoadReport(list(results), time.perf_counter() - started)
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m simplemodelrouter.loadgen",
+        description="Send open-loop load to a provider or Router and report latencies."
+    )
+    parser.add_argument("--provider", default="ollama", help=f"one of {', '.join(available_providers())}")
+    parser.add_argument("--base-url", action="append", default=[],
+                        help="API base URL; repeat to route between several nodes with the Router")
+    parser.add_argument("--api-key", help="API key, defaults to $<PROVIDER>_API_KEY")
+    parser.add_argument("--model", help="model for arrivals that do not set one")
+    parser.add_argument("--cassette", help="replay responses from a cassette instead of the network")
+    parser.add_argument("--cassette-speed", type=float, default=1.0, help="cassette timing multiplier")
+    arrivals = parser.add_mutually_exclusive_group(required=True)
+    arrivals.add_argument("--rate", type=float, help="Poisson arrivals per second")
+    arrivals.add_argument("--trace", help="JSONL trace of arrivals")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of Poisson arrivals")
+    parser.add_argument("--prompt-tokens", type=int, default=128, help="prompt size of Poisson arrivals")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True,
+                        help="stream Poisson arrivals' responses")
+    parser.add_argument("--seed", type=int, help="random seed for Poisson arrivals")
+    parser.add_argument("--speed", type=float, default=1.0, help="arrival time multiplier")
+    parser.add_argument("--timeout", type=float, help="seconds after which a request fails")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        schedule: Iterable[Arrival] = load_trace(args.trace)
+    else:
+        schedule = poisson_arrivals(
+            args.rate, args.duration, prompt_tokens=args.prompt_tokens, stream=args.stream, seed=args.seed
+        )
+
+    kwargs: Dict[str, Any] = {}
+    api_key = args.api_key or os.environ.get(f"{args.provider.upper()}_API_KEY")
+    if api_key:
+        kwargs["api_key"] = api_key
+    if args.model:
+        kwargs["default_model"] = args.model
+
+    def make_provider(base_url: Optional[str]) -> LLMProvider:
+        options = dict(kwargs)
+        if base_url:
+            options["base_url"] = base_url
+        if args.cassette:
+            from .cassette import ReplayTransport
+
+            options["transport"] = ReplayTransport(
+                args.cassette, realtime=True, speed=args.cassette_speed, loop=True
+            )
+        return create_provider(args.provider, **options)
+
+    async def run() -> LoadReport:
+        if len(args.base_url) > 1:
+            from .router import Router
+
+            provider: LLMProvider = Router([make_provider(url) for url in args.base_url])
+        else:
+            provider = make_provider(args.base_url[0] if args.base_url else None)
+        try:
+            return await LoadGenerator(provider, args.model, args.speed, args.timeout).run(schedule)
+        finally:
+            await provider.close()
+
+    report = asyncio.run(run())
+    data = json.dumps(report.to_dict(), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+    print(report.summary(), file=sys.stderr)
+    return 1 if report.to_dict()["completed"] == 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
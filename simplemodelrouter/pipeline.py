@@ -0,0 +1,419 @@
+import copy
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .base import ChatResponse, CompletionResponse, Message
+
+Chunk = TypeVar("Chunk", ChatResponse, CompletionResponse, str)
+
+@dataclass(frozen=True)
+class Match:
+    """A pattern found in a stream."""
+    pattern: str
+    text: str
+    start: int
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class PatternMatcher:
+    """Aho-Corasick automaton over a set of literal patterns.
+
+    The automaton is built once and shared; each stream scans with its own
+    Scanner. At every position the earliest-ending match wins, and the longest
+    pattern when several end there; matches do not overlap.
+    """
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False, whole_words: bool = False):
+        """Build the automaton.
+
+        Args:
+            patterns: Literal strings to find
+            ignore_case: Whether to match regardless of case
+            whole_words: Whether matches must not be preceded or followed by a
+                letter, digit or underscore
+
+        Raises:
+            ValueError: If a pattern is empty
+        """
+        self.patterns = list(dict.fromkeys(patterns))
+        if any(not p for p in self.patterns):
+            raise ValueError("Patterns must not be empty")
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth = [0]
+        self._out = [-1]  # index of the pattern spelled by each state
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in self._fold(pattern):
+                child = self._goto[state].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[state][char] = child
+                    self._goto.append({})
+                    self._depth.append(self._depth[state] + 1)
+                    self._out.append(-1)
+                state = child
+            self._out[state] = index
+
+        self._fail = [0] * len(self._goto)
+        # Dictionary suffix links: the longest proper suffix of each state that
+        # spells a pattern, so every pattern ending at a position can be listed
+        self._link = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                suffix = self._fail[child]
+                self._link[child] = suffix if self._out[suffix] >= 0 else self._link[suffix]
+                queue.append(child)
+
+    def _fold(self, text: str) -> str:
+        """Map text to the characters the automaton runs on, keeping its length."""
+        if not self.ignore_case:
+            return text
+        folded = text.casefold()
+        if len(folded) == len(text):
+            return folded
+        return "".join(c.casefold() if len(c.casefold()) == 1 else c for c in text)
+
+    def scanner(self) -> "Scanner":
+        """Return a new scanner for one stream."""
+        return Scanner(self)
+
+class Scanner:
+    """Incremental search of one stream, keeping state across chunk boundaries.
+
+    Only the shortest suffix of the input that could still be the start of a
+    match is held back; everything before it is returned as soon as it is fed.
+    """
+
+    def __init__(self, matcher: PatternMatcher):
+        self.matcher = matcher
+        self._state = 0
+        self._held = ""
+        self._offset = 0  # stream position of the held text
+        self._previous = ""  # character before the held text
+        self._pending: Optional[Tuple[int, int, int]] = None  # whole-word match awaiting its next character
+
+    def _match(self, buffer: str, start: int, end: int, index: int) -> Match:
+        return Match(self.matcher.patterns[index], buffer[start:end], self._offset + start)
+
+    def feed(self, text: str) -> List[Union[str, Match]]:
+        """Scan a chunk.
+
+        Args:
+            text: Next chunk of the stream
+
+        Returns:
+            Released text and matches, in stream order
+        """
+        matcher = self.matcher
+        goto, fail, out, link, depth = matcher._goto, matcher._fail, matcher._out, matcher._link, matcher._depth
+        buffer = self._held + text
+        key = matcher._fold(buffer)
+        events: List[Union[str, Match]] = []
+        emitted = 0
+        state = self._state
+        pending = self._pending
+
+        for i in range(len(self._held), len(buffer)):
+            if pending is not None:
+                if _is_word(buffer[i]):
+                    pending = None
+                else:
+                    start, end, index = pending
+                    if start > emitted:
+                        events.append(buffer[emitted:start])
+                    events.append(self._match(buffer, start, end, index))
+                    emitted = end
+                    state = 0
+                    pending = None
+
+            char = key[i]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            found = state if out[state] >= 0 else link[state]
+            if not found:
+                continue
+            end = i + 1
+            if matcher.whole_words:
+                # Take the longest pattern ending here that starts on a word boundary
+                while found:
+                    start = end - depth[found]
+                    before = buffer[start - 1] if start else self._previous
+                    if not (before and _is_word(before)):
+                        pending = (start, end, out[found])
+                        break
+                    found = link[found]
+                continue
+            index = out[found]
+            start = end - depth[found]
+            if start > emitted:
+                events.append(buffer[emitted:start])
+            events.append(self._match(buffer, start, end, index))
+            emitted = end
+            state = 0
+
+        keep = len(buffer) - depth[state]
+        if pending is not None:
+            keep = min(keep, pending[0])
+            pending = (pending[0] - keep, pending[1] - keep, pending[2])
+        keep = max(keep, emitted)
+        if keep > emitted:
+            events.append(buffer[emitted:keep])
+        if keep:
+            self._previous = buffer[keep - 1]
+        self._held = buffer[keep:]
+        self._offset += keep
+        self._state = state
+        self._pending = pending
+        return events
+
+    def flush(self) -> List[Union[str, Match]]:
+        """End the stream, releasing held text and any match awaiting confirmation."""
+        events: List[Union[str, Match]] = []
+        held = self._held
+        if self._pending is not None:
+            start, end, index = self._pending
+            if start:
+                events.append(held[:start])
+            events.append(self._match(held, start, end, index))
+            held = held[end:]
+        if held:
+            events.append(held)
+        self._offset += len(self._held)
+        self._held = ""
+        self._state = 0
+        self._pending = None
+        return events
+
+class Stage(ABC):
+    """One step of a StreamPipeline, transforming text as it streams.
+
+    Stages hold per-stream state; a pipeline runs a ``fork()`` of each stage
+    for every stream. Setting ``stopped`` ends the stream.
+    """
+
+    stopped = False
+
+    @abstractmethod
+    def feed(self, text: str) -> str:
+        """Transform the next chunk of text, returning the text to release."""
+        pass
+
+    def flush(self) -> str:
+        """Release any held text at the end of the stream."""
+        return ""
+
+    def reset(self) -> None:
+        """Clear per-stream state."""
+        self.stopped = False
+
+    def fork(self) -> "Stage":
+        """Return a copy of the stage with fresh per-stream state."""
+        stage = copy.copy(self)
+        stage.reset()
+        return stage
+
+class MatchStage(Stage):
+    """Stage acting on the patterns a PatternMatcher finds."""
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False, whole_words: bool = False):
+        """Initialize the stage.
+
+        Args:
+            patterns: Literal strings to find
+            ignore_case: Whether to match regardless of case
+            whole_words: Whether to only match whole words
+        """
+        self.matcher = PatternMatcher(patterns, ignore_case, whole_words)
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self._scanner = self.matcher.scanner()
+
+    @abstractmethod
+    def on_match(self, match: Match) -> str:
+        """Return the text to release in place of a match."""
+        pass
+
+    def _release(self, events: List[Union[str, Match]]) -> str:
+        parts = []
+        for event in events:
+            if self.stopped:
+                break
+            parts.append(event if isinstance(event, str) else self.on_match(event))
+        return "".join(parts)
+
+    def feed(self, text: str) -> str:
+        if self.stopped:
+            return ""
+        return self._release(self._scanner.feed(text))
+
+    def flush(self) -> str:
+        if self.stopped:
+            return ""
+        return self._release(self._scanner.flush())
+
+class StopStage(MatchStage):
+    """End the stream at the first stop sequence."""
+
+    def __init__(self, stop: Iterable[str], include: bool = False):
+        """Initialize the stage.
+
+        Args:
+            stop: Stop sequences
+            include: Whether to release the stop sequence itself
+        """
+        self.include = include
+        super().__init__(stop)
+
+    def on_match(self, match: Match) -> str:
+        self.stopped = True
+        return match.text if self.include else ""
+
+class ReplaceStage(MatchStage):
+    """Replace every occurrence of a set of patterns."""
+
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        replacement: Union[str, Callable[[Match], str]],
+        ignore_case: bool = False,
+        whole_words: bool = False
+    ):
+        """Initialize the stage.
+
+        Args:
+            patterns: Literal strings to replace
+            replacement: Replacement text, or a function of the match returning it
+            ignore_case: Whether to match regardless of case
+            whole_words: Whether to only match whole words
+        """
+        self.replacement = replacement
+        super().__init__(patterns, ignore_case, whole_words)
+
+    def on_match(self, match: Match) -> str:
+        if isinstance(self.replacement, str):
+            return self.replacement
+        return self.replacement(match)
+
+class RedactStage(ReplaceStage):
+    """Redact secrets, such as API keys, from a stream."""
+
+    def __init__(self, secrets: Iterable[str], replacement: str = "[REDACTED]"):
+        super().__init__(secrets, replacement)
+
+class ProfanityStage(ReplaceStage):
+    """Mask listed words, case-insensitively and only as whole words."""
+
+    def __init__(self, words: Iterable[str], mask: str = "*"):
+        super().__init__(words, lambda match: mask * len(match.text), ignore_case=True, whole_words=True)
+
+def _text(chunk: Chunk) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, ChatResponse):
+        return chunk.message.content
+    return chunk.text
+
+def _with_text(chunk: Chunk, text: str, **changes) -> Chunk:
+    if isinstance(chunk, str):
+        return text
+    if isinstance(chunk, ChatResponse):
+        return replace(chunk, message=Message(role=chunk.message.role, content=text), **changes)
+    return replace(chunk, text=text, **changes)
+
+class StreamPipeline:
+    """Composable text stages applied to streamed responses.
+
+    Each stage sees the output of the previous one, chunk by chunk, and
+    releases text as early as it can. Chunks whose text is held back entirely
+    are skipped, and held text is released in a final chunk when the stream
+    ends. Chunks without text, such as a trailing usage chunk, are passed on
+    after the text that preceded them. When a stage stops the stream, the
+    upstream is closed.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        """Initialize the pipeline.
+
+        Args:
+            stages: Stages to apply, in order
+        """
+        self.stages = list(stages)
+
+    @staticmethod
+    def _feed(stages: List[Stage], text: str) -> Tuple[str, bool]:
+        """Run text through the stages, returning the output and whether a stage stopped."""
+        for i, stage in enumerate(stages):
+            text = stage.feed(text)
+            if stage.stopped:
+                for later in stages[i + 1:]:
+                    text = later.feed(text) + later.flush()
+                return text, True
+        return text, False
+
+    @staticmethod
+    def _flush(stages: List[Stage]) -> str:
+        text = ""
+        for stage in stages:
+            text = stage.feed(text) + stage.flush()
+        return text
+
+    def process(self, text: str) -> str:
+        """Apply the pipeline to a complete text."""
+        stages = [stage.fork() for stage in self.stages]
+        text, stopped = self._feed(stages, text)
+        return text if stopped else text + self._flush(stages)
+
+    async def apply(self, stream: AsyncIterator[Chunk]) -> AsyncIterator[Chunk]:
+        """Apply the pipeline to a stream of ChatResponse, CompletionResponse or text chunks.
+
+        Args:
+            stream: Upstream stream; it is closed when a stage stops
+
+        Yields:
+            Chunks of the same type with transformed text
+        """
+        stages = [stage.fork() for stage in self.stages]
+        last: Optional[Chunk] = None
+        deferred: List[Chunk] = []  # textless chunks that may follow held text
+        async with aclosing(stream):
+            async for chunk in stream:
+                text = _text(chunk)
+                if not text:
+                    if last is None:
+                        yield chunk
+                    else:
+                        deferred.append(chunk)
+                    continue
+                last = chunk
+                text, stopped = self._feed(stages, text)
+                if text:
+                    yield _with_text(chunk, text)
+                if text or stopped:
+                    for held in deferred:
+                        yield held
+                    deferred.clear()
+                if stopped:
+                    return
+
+        text = self._flush(stages)
+        if text and last is not None:
+            yield _with_text(last, text, usage={})
+        for held in deferred:
+            yield held
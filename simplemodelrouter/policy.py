@@ -0,0 +1,214 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+
+from .base import Message
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """Registry entry describing a model's price, context window and capabilities."""
+    name: str
+    provider: str
+    input_price: float  # USD per million input tokens
+    output_price: float  # USD per million output tokens
+    context_window: int
+    capabilities: FrozenSet[str] = frozenset()
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Return the cost in USD of a request of the given size."""
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / 1_000_000
+
+@dataclass
+class SelectionRequest:
+    """Size and requirements of a request a model is being selected for."""
+    input_tokens: int
+    output_tokens: int
+    capabilities: FrozenSet[str] = frozenset()
+    latency_slo: Optional[float] = None  # seconds
+
+class ModelRegistry:
+    """Collection of known models keyed by name."""
+
+    def __init__(self, models: Iterable[ModelInfo] = ()):
+        self._models: Dict[str, ModelInfo] = {}
+        for model in models:
+            self.register(model)
+
+    def register(self, model: ModelInfo) -> None:
+        """Add or replace a model entry."""
+        self._models[model.name] = model
+
+    def get(self, name: str) -> Optional[ModelInfo]:
+        """Return the entry for a model name, if registered."""
+        return self._models.get(name)
+
+    def __iter__(self) -> Iterator[ModelInfo]:
+        return iter(self._models.values())
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+class LatencyStats:
+    """Online per-model latency estimates using an exponentially weighted mean."""
+
+    def __init__(self, alpha: float = 0.2):
+        """Initialize the latency tracker.
+
+        Args:
+            alpha: Weight of each new observation, between 0 and 1
+        """
+        self.alpha = alpha
+        self._estimates: Dict[str, float] = {}
+
+    def record(self, model: str, latency: float) -> None:
+        """Record an observed request latency in seconds."""
+        previous = self._estimates.get(model)
+        if previous is None:
+            self._estimates[model] = latency
+        else:
+            self._estimates[model] = previous + self.alpha * (latency - previous)
+
+    def estimate(self, model: str) -> Optional[float]:
+        """Return the current latency estimate for a model, if any."""
+        return self._estimates.get(model)
+
+class SelectionPolicy(ABC):
+    """Strategy choosing one model among the eligible candidates."""
+
+    @abstractmethod
+    def select(
+        self,
+        candidates: Sequence[ModelInfo],
+        request: SelectionRequest,
+        stats: LatencyStats
+    ) -> Optional[ModelInfo]:
+        """Pick a model for the request.
+
+        Args:
+            candidates: Models whose context window and capabilities fit the request
+            request: The request being routed
+            stats: Online latency statistics
+
+        Returns:
+            The chosen model, or None if no candidate is acceptable
+        """
+        pass
+
+class CheapestWithinSLO(SelectionPolicy):
+    """Choose the cheapest model whose latency estimate meets the SLO.
+
+    Models without latency observations are assumed to meet the SLO so that
+    they get a chance to be measured. If no model meets the SLO, the model with
+    the lowest latency estimate is chosen when ``fallback_to_fastest`` is set.
+    """
+
+    def __init__(self, fallback_to_fastest: bool = True):
+        self.fallback_to_fastest = fallback_to_fastest
+
+    def select(
+        self,
+        candidates: Sequence[ModelInfo],
+        request: SelectionRequest,
+        stats: LatencyStats
+    ) -> Optional[ModelInfo]:
+        best: Optional[ModelInfo] = None
+        best_cost = 0.0
+        fastest: Optional[ModelInfo] = None
+        fastest_latency = 0.0
+        slo = request.latency_slo
+
+        for model in candidates:
+            latency = stats.estimate(model.name)
+            if slo is not None and latency is not None and latency > slo:
+                if fastest is None or latency < fastest_latency:
+                    fastest, fastest_latency = model, latency
+                continue
+            cost = model.cost(request.input_tokens, request.output_tokens)
+            if best is None or cost < best_cost:
+                best, best_cost = model, cost
+
+        if best is None and self.fallback_to_fastest:
+            return fastest
+        return best
+
+def estimate_tokens(messages: Sequence[Message]) -> int:
+    """Roughly estimate the prompt tokens of a message list (~4 characters per token)."""
+    return sum(len(m.content) // 4 + 4 for m in messages)
+
+class PolicyEngine:
+    """Choose a model for each request from a registry using a pluggable policy."""
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        policy: Optional[SelectionPolicy] = None,
+        stats: Optional[LatencyStats] = None,
+        latency_slo: Optional[float] = None,
+        dry_run: bool = False
+    ):
+        """Initialize the policy engine.
+
+        Args:
+            registry: Models available for selection
+            policy: Selection policy, defaults to CheapestWithinSLO
+            stats: Latency statistics, shared with whatever records observations
+            latency_slo: Default latency SLO in seconds
+            dry_run: Log the policy's choice but return the caller's default model
+        """
+        self.registry = registry
+        self.policy = policy or CheapestWithinSLO()
+        self.stats = stats or LatencyStats()
+        self.latency_slo = latency_slo
+        self.dry_run = dry_run
+
+    def eligible(self, request: SelectionRequest) -> List[ModelInfo]:
+        """Return the models whose context window and capabilities fit the request."""
+        needed = request.input_tokens + request.output_tokens
+        return [
+            m for m in self.registry
+            if m.context_window >= needed and request.capabilities <= m.capabilities
+        ]
+
+    def choose(
+        self,
+        messages: Sequence[Message],
+        max_tokens: int = 256,
+        capabilities: Iterable[str] = (),
+        latency_slo: Optional[float] = None,
+        default: Optional[str] = None
+    ) -> Optional[ModelInfo]:
+        """Choose a model for a chat request.
+
+        Args:
+            messages: Messages of the request, used to estimate its size
+            max_tokens: Expected maximum output tokens
+            capabilities: Capabilities the model must have (e.g. "vision")
+            latency_slo: Latency SLO in seconds, overriding the engine default
+            default: Model to return in dry-run mode
+
+        Returns:
+            The chosen model, or None if no model is eligible. In dry-run mode the
+            registry entry for ``default`` is returned instead.
+        """
+        request = SelectionRequest(
+            input_tokens=estimate_tokens(messages),
+            output_tokens=max_tokens,
+            capabilities=frozenset(capabilities),
+            latency_slo=latency_slo if latency_slo is not None else self.latency_slo
+        )
+        choice = self.policy.select(self.eligible(request), request, self.stats)
+
+        if self.dry_run:
+            logger.info(
+                "Policy dry run: would choose %s (default %s) for %d input tokens",
+                choice.name if choice else None, default, request.input_tokens
+            )
+            return self.registry.get(default) if default else None
+        return choice
+
+    def observe(self, model: str, latency: float) -> None:
+        """Feed an observed request latency back into the latency statistics."""
+        self.stats.record(model, latency)
@@ -0,0 +1,206 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Phases of a provider request, in the order they usually happen
+PHASES = ("build", "send", "read", "decode", "construct", "yield")
+
+class PhaseTimers:
+    """Cumulative wall time spent in each phase of provider requests.
+
+    ``build`` is encoding the request body, ``send`` waiting for the response
+    headers, ``read`` waiting for the response body or the next streamed line,
+    ``decode`` parsing JSON, ``construct`` building response objects and
+    ``yield`` the time streamed chunks spend with the consumer. One instance
+    may be shared by several providers.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.counts: Dict[str, int] = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time spent in a phase."""
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def clock(self, phase: str = "build") -> "PhaseClock":
+        """Return a clock timing the phases of one request."""
+        return PhaseClock(self, phase)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return the total seconds and count of intervals per phase."""
+        return {
+            phase: {"seconds": self.seconds[phase], "count": self.counts[phase]}
+            for phase in self.seconds
+        }
+
+    def reset(self) -> None:
+        """Clear the timers."""
+        self.__init__()
+
+class PhaseClock:
+    """Stopwatch attributing the time of one request to its current phase."""
+
+    __slots__ = ("_timers", "_phase", "_start")
+
+    def __init__(self, timers: PhaseTimers, phase: str):
+        self._timers = timers
+        self._phase: Optional[str] = phase
+        self._start = time.perf_counter()
+
+    def switch(self, phase: str) -> None:
+        """End the current phase and start another."""
+        now = time.perf_counter()
+        if self._phase is not None:
+            self._timers.add(self._phase, now - self._start)
+        self._phase = phase
+        self._start = now
+
+    def stop(self) -> None:
+        """End the current phase."""
+        if self._phase is not None:
+            self._timers.add(self._phase, time.perf_counter() - self._start)
+            self._phase = None
+
+class _NullClock:
+    """Clock used when profiling is disabled."""
+
+    __slots__ = ()
+
+    def switch(self, phase: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+NULL_CLOCK = _NullClock()
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of running threads.
+
+    A background thread records the stack of every other thread each
+    ``interval`` seconds, with negligible cost to the sampled code, so it can
+    be switched on in a running process. Stacks are written in the collapsed
+    format of flamegraph.pl and speedscope: one ``frame;frame;frame count``
+    line per distinct stack, rooted at the thread name.
+    """
+
+    def __init__(self, interval: float = 0.005, all_threads: bool = False):
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            all_threads: Whether to sample every thread instead of only the
+                thread that starts the profiler, e.g. the event loop thread
+        """
+        self.interval = interval
+        self.all_threads = all_threads
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+        self._path: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the profiler is sampling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: Optional[float] = None, path: Optional[str] = None) -> None:
+        """Start sampling, discarding the samples of any earlier run.
+
+        Args:
+            duration: Seconds after which sampling stops by itself
+            path: File the collapsed stacks are written to when sampling stops
+
+        Raises:
+            RuntimeError: If the profiler is already running
+        """
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._stacks = Counter()
+        self.samples = 0
+        self._stop.clear()
+        self._path = path
+        self._target = None if self.all_threads else threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._sample, args=(duration,), name="simplemodelrouter-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampling thread to finish."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _sample(self, duration: Optional[float]) -> None:
+        own = threading.get_ident()
+        deadline = None if duration is None else time.monotonic() + duration
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self._target is not None and ident != self._target):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        if self._path is not None:
+            try:
+                self.write(self._path)
+            except OSError as e:
+                logger.warning("Failed to write profile to %s: %s", self._path, e)
+
+    def collapsed(self) -> List[str]:
+        """Return the sampled stacks in collapsed format, most frequent first."""
+        return [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+
+    def write(self, path: str) -> int:
+        """Write the collapsed stacks to a file and return the number of lines."""
+        lines = self.collapsed()
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+        return len(lines)
+
+def profile_for(
+    seconds: float,
+    path: str,
+    interval: float = 0.005,
+    all_threads: bool = False
+) -> SamplingProfiler:
+    """Sample the calling thread for a while and write a collapsed-stack file.
+
+    Returns immediately; sampling runs in the background, so this can be
+    called from a request handler or signal handler of a running service.
+
+    Args:
+        seconds: Seconds to sample for
+        path: File the collapsed stacks are written to
+        interval: Seconds between samples
+        all_threads: Whether to sample every thread
+
+    Returns:
+        The running profiler
+    """
+    profiler = SamplingProfiler(interval, all_threads)
+    profiler.start(seconds, path)
+    return profiler
@@ -1,17 +1,57 @@
 import httpx
-from typing import AsyncIterator, Dict, List, Optional, Union
-import json
-
-from ..base import LLMProvider, Message, ChatResponse, CompletionResponse
-
-class AnthropicProvider(LLMProvider):
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from ..base import Message, ChatResponse, CompletionResponse
+from ..codec import get_codec
+from ..conversation import Conversation
+from ..deadline import Deadline, DeadlineLike
+from ..profiling import NULL_CLOCK, PhaseClock
+from .http import HTTPProvider, TimeoutTypes
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+def _split_system(
+    conversation: Conversation
+) -> Tuple[List[Dict[str, Any]], Union[Conversation, List[Dict[str, Any]]]]:
+    """Split a conversation into the Messages API's ``system`` blocks and ``messages``.
+
+    Leading system messages become text blocks of the top-level ``system``
+    field, which is where the API takes them. When the conversation has a
+    stable prefix, its last block or message gets a cache breakpoint.
+
+    Returns:
+        The system blocks and the remaining messages
+    """
+    count = 0
+    while count < len(conversation) and conversation[count].role == "system":
+        count += 1
+    system = [{"type": "text", "text": m.content} for m in conversation[:count]]
+    rest = conversation[count:]
+
+    prefix = min(conversation.cache_prefix, len(conversation))
+    if prefix and prefix <= count:
+        system[prefix - 1]["cache_control"] = _EPHEMERAL
+    elif prefix:
+        index = prefix - count - 1
+        messages = [m.to_dict() for m in rest]
+        messages[index]["content"] = [
+            {"type": "text", "text": rest[index].content, "cache_control": _EPHEMERAL}
+        ]
+        return system, messages
+    return system, rest
+
+class AnthropicProvider(HTTPProvider):
     """Anthropic API provider implementation."""
 
     def __init__(
         self,
         api_key: str,
         base_url: Optional[str] = "https://api.anthropic.com/v1",
-        default_model: Optional[str] = "claude-3-opus-20240229"
+        default_model: Optional[str] = "claude-3-opus-20240229",
+        timeout: TimeoutTypes = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        uds: Optional[str] = None
     ):
         """Initialize the Anthropic provider.
 
@@ -19,56 +59,73 @@ class AnthropicProvider(LLMProvider):
             api_key: Anthropic API key
             base_url: Optional API base URL override
             default_model: Default model to use
+            timeout: Default request timeout in seconds, or an ``httpx.Timeout``
+            transport: Optional httpx transport, e.g. to replay recorded cassettes
+            uds: Optional Unix domain socket path of a server on the same host
         """
-        super().__init__(api_key, base_url, default_model)
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
+        super().__init__(
+            api_key,
+            base_url,
+            default_model,
             headers={
-                "x-api-key": self.api_key,
+                "x-api-key": api_key,
                 "anthropic-version": "2023-06-01",
                 "Content-Type": "application/json"
-            }
+            },
+            timeout=timeout,
+            transport=transport,
+            uds=uds
         )
 
     async def chat(
         self,
-        messages: List[Message],
+        messages: Union[List[Message], Conversation],
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
         """Send a chat request to Anthropic."""
-        model = model or self.default_model
+        model = self._resolve_model(model)
+        deadline = Deadline.coerce(deadline)
+        system, conversation = _split_system(Conversation.coerce(messages))
 
         payload = {
             "model": model,
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": conversation,
             "temperature": temperature,
-            "stream": stream,
-            **kwargs
+            "stream": stream
         }
+        if system:
+            payload["system"] = system
+        payload.update(kwargs)
 
         if stream:
-            return self._stream_chat(payload)
-
-        async with self._client as client:
-            response = await client.post("/messages", json=payload)
-            response.raise_for_status()
-            data = response.json()
-
-            return ChatResponse(
-                message=Message(
-                    role="assistant",
-                    content=data["content"][0]["text"]
-                ),
-                model=data["model"],
-                usage={
-                    "prompt_tokens": data.get("usage", {}).get("input_tokens", 0),
-                    "completion_tokens": data.get("usage", {}).get("output_tokens", 0),
-                    "total_tokens": data.get("usage", {}).get("total_tokens", 0)
-                }
-            )
+            return self._stream(self._stream_chat, payload, deadline)
+
+        clock = self._clock()
+        data = await self._post("/messages", payload, deadline, clock)
+        clock.switch("construct")
+        response = self._parse_chat(data)
+        clock.stop()
+        return response
+
+    @staticmethod
+    def _parse_chat(data: Dict) -> ChatResponse:
+        """Build a ChatResponse from a Messages API response body."""
+        return ChatResponse(
+            message=Message(
+                role="assistant",
+                content=data["content"][0]["text"]
+            ),
+            model=data["model"],
+            usage={
+                "prompt_tokens": data.get("usage", {}).get("input_tokens", 0),
+                "completion_tokens": data.get("usage", {}).get("output_tokens", 0),
+                "total_tokens": data.get("usage", {}).get("total_tokens", 0)
+            }
+        )
 
     async def complete(
         self,
@@ -76,6 +133,7 @@ class AnthropicProvider(LLMProvider):
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
         """Send a completion request to Anthropic."""
@@ -86,17 +144,19 @@ class AnthropicProvider(LLMProvider):
             model=model,
             temperature=temperature,
             stream=stream,
+            deadline=deadline,
             **kwargs
         )
 
         if stream:
             async def convert_stream():
-                async for chunk in chat_response:
-                    yield CompletionResponse(
-                        text=chunk.message.content,
-                        model=chunk.model,
-                        usage=chunk.usage
-                    )
+                async with aclosing(chat_response):
+                    async for chunk in chat_response:
+                        yield CompletionResponse(
+                            text=chunk.message.content,
+                            model=chunk.model,
+                            usage=chunk.usage
+                        )
             return convert_stream()
         else:
             return CompletionResponse(
@@ -105,34 +165,48 @@ class AnthropicProvider(LLMProvider):
                 usage=chat_response.usage
             )
 
-    async def _stream_chat(self, payload: Dict) -> AsyncIterator[ChatResponse]:
+    async def _stream_chat(
+        self,
+        payload: Dict,
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[ChatResponse]:
         """Handle streaming chat responses."""
-        async with self._client as client:
-            async with client.stream("POST", "/messages", json=payload) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        if line.strip() == "data: [DONE]":
-                            break
-
-                        data = json.loads(line[6:])
-                        if "delta" not in data:
-                            continue
-
-                        delta = data["delta"]
-                        if "text" not in delta:
-                            continue
-
-                        yield ChatResponse(
-                            message=Message(
-                                role="assistant",
-                                content=delta["text"]
-                            ),
-                            model=data["model"],
-                            usage={}  # Usage stats only available at end of stream
-                        )
+        decode = get_codec().decode
+        usage: Dict[str, int] = {}
+        async with aclosing(self._stream_lines("/messages", payload, deadline, clock)) as lines:
+            async for line in lines:
+                if line.startswith("data: "):
+                    if line.strip() == "data: [DONE]":
+                        break
+
+                    data = decode(line[6:])
+                    clock.switch("construct")
+                    if data.get("type") == "message_start":
+                        usage["prompt_tokens"] = data["message"].get("usage", {}).get("input_tokens", 0)
+                    elif data.get("type") == "message_delta":
+                        usage["completion_tokens"] = data.get("usage", {}).get("output_tokens", 0)
+                    if "delta" not in data:
+                        continue
+
+                    delta = data["delta"]
+                    if "text" not in delta:
+                        continue
+
+                    yield ChatResponse(
+                        message=Message(
+                            role="assistant",
+                            content=delta["text"]
+                        ),
+                        model=data.get("model", payload["model"]),
+                        usage={}  # Usage stats only available at end of stream
+                    )
 
-    async def close(self) -> None:
-        """Close the HTTP client."""
-        await self._client.aclose()
\ No newline at end of file
+        if usage:
+            # Final chunk carries the usage reported in message_start/message_delta
+            usage["total_tokens"] = usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+            yield ChatResponse(
+                message=Message(role="assistant", content=""),
+                model=payload["model"],
+                usage=usage
+            )
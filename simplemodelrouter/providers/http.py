@@ -0,0 +1,351 @@
+import asyncio
+import logging
+import time
+import httpx
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar, Union
+
+from ..base import LLMProvider
+from ..catalog import CatalogModel, ModelCatalog, known_context_window
+from ..codec import get_codec
+from ..conversation import aiter_encode_body, body_size_hint, encode_body
+from ..deadline import Deadline
+from ..profiling import NULL_CLOCK, PhaseClock, PhaseTimers
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TimeoutTypes = Union[float, httpx.Timeout, None]
+
+class HTTPProvider(LLMProvider):
+    """Base class for providers that talk to an HTTP API through httpx."""
+
+    # Cheap GET used to open and keep alive pooled connections
+    warmup_path = "/models"
+
+    # Bodies with more message content than this many characters are streamed
+    # to the server in chunks instead of being encoded in full; None disables
+    stream_body_threshold: Optional[int] = 1 << 20
+
+    # Per-phase request timers; None while profiling is disabled
+    profile: Optional[PhaseTimers] = None
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str],
+        default_model: Optional[str],
+        headers: Dict[str, str],
+        timeout: TimeoutTypes = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        uds: Optional[str] = None
+    ):
+        """Initialize the HTTP client shared by all requests of the provider.
+
+        Args:
+            api_key: API key for authentication
+            base_url: API base URL
+            default_model: Default model to use
+            headers: Headers sent with every request
+            timeout: Default timeout in seconds, or an ``httpx.Timeout``
+            transport: Optional httpx transport to send requests through, e.g.
+                ``httpx.ASGITransport(app)`` to call an in-process ASGI app
+            uds: Optional Unix domain socket path to connect to instead of the
+                base URL's host and port
+
+        Raises:
+            ValueError: If both ``transport`` and ``uds`` are given
+        """
+        super().__init__(api_key, base_url, default_model)
+        if uds is not None:
+            if transport is not None:
+                raise ValueError("Pass either transport or uds, not both")
+            transport = httpx.AsyncHTTPTransport(uds=uds)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=transport
+        )
+        self._keep_warm_task: Optional[asyncio.Task] = None
+        self.catalog: Optional[ModelCatalog] = None
+
+    async def list_models(self) -> List[CatalogModel]:
+        """List the models the API serves, from its OpenAI-style ``/models`` endpoint."""
+        data = await self._get("/models")
+        return [
+            CatalogModel(
+                m["id"],
+                m.get("context_window") or m.get("context_length") or m.get("max_model_len")
+                or known_context_window(m["id"])
+            )
+            for m in data.get("data", [])
+        ]
+
+    @staticmethod
+    def _normalize_model(name: str) -> str:
+        """Canonical form of a model name, used to match it against the catalog."""
+        return name
+
+    def enable_catalog(
+        self,
+        refresh_interval: float = 300.0,
+        aliases: Optional[Dict[str, str]] = None
+    ) -> ModelCatalog:
+        """Validate and alias-resolve model names locally against a cached catalog.
+
+        Once the catalog has loaded, requests for models the provider does not
+        list fail immediately with UnknownModelError instead of after a round
+        trip. The catalog is refreshed in the background when it is older than
+        ``refresh_interval``, never on the request path.
+
+        Args:
+            refresh_interval: Seconds after which the catalog is refreshed
+            aliases: Alternative names mapped to model names
+
+        Returns:
+            The provider's catalog; ``await catalog.refresh()`` loads it eagerly
+        """
+        self.catalog = ModelCatalog(
+            self.list_models,
+            provider=self.name,
+            refresh_interval=refresh_interval,
+            aliases=aliases,
+            normalize=self._normalize_model
+        )
+        return self.catalog
+
+    def _resolve_model(self, model: Optional[str]) -> str:
+        """The model to request: the default if none is given, resolved against the catalog."""
+        model = model or self.default_model
+        if self.catalog is not None:
+            model = self.catalog.resolve(model)
+        return model
+
+    def enable_profiling(self, timers: Optional[PhaseTimers] = None) -> PhaseTimers:
+        """Time the phases of every request: build, send, read, decode, construct and yield.
+
+        Args:
+            timers: Timers to accumulate into, e.g. shared by several providers
+
+        Returns:
+            The timers; ``snapshot()`` reports the cumulative time per phase
+        """
+        self.profile = timers if timers is not None else PhaseTimers()
+        return self.profile
+
+    def disable_profiling(self) -> None:
+        """Stop timing request phases."""
+        self.profile = None
+
+    def _clock(self) -> PhaseClock:
+        """A clock for one request, or a no-op clock if profiling is disabled."""
+        return self.profile.clock() if self.profile is not None else NULL_CLOCK
+
+    def _stream(self, stream: Callable[..., AsyncIterator[T]], *args: Any) -> AsyncIterator[T]:
+        """Start a streaming generator, timing its phases if profiling is enabled.
+
+        Args:
+            stream: Generator function taking ``*args`` and a ``clock`` keyword
+            *args: Arguments for the generator function
+        """
+        if self.profile is None:
+            return stream(*args, clock=NULL_CLOCK)
+        return self._profiled_stream(stream, args)
+
+    async def _profiled_stream(self, stream: Callable[..., AsyncIterator[T]], args: tuple) -> AsyncIterator[T]:
+        clock = self._clock()
+        chunks = stream(*args, clock=clock)
+        try:
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    clock.switch("yield")
+                    yield chunk
+        finally:
+            clock.stop()
+
+    def _timeout(self, deadline: Optional[Deadline]) -> httpx.Timeout:
+        """Per-request timeouts with every phase bounded by the deadline."""
+        default = self._client.timeout
+        if deadline is None:
+            return default
+        connect = deadline.connect if deadline.connect is not None else default.connect
+        return httpx.Timeout(
+            connect=deadline.cap(connect),
+            read=deadline.cap(default.read),
+            write=deadline.cap(default.write),
+            pool=deadline.cap(default.pool)
+        )
+
+    def _content(self, payload: Dict[str, Any]) -> Union[bytes, AsyncIterator[bytes]]:
+        """Encode a request body, streaming it when its messages are large.
+
+        A streamed body is sent with chunked transfer encoding and never held
+        in memory as a whole, which caps the memory used per request.
+        """
+        threshold = self.stream_body_threshold
+        if threshold is not None and body_size_hint(payload) > threshold:
+            return aiter_encode_body(payload)
+        return encode_body(payload)
+
+    async def _post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> Any:
+        """POST a JSON payload and return the decoded JSON response.
+
+        A Conversation in the payload's ``messages`` is spliced in pre-encoded.
+        """
+        request = self._client.build_request(
+            "POST", path, content=self._content(payload), timeout=self._timeout(deadline)
+        )
+        clock.switch("send")
+
+        async def send() -> httpx.Response:
+            response = await self._client.send(request, stream=True)
+            clock.switch("read")
+            try:
+                await response.aread()
+            except BaseException:
+                await response.aclose()
+                raise
+            return response
+
+        if deadline is None:
+            response = await send()
+        else:
+            response = await deadline.wait(send())
+        response.raise_for_status()
+        clock.switch("decode")
+        return get_codec().decode(response.content)
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a request with the provider's client and raise on error statuses."""
+        response = await self._client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def _get(self, path: str) -> Any:
+        """GET a path and return the decoded JSON response."""
+        response = await self._request("GET", path)
+        return get_codec().decode(response.content)
+
+    async def _get_lines(self, path: str) -> AsyncIterator[str]:
+        """GET a path and yield the response body line by line."""
+        async with self._client.stream("GET", path) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                yield line
+
+    async def _stream_lines(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[str]:
+        """POST a JSON payload and yield the streamed response line by line.
+
+        The response is closed as soon as the stream is exhausted, the deadline
+        expires or the consumer stops iterating, so the upstream connection is
+        not left generating tokens nobody reads.
+        """
+        request = self._client.build_request(
+            "POST", path, content=self._content(payload), timeout=self._timeout(deadline)
+        )
+        clock.switch("send")
+        send = self._client.send(request, stream=True)
+        if deadline is None:
+            response = await send
+        else:
+            response = await deadline.wait(send, deadline.ttft_remaining())
+
+        try:
+            response.raise_for_status()
+            clock.switch("read")
+            lines = response.aiter_lines()
+            if deadline is not None:
+                lines = deadline.iterate(lines)
+            async with aclosing(lines):
+                async for line in lines:
+                    clock.switch("decode")
+                    yield line
+                    clock.switch("read")
+        finally:
+            await response.aclose()
+
+    async def warmup(self, connections: int = 1) -> Dict[str, Any]:
+        """Open pooled connections ahead of traffic.
+
+        Sends ``connections`` concurrent requests to ``warmup_path`` so that
+        each opens its own connection, paying DNS, TCP and TLS setup now
+        rather than on the first real requests. One more request then measures
+        the latency over an already open connection. Error statuses are
+        ignored, since any response leaves the connection open.
+
+        Args:
+            connections: Number of connections to open, at most the client's
+                keep-alive pool size
+
+        Returns:
+            Dict with the mean ``cold`` latency of the opening requests, the
+            ``warm`` latency of the follow-up request, in seconds, and the
+            number of requests that failed to connect as ``errors``
+        """
+        async def timed_get() -> Optional[float]:
+            start = time.perf_counter()
+            try:
+                response = await self._client.get(self.warmup_path)
+                await response.aclose()
+            except httpx.TransportError as e:
+                logger.warning("Failed to warm up connection to %s: %s", self.base_url, e)
+                return None
+            return time.perf_counter() - start
+
+        cold = await asyncio.gather(*(timed_get() for _ in range(connections)))
+        opened = [latency for latency in cold if latency is not None]
+        warm = await timed_get() if opened else None
+        return {
+            "connections": len(opened),
+            "cold": sum(opened) / len(opened) if opened else None,
+            "warm": warm,
+            "errors": connections - len(opened),
+        }
+
+    def start_keep_warm(self, interval: float = 4.0, connections: int = 1) -> None:
+        """Keep pooled connections open by warming them up periodically.
+
+        Args:
+            interval: Seconds between warmups; keep it below the pool's
+                keep-alive expiry (5 seconds in httpx by default)
+            connections: Number of connections to keep open
+        """
+        if self._keep_warm_task is None or self._keep_warm_task.done():
+            self._keep_warm_task = asyncio.create_task(self._keep_warm(interval, connections))
+
+    async def stop_keep_warm(self) -> None:
+        """Stop the background keep-warm task."""
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            try:
+                await self._keep_warm_task
+            except asyncio.CancelledError:
+                pass
+            self._keep_warm_task = None
+
+    async def _keep_warm(self, interval: float, connections: int) -> None:
+        """Background loop warming connections until cancelled."""
+        while True:
+            await self.warmup(connections)
+            await asyncio.sleep(interval)
+
+    async def close(self) -> None:
+        """Stop background tasks and close the HTTP client."""
+        await self.stop_keep_warm()
+        if self.catalog is not None:
+            await self.catalog.stop()
+        await self._client.aclose()
@@ -1,17 +1,49 @@
+import asyncio
 import httpx
-from typing import AsyncIterator, Dict, List, Optional, Union
-import json
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
 
-from ..base import LLMProvider, Message, ChatResponse, CompletionResponse
+from ..base import Message, ChatResponse, CompletionResponse
+from ..catalog import CatalogModel
+from ..codec import get_codec
+from ..conversation import Conversation
+from ..deadline import Deadline, DeadlineLike
+from ..profiling import NULL_CLOCK, PhaseClock
+from .http import HTTPProvider, TimeoutTypes
 
-class OllamaProvider(LLMProvider):
+logger = logging.getLogger(__name__)
+
+KeepAlive = Union[str, int]
+
+def _canonical_model(name: str) -> str:
+    """Return the model name with an explicit tag (Ollama defaults to ``latest``)."""
+    return name if ":" in name else f"{name}:latest"
+
+def _usage(data: Dict[str, Any]) -> Dict[str, int]:
+    """Extract token usage from an Ollama response."""
+    prompt_tokens = data.get("prompt_eval_count", 0)
+    completion_tokens = data.get("eval_count", 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+class OllamaProvider(HTTPProvider):
     """Ollama API provider implementation."""
 
+    warmup_path = "/api/tags"
+
     def __init__(
         self,
         api_key: str = "",  # Ollama doesn't use API keys by default
         base_url: Optional[str] = "http://localhost:11434",
-        default_model: Optional[str] = "llama2"
+        default_model: Optional[str] = "llama2",
+        keep_alive: Optional[KeepAlive] = None,
+        timeout: TimeoutTypes = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        uds: Optional[str] = None
     ):
         """Initialize the Ollama provider.
 
@@ -19,54 +51,178 @@ class OllamaProvider(LLMProvider):
             api_key: Not used by default in Ollama
             base_url: Optional API base URL override
             default_model: Default model to use
+            keep_alive: Default ``keep_alive`` sent with every request (e.g. "10m",
+                seconds as an int, or -1 to keep models loaded indefinitely)
+            timeout: Default request timeout in seconds, or an ``httpx.Timeout``
+            transport: Optional httpx transport, e.g. to replay recorded cassettes
+            uds: Optional Unix domain socket path of a server on the same host
         """
-        super().__init__(api_key, base_url, default_model)
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers={"Content-Type": "application/json"}
+        super().__init__(
+            api_key,
+            base_url,
+            default_model,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+            transport=transport,
+            uds=uds
         )
+        self.keep_alive = keep_alive
+        self._keep_alive: Dict[str, KeepAlive] = {}
+        self._loaded: Dict[str, Dict[str, Any]] = {}
+        self._available: Set[str] = set()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def set_keep_alive(self, model: str, keep_alive: Optional[KeepAlive]) -> None:
+        """Set the ``keep_alive`` value sent with requests for a model.
+
+        Args:
+            model: Model name
+            keep_alive: Keep-alive duration, or None to fall back to the default
+        """
+        model = _canonical_model(model)
+        if keep_alive is None:
+            self._keep_alive.pop(model, None)
+        else:
+            self._keep_alive[model] = keep_alive
+
+    def get_keep_alive(self, model: str) -> Optional[KeepAlive]:
+        """Return the effective ``keep_alive`` value for a model."""
+        return self._keep_alive.get(_canonical_model(model), self.keep_alive)
+
+    @property
+    def loaded_models(self) -> List[str]:
+        """Models currently resident in memory on the Ollama node."""
+        return list(self._loaded)
+
+    @property
+    def available_models(self) -> List[str]:
+        """Models pulled on the Ollama node, as of the last refresh."""
+        return sorted(self._available)
+
+    def is_loaded(self, model: Optional[str] = None) -> bool:
+        """Return True if the model is known to be resident on this node."""
+        model = model or self.default_model
+        return model is not None and _canonical_model(model) in self._loaded
+
+    async def refresh_models(self) -> None:
+        """Refresh the loaded and available model views from ``/api/ps`` and ``/api/tags``."""
+        ps, tags = await asyncio.gather(
+            self._client.get("/api/ps"),
+            self._client.get("/api/tags")
+        )
+        ps.raise_for_status()
+        tags.raise_for_status()
+        decode = get_codec().decode
+        self._loaded = {
+            _canonical_model(m["name"]): m for m in decode(ps.content).get("models", [])
+        }
+        self._available = {
+            _canonical_model(m["name"]) for m in decode(tags.content).get("models", [])
+        }
+
+    async def list_models(self) -> List[CatalogModel]:
+        """List the models pulled on the node, from ``/api/tags``."""
+        data = await self._get("/api/tags")
+        return [CatalogModel(_canonical_model(m["name"])) for m in data.get("models", [])]
+
+    _normalize_model = staticmethod(_canonical_model)
+
+    def start_polling(self, interval: float = 5.0) -> None:
+        """Poll the node's model state in the background.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_models(interval))
+
+    async def stop_polling(self) -> None:
+        """Stop background polling of the node's model state."""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+    async def _poll_models(self, interval: float) -> None:
+        """Background loop refreshing model state until cancelled."""
+        while True:
+            try:
+                await self.refresh_models()
+            except Exception:
+                # A malformed response must not end polling for good
+                logger.warning("Failed to refresh Ollama model state", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def preload(self, model: Optional[str] = None) -> None:
+        """Load a model into memory ahead of traffic.
+
+        Args:
+            model: Model to load, defaults to the provider's default model
+        """
+        model = model or self.default_model
+        payload = self._with_keep_alive({"model": model}, model)
+        await self._post("/api/generate", payload)
+        self._mark_loaded(model)
+
+    def _with_keep_alive(self, payload: Dict, model: str) -> Dict:
+        """Add the model's ``keep_alive`` setting to a payload, if any."""
+        keep_alive = self.get_keep_alive(model)
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    def _mark_loaded(self, model: str) -> None:
+        """Record that a model was just served, and is therefore resident."""
+        canonical = _canonical_model(model)
+        if str(self.get_keep_alive(model)) in ("0", "0s"):
+            self._loaded.pop(canonical, None)
+        else:
+            self._loaded.setdefault(canonical, {"name": canonical})
 
     async def chat(
         self,
-        messages: List[Message],
+        messages: Union[List[Message], Conversation],
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
         """Send a chat request to Ollama."""
-        model = model or self.default_model
+        model = self._resolve_model(model)
+        deadline = Deadline.coerce(deadline)
 
-        payload = {
+        payload = self._with_keep_alive({
             "model": model,
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": Conversation.coerce(messages),
             "stream": stream,
             "options": {
                 "temperature": temperature,
                 **kwargs
             }
-        }
+        }, model)
 
         if stream:
-            return self._stream_chat(payload)
-
-        async with self._client as client:
-            response = await client.post("/api/chat", json=payload)
-            response.raise_for_status()
-            data = response.json()
-
-            return ChatResponse(
-                message=Message(
-                    role="assistant",
-                    content=data["message"]["content"]
-                ),
-                model=model,
-                usage={
-                    "prompt_tokens": data.get("prompt_eval_count", 0),
-                    "completion_tokens": data.get("eval_count", 0),
-                    "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
-                }
-            )
+            return self._stream(self._stream_chat, payload, deadline)
+
+        clock = self._clock()
+        data = await self._post("/api/chat", payload, deadline, clock)
+        clock.switch("construct")
+        self._mark_loaded(model)
+
+        response = ChatResponse(
+            message=Message(
+                role="assistant",
+                content=data["message"]["content"]
+            ),
+            model=model,
+            usage=_usage(data)
+        )
+        clock.stop()
+        return response
 
     async def complete(
         self,
@@ -74,12 +230,14 @@ class OllamaProvider(LLMProvider):
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
         """Send a completion request to Ollama."""
-        model = model or self.default_model
+        model = self._resolve_model(model)
+        deadline = Deadline.coerce(deadline)
 
-        payload = {
+        payload = self._with_keep_alive({
             "model": model,
             "prompt": prompt,
             "stream": stream,
@@ -87,71 +245,86 @@ class OllamaProvider(LLMProvider):
                 "temperature": temperature,
                 **kwargs
             }
-        }
+        }, model)
 
         if stream:
-            return self._stream_completion(payload)
-
-        async with self._client as client:
-            response = await client.post("/api/generate", json=payload)
-            response.raise_for_status()
-            data = response.json()
-
-            return CompletionResponse(
-                text=data["response"],
-                model=model,
-                usage={
-                    "prompt_tokens": data.get("prompt_eval_count", 0),
-                    "completion_tokens": data.get("eval_count", 0),
-                    "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
-                }
-            )
-
-    async def _stream_chat(self, payload: Dict) -> AsyncIterator[ChatResponse]:
+            return self._stream(self._stream_completion, payload, deadline)
+
+        clock = self._clock()
+        data = await self._post("/api/generate", payload, deadline, clock)
+        clock.switch("construct")
+        self._mark_loaded(model)
+
+        response = CompletionResponse(
+            text=data["response"],
+            model=model,
+            usage=_usage(data)
+        )
+        clock.stop()
+        return response
+
+    async def _stream_chat(
+        self,
+        payload: Dict,
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[ChatResponse]:
         """Handle streaming chat responses."""
-        async with self._client as client:
-            async with client.stream("POST", "/api/chat", json=payload) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    data = json.loads(line)
-                    if "done" in data and data["done"]:
-                        break
-
-                    yield ChatResponse(
-                        message=Message(
-                            role="assistant",
-                            content=data["message"]["content"]
-                        ),
-                        model=payload["model"],
-                        usage={
-                            "prompt_tokens": data.get("prompt_eval_count", 0),
-                            "completion_tokens": data.get("eval_count", 0),
-                            "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
-                        }
-                    )
-
-    async def _stream_completion(self, payload: Dict) -> AsyncIterator[CompletionResponse]:
+        decode = get_codec().decode
+        async with aclosing(self._stream_lines("/api/chat", payload, deadline, clock)) as lines:
+            async for line in lines:
+                data = decode(line)
+                clock.switch("construct")
+                if "done" in data and data["done"]:
+                    self._mark_loaded(payload["model"])
+                    if "eval_count" in data:
+                        # Final chunk carries the usage for the whole stream
+                        yield ChatResponse(
+                            message=Message(role="assistant", content=""),
+                            model=payload["model"],
+                            usage=_usage(data)
+                        )
+                    break
+
+                yield ChatResponse(
+                    message=Message(
+                        role="assistant",
+                        content=data["message"]["content"]
+                    ),
+                    model=payload["model"],
+                    usage=_usage(data)
+                )
+
+    async def _stream_completion(
+        self,
+        payload: Dict,
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[CompletionResponse]:
         """Handle streaming completion responses."""
-        async with self._client as client:
-            async with client.stream("POST", "/api/generate", json=payload) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    data = json.loads(line)
-                    if "done" in data and data["done"]:
-                        break
-
-                    yield CompletionResponse(
-                        text=data["response"],
-                        model=payload["model"],
-                        usage={
-                            "prompt_tokens": data.get("prompt_eval_count", 0),
-                            "completion_tokens": data.get("eval_count", 0),
-                            "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
-                        }
-                    )
+        decode = get_codec().decode
+        async with aclosing(self._stream_lines("/api/generate", payload, deadline, clock)) as lines:
+            async for line in lines:
+                data = decode(line)
+                clock.switch("construct")
+                if "done" in data and data["done"]:
+                    self._mark_loaded(payload["model"])
+                    if "eval_count" in data:
+                        # Final chunk carries the usage for the whole stream
+                        yield CompletionResponse(
+                            text="",
+                            model=payload["model"],
+                            usage=_usage(data)
+                        )
+                    break
+
+                yield CompletionResponse(
+                    text=data["response"],
+                    model=payload["model"],
+                    usage=_usage(data)
+                )
 
     async def close(self) -> None:
-        """Close the HTTP client."""
-        await self._client.aclose()
\ No newline at end of file
+        """Stop background polling and close the HTTP client."""
+        await self.stop_polling()
+        await super().close()
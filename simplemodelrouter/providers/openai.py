@@ -1,17 +1,25 @@
 import httpx
+from contextlib import aclosing
 from typing import AsyncIterator, Dict, List, Optional, Union
-import json
 
-from ..base import LLMProvider, Message, ChatResponse, CompletionResponse
+from ..base import Message, ChatResponse, CompletionResponse
+from ..codec import get_codec
+from ..conversation import Conversation
+from ..deadline import Deadline, DeadlineLike
+from ..profiling import NULL_CLOCK, PhaseClock
+from .http import HTTPProvider, TimeoutTypes
 
-class OpenAIProvider(LLMProvider):
+class OpenAIProvider(HTTPProvider):
     """OpenAI API provider implementation."""
 
     def __init__(
         self,
         api_key: str,
         base_url: Optional[str] = "https://api.openai.com/v1",
-        default_model: Optional[str] = "gpt-3.5-turbo"
+        default_model: Optional[str] = "gpt-3.5-turbo",
+        timeout: TimeoutTypes = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        uds: Optional[str] = None
     ):
         """Initialize the OpenAI provider.
 
@@ -19,51 +27,65 @@ class OpenAIProvider(LLMProvider):
             api_key: OpenAI API key
             base_url: Optional API base URL override
             default_model: Default model to use
+            timeout: Default request timeout in seconds, or an ``httpx.Timeout``
+            transport: Optional httpx transport, e.g. to replay recorded cassettes
+            uds: Optional Unix domain socket path of a server on the same host
         """
-        super().__init__(api_key, base_url, default_model)
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
+        super().__init__(
+            api_key,
+            base_url,
+            default_model,
             headers={
-                "Authorization": f"Bearer {self.api_key}",
+                "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            timeout=60.0  # 60 second timeout for requests
+            timeout=timeout,
+            transport=transport,
+            uds=uds
         )
 
     async def chat(
         self,
-        messages: List[Message],
+        messages: Union[List[Message], Conversation],
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
         """Send a chat request to OpenAI."""
-        model = model or self.default_model
+        model = self._resolve_model(model)
+        deadline = Deadline.coerce(deadline)
 
         payload = {
             "model": model,
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": Conversation.coerce(messages),
             "temperature": temperature,
             "stream": stream,
             **kwargs
         }
 
         if stream:
-            return self._stream_chat(payload)
-
-        response = await self._client.post("/chat/completions", json=payload)
-        response.raise_for_status()
-        data = response.json()
-
+            return self._stream(self._stream_chat, payload, deadline)
+
+        clock = self._clock()
+        data = await self._post("/chat/completions", payload, deadline, clock)
+        clock.switch("construct")
+        response = self._parse_chat(data)
+        clock.stop()
+        return response
+
+    @staticmethod
+    def _parse_chat(data: Dict) -> ChatResponse:
+        """Build a ChatResponse from a chat completion response body."""
         return ChatResponse(
-                message=Message(
-                    role=data["choices"][0]["message"]["role"],
-                    content=data["choices"][0]["message"]["content"]
-                ),
-                model=data["model"],
-                usage=data["usage"]
-            )
+            message=Message(
+                role=data["choices"][0]["message"]["role"],
+                content=data["choices"][0]["message"]["content"]
+            ),
+            model=data["model"],
+            usage=data["usage"]
+        )
 
     async def complete(
         self,
@@ -71,10 +93,12 @@ class OpenAIProvider(LLMProvider):
         model: Optional[str] = None,
         temperature: float = 0.7,
         stream: bool = False,
+        deadline: DeadlineLike = None,
         **kwargs
     ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
         """Send a completion request to OpenAI."""
-        model = model or self.default_model
+        model = self._resolve_model(model)
+        deadline = Deadline.coerce(deadline)
 
         payload = {
             "model": model,
@@ -85,65 +109,86 @@ class OpenAIProvider(LLMProvider):
         }
 
         if stream:
-            return self._stream_completion(payload)
-
-        response = await self._client.post("/completions", json=payload)
-        response.raise_for_status()
-        data = response.json()
+            return self._stream(self._stream_completion, payload, deadline)
 
-        return CompletionResponse(
+        clock = self._clock()
+        data = await self._post("/completions", payload, deadline, clock)
+        clock.switch("construct")
+        response = CompletionResponse(
                 text=data["choices"][0]["text"],
                 model=data["model"],
                 usage=data["usage"]
             )
+        clock.stop()
+        return response
 
-    async def _stream_chat(self, payload: Dict) -> AsyncIterator[ChatResponse]:
+    async def _stream_chat(
+        self,
+        payload: Dict,
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[ChatResponse]:
         """Handle streaming chat responses."""
-        async with self._client.stream("POST", "/chat/completions", json=payload) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        if line.strip() == "data: [DONE]":
-                            break
-
-                        data = json.loads(line[6:])
-                        if not data["choices"]:
-                            continue
-
-                        delta = data["choices"][0]["delta"]
-                        if "content" not in delta:
-                            continue
-
-                        yield ChatResponse(
-                            message=Message(
-                                role=delta.get("role", "assistant"),
-                                content=delta["content"]
-                            ),
-                            model=data["model"],
-                            usage={}  # Usage stats only available at end of stream
-                        )
-
-    async def _stream_completion(self, payload: Dict) -> AsyncIterator[CompletionResponse]:
+        decode = get_codec().decode
+        async with aclosing(self._stream_lines("/chat/completions", payload, deadline, clock)) as lines:
+            async for line in lines:
+                if line.startswith("data: "):
+                    if line.strip() == "data: [DONE]":
+                        break
+
+                    data = decode(line[6:])
+                    clock.switch("construct")
+                    if not data["choices"]:
+                        if data.get("usage"):
+                            # Sent last when stream_options.include_usage is set
+                            yield ChatResponse(
+                                message=Message(role="assistant", content=""),
+                                model=data["model"],
+                                usage=data["usage"]
+                            )
+                        continue
+
+                    delta = data["choices"][0]["delta"]
+                    if "content" not in delta:
+                        continue
+
+                    yield ChatResponse(
+                        message=Message(
+                            role=delta.get("role", "assistant"),
+                            content=delta["content"]
+                        ),
+                        model=data["model"],
+                        usage={}  # Usage stats only available at end of stream
+                    )
+
+    async def _stream_completion(
+        self,
+        payload: Dict,
+        deadline: Optional[Deadline] = None,
+        clock: PhaseClock = NULL_CLOCK
+    ) -> AsyncIterator[CompletionResponse]:
         """Handle streaming completion responses."""
-        async with self._client.stream("POST", "/completions", json=payload) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        if line.strip() == "data: [DONE]":
-                            break
-
-                        data = json.loads(line[6:])
-                        if not data["choices"]:
-                            continue
-
-                        yield CompletionResponse(
-                            text=data["choices"][0]["text"],
-                            model=data["model"],
-                            usage={}  # Usage stats only available at end of stream
-                        )
-
-    async def close(self) -> None:
-        """Close the HTTP client."""
-        await self._client.aclose()
+        decode = get_codec().decode
+        async with aclosing(self._stream_lines("/completions", payload, deadline, clock)) as lines:
+            async for line in lines:
+                if line.startswith("data: "):
+                    if line.strip() == "data: [DONE]":
+                        break
+
+                    data = decode(line[6:])
+                    clock.switch("construct")
+                    if not data["choices"]:
+                        if data.get("usage"):
+                            # Sent last when stream_options.include_usage is set
+                            yield CompletionResponse(
+                                text="",
+                                model=data["model"],
+                                usage=data["usage"]
+                            )
+                        continue
+
+                    yield CompletionResponse(
+                        text=data["choices"][0]["text"],
+                        model=data["model"],
+                        usage={}  # Usage stats only available at end of stream
+                    )
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Generic, List, Optional,
+    Sequence, Tuple, TypeVar, Union
+)
+
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .conversation import Conversation
+from .policy import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", ChatResponse, CompletionResponse)
+
+Contender = Union[LLMProvider, Tuple[LLMProvider, str]]
+
+@dataclass
+class RaceReport:
+    """Outcome of one race.
+
+    ``ttft_saved`` compares the winner's time to first token with the best
+    historical estimate among the cancelled contenders. It is None until a
+    cancelled contender has won at least one earlier race.
+    """
+    winner: str
+    ttft: float
+    cancelled: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    ttft_saved: Optional[float] = None
+
+def _text(chunk: Union[ChatResponse, CompletionResponse]) -> str:
+    return chunk.message.content if isinstance(chunk, ChatResponse) else chunk.text
+
+class RaceStream(Generic[T]):
+    """Stream of the winning contender, carrying the race report."""
+
+    def __init__(self, leading: List[T], stream: AsyncIterator[T], report: RaceReport):
+        """Initialize the stream.
+
+        Args:
+            leading: Chunks read from the winner during the race, replayed first
+            stream: Rest of the winner's stream
+            report: Outcome of the race
+        """
+        self.report = report
+        self._leading = deque(leading)
+        self._stream = stream
+
+    def __aiter__(self) -> "RaceStream[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        if self._leading:
+            return self._leading.popleft()
+        return await self._stream.__anext__()
+
+    async def aclose(self) -> None:
+        """Close the winning stream and its connection."""
+        await self._stream.aclose()
+
+class RacingProvider(LLMProvider):
+    """Send each request to several providers and keep the first to answer.
+
+    Every request is streamed from all contenders in parallel. The first
+    contender to produce text wins; empty chunks sent before it, such as the
+    role-only delta OpenAI opens its streams with, do not count and are
+    replayed to the caller. The others are cancelled immediately, which
+    closes their streams and HTTP connections. Tokens spent by the losers up
+    to that point are still billed, so racing trades cost for latency.
+    """
+
+    def __init__(self, contenders: Sequence[Contender], alpha: float = 0.2):
+        """Initialize the racer.
+
+        Args:
+            contenders: Providers to race, each optionally paired with the model
+                to use on it. Unpaired providers use the requested model.
+            alpha: Weight of each new observation in the TTFT estimates
+        """
+        if len(contenders) < 2:
+            raise ValueError("Racing needs at least two contenders")
+        self.contenders: List[Tuple[str, LLMProvider, Optional[str]]] = []
+        for contender in contenders:
+            provider, model = contender if isinstance(contender, tuple) else (contender, None)
+            name = provider.name
+            taken = {c[0] for c in self.contenders}
+            suffix = 2
+            while name in taken:
+                name = f"{provider.name}#{suffix}"
+                suffix += 1
+            self.contenders.append((name, provider, model))
+
+        first = self.contenders[0][1]
+        super().__init__(first.api_key, first.base_url, first.default_model)
+        self.ttft = LatencyStats(alpha)
+        self.last_report: Optional[RaceReport] = None
+        self._wins = {name: 0 for name, _, _ in self.contenders}
+        self._failures = {name: 0 for name, _, _ in self.contenders}
+        self._ttft_saved = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return wins, failures and TTFT estimates per contender."""
+        return {
+            "ttft_saved": self._ttft_saved,
+            "contenders": {
+                name: {
+                    "wins": self._wins[name],
+                    "failures": self._failures[name],
+                    "ttft": self.ttft.estimate(name),
+                }
+                for name, _, _ in self.contenders
+            },
+        }
+
+    @staticmethod
+    async def _first_token(call: Awaitable[AsyncIterator[T]]) -> Tuple[AsyncIterator[T], List[T]]:
+        """Start a stream and read up to its first chunk with text.
+
+        Returns:
+            The stream and the chunks read from it, ending with the first one with text
+        """
+        stream = await call
+        leading: List[T] = []
+        try:
+            while not leading or not _text(leading[-1]):
+                leading.append(await stream.__anext__())
+            return stream, leading
+        except StopAsyncIteration:
+            raise RuntimeError("Stream ended before producing a token") from None
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    async def _race(
+        self,
+        call: Callable[[LLMProvider, Optional[str]], Awaitable[AsyncIterator[T]]]
+    ) -> RaceStream[T]:
+        """Start every contender and return the stream of the first to answer."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = {
+            asyncio.ensure_future(self._first_token(call(provider, model))): name
+            for name, provider, model in self.contenders
+        }
+        pending = set(tasks)
+        winners: List[asyncio.Task] = []
+        errors: Dict[str, BaseException] = {}
+        try:
+            while pending and not winners:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winners.append(task)
+                    else:
+                        errors[tasks[task]] = task.exception()
+            ttft = loop.time() - started
+        finally:
+            for task in pending:
+                task.cancel()
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, tuple):
+                    await result[0].aclose()  # finished before the cancellation landed
+
+        for name, error in errors.items():
+            self._failures[name] += 1
+            logger.warning("Racing contender %s failed: %s", name, error)
+        if not winners:
+            raise next(errors[name] for name, _, _ in self.contenders if name in errors)
+
+        order = [name for name, _, _ in self.contenders]
+        winners.sort(key=lambda task: order.index(tasks[task]))
+        winner, *tied = winners
+        for task in tied:
+            await task.result()[0].aclose()
+
+        name = tasks[winner]
+        cancelled = [tasks[task] for task in (*pending, *tied)]
+        estimates = [e for e in map(self.ttft.estimate, cancelled) if e is not None]
+        report = RaceReport(
+            winner=name,
+            ttft=ttft,
+            cancelled=sorted(cancelled, key=order.index),
+            failed={n: str(e) for n, e in errors.items()},
+            ttft_saved=min(estimates) - ttft if estimates else None,
+        )
+        self.ttft.record(name, ttft)
+        self._wins[name] += 1
+        if report.ttft_saved is not None:
+            self._ttft_saved += report.ttft_saved
+        self.last_report = report
+
+        stream, leading = winner.result()
+        return RaceStream(leading, stream, report)
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[ChatResponse, RaceStream[ChatResponse]]:
+        """Race a chat request across the contenders.
+
+        Returns:
+            The winner's response, or a RaceStream whose ``report`` names the winner
+        """
+        messages = Conversation.coerce(messages)
+        race = await self._race(lambda provider, contender_model: provider.chat(
+            messages, model=contender_model or model, temperature=temperature,
+            stream=True, **kwargs
+        ))
+        if stream:
+            return race
+
+        chunks = [chunk async for chunk in race]
+        usage = next((c.usage for c in reversed(chunks) if c.usage), {})
+        return ChatResponse(
+            message=Message(
+                role=chunks[0].message.role,
+                content="".join(c.message.content for c in chunks)
+            ),
+            model=chunks[0].model,
+            usage=usage
+        )
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[CompletionResponse, RaceStream[CompletionResponse]]:
+        """Race a completion request across the contenders.
+
+        Returns:
+            The winner's response, or a RaceStream whose ``report`` names the winner
+        """
+        race = await self._race(lambda provider, contender_model: provider.complete(
+            prompt, model=contender_model or model, temperature=temperature,
+            stream=True, **kwargs
+        ))
+        if stream:
+            return race
+
+        chunks = [chunk async for chunk in race]
+        usage = next((c.usage for c in reversed(chunks) if c.usage), {})
+        return CompletionResponse(
+            text="".join(c.text for c in chunks),
+            model=chunks[0].model,
+            usage=usage
+        )
+
+    async def close(self) -> None:
+        """Close all contenders."""
+        for _, provider, _ in self.contenders:
+            await provider.close()
@@ -0,0 +1,83 @@
+"""Provider registry resolving provider names to classes on first use.
+
+Built-in providers are registered by import path so that their dependencies
+(httpx and friends) are only imported when a provider is actually requested.
+Third-party packages can add providers through the ``simplemodelrouter.providers``
+entry point group, e.g. in ``pyproject.toml``::
+
+    [tool.poetry.plugins."simplemodelrouter.providers"]
+    mistral = "my_package.mistral:MistralProvider"
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List, Type, Union
+
+if TYPE_CHECKING:
+    from .base import LLMProvider
+
+ENTRY_POINT_GROUP = "simplemodelrouter.providers"
+
+_providers: Dict[str, Union[str, Type["LLMProvider"]]] = {
+    "openai": "simplemodelrouter.providers.openai:OpenAIProvider",
+    "anthropic": "simplemodelrouter.providers.anthropic:AnthropicProvider",
+    "ollama": "simplemodelrouter.providers.ollama:OllamaProvider",
+}
+_entry_points_loaded = False
+
+def register_provider(name: str, provider: Union[str, Type["LLMProvider"]]) -> None:
+    """Register a provider class, or a lazy ``"module:Class"`` reference to one.
+
+    Args:
+        name: Name the provider is looked up by
+        provider: Provider class or import path
+    """
+    _providers[name] = provider
+
+def _load_entry_points() -> None:
+    """Register providers advertised by installed packages."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _providers.setdefault(entry_point.name, entry_point.value)
+
+def available_providers() -> List[str]:
+    """Return the names of all registered and installed providers."""
+    _load_entry_points()
+    return sorted(_providers)
+
+def get_provider(name: str) -> Type["LLMProvider"]:
+    """Resolve a provider name to its class, importing it if needed.
+
+    Args:
+        name: Registered provider name (e.g. "openai")
+
+    Returns:
+        The provider class
+
+    Raises:
+        KeyError: If no provider is registered under that name
+    """
+    if name not in _providers:
+        _load_entry_points()
+    if name not in _providers:
+        raise KeyError(f"Unknown provider {name!r}; available: {', '.join(available_providers())}")
+
+    provider = _providers[name]
+    if isinstance(provider, str):
+        module_name, _, attr = provider.partition(":")
+        provider = getattr(import_module(module_name), attr)
+        _providers[name] = provider
+    return provider
+
+def create_provider(name: str, **kwargs: Any) -> "LLMProvider":
+    """Instantiate a provider by name.
+
+    Args:
+        name: Registered provider name
+        **kwargs: Arguments passed to the provider constructor
+    """
+    return get_provider(name)(**kwargs)
@@ -0,0 +1,161 @@
+import difflib
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Union
+
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .catalog import UnknownModelError
+from .conversation import Conversation
+from .policy import PolicyEngine
+
+class Router:
+    """Route requests across a set of provider nodes.
+
+    Nodes are selected round-robin. Nodes with a loaded model catalog (see
+    ``enable_catalog``) that does not list the requested model are skipped,
+    using only cached data. When ``prefer_resident`` is set, nodes that report
+    the requested model as already loaded (via ``is_loaded``, e.g.
+    ``OllamaProvider``) are preferred over nodes that would have to load it.
+
+    With a ``policy``, requests that do not name a model get the model the
+    PolicyEngine chooses, and the latency of every request, or its time to
+    first token when streamed, is fed back into the engine's statistics.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[LLMProvider],
+        prefer_resident: bool = True,
+        policy: Optional[PolicyEngine] = None
+    ):
+        """Initialize the router.
+
+        Args:
+            providers: Provider nodes to route between
+            prefer_resident: Prefer nodes where the model is already loaded
+            policy: Engine choosing models for requests that do not name one
+        """
+        if not providers:
+            raise ValueError("Router requires at least one provider")
+        self.providers: List[LLMProvider] = list(providers)
+        self.prefer_resident = prefer_resident
+        self.policy = policy
+        self._next = 0
+
+    def select(self, model: Optional[str] = None) -> LLMProvider:
+        """Pick the provider node that should serve a request for a model.
+
+        Args:
+            model: Requested model, or None for each provider's default
+
+        Returns:
+            The selected provider
+
+        Raises:
+            UnknownModelError: If every node's catalog rules the model out
+        """
+        candidates = self.providers
+        if model is not None:
+            candidates = [p for p in candidates if self._may_serve(p, model)]
+            if not candidates:
+                known = {m.name for p in self.providers for m in p.catalog.models()}
+                raise UnknownModelError(model, "any provider", difflib.get_close_matches(model, known, n=3))
+        if self.prefer_resident:
+            resident = [p for p in candidates if self._is_resident(p, model)]
+            if resident:
+                candidates = resident
+
+        provider = candidates[self._next % len(candidates)]
+        self._next += 1
+        return provider
+
+    @staticmethod
+    def _may_serve(provider: LLMProvider, model: str) -> bool:
+        """Return False only if the provider's loaded catalog lacks the model."""
+        catalog = getattr(provider, "catalog", None)
+        return catalog is None or catalog.contains(model) is not False
+
+    @staticmethod
+    def _is_resident(provider: LLMProvider, model: Optional[str]) -> bool:
+        """Return True if the provider reports the model as loaded."""
+        is_loaded = getattr(provider, "is_loaded", None)
+        return is_loaded is not None and is_loaded(model or provider.default_model)
+
+    def _choose(
+        self,
+        messages: Sequence[Message],
+        model: Optional[str],
+        max_tokens: Optional[int]
+    ) -> Optional[str]:
+        """Return the requested model, or the policy's choice when none is requested."""
+        if model is not None or self.policy is None:
+            return model
+        choice = self.policy.choose(messages, max_tokens=max_tokens or 256)
+        return choice.name if choice is not None else None
+
+    async def _send(
+        self,
+        model: Optional[str],
+        stream: bool,
+        call: Callable[[LLMProvider], Awaitable[Any]]
+    ) -> Any:
+        """Send a request to the selected node, feeding its latency to the policy."""
+        provider = self.select(model)
+        if self.policy is None:
+            return await call(provider)
+
+        model = model or provider.default_model
+        started = time.perf_counter()
+        result = await call(provider)
+        if stream:
+            return self._observe_stream(result, model, started)
+        self.policy.observe(model, time.perf_counter() - started)
+        return result
+
+    async def _observe_stream(
+        self,
+        stream: AsyncIterator[Any],
+        model: str,
+        started: float
+    ) -> AsyncIterator[Any]:
+        """Yield from a stream, feeding its time to first token to the policy."""
+        observed = False
+        async with aclosing(stream):
+            async for chunk in stream:
+                if not observed:
+                    self.policy.observe(model, time.perf_counter() - started)
+                    observed = True
+                yield chunk
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        """Send a chat request to the selected provider node."""
+        model = self._choose(messages, model, kwargs.get("max_tokens"))
+        return await self._send(model, stream, lambda provider: provider.chat(
+            messages, model=model, temperature=temperature, stream=stream, **kwargs
+        ))
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
+        """Send a completion request to the selected provider node."""
+        model = self._choose([Message(role="user", content=prompt)], model, kwargs.get("max_tokens"))
+        return await self._send(model, stream, lambda provider: provider.complete(
+            prompt, model=model, temperature=temperature, stream=stream, **kwargs
+        ))
+
+    async def close(self) -> None:
+        """Close all provider nodes."""
+        for provider in self.providers:
+            await provider.close()
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from .admission import AdmissionProvider
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .conversation import Conversation
+from .deadline import Deadline, DeadlineLike
+
+class _PriorityClass:
+    """Queue of one priority class, ordered by start-time fair queueing tags."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.heap: List[Tuple[float, int, float, asyncio.Future]] = []
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def advance(self, virtual_time: float) -> None:
+        """Move virtual time forward and forget tenants that have fallen behind it.
+
+        A tenant whose last finish tag is at or before the virtual time has
+        nothing queued and would start at the virtual time anyway, so its
+        entry carries no information.
+        """
+        self.virtual_time = virtual_time
+        self.last_finish = {
+            tenant: finish for tenant, finish in self.last_finish.items()
+            if finish > virtual_time
+        }
+
+class FairScheduler(AdmissionProvider):
+    """Admit requests to a provider by priority class and per-tenant fair share.
+
+    At most ``max_concurrency`` requests are in flight on the provider. When a
+    slot frees up, the highest priority class with queued requests is served
+    first. Within a class, tenants share slots in proportion to their weights
+    using start-time fair queueing, so a tenant submitting a large backfill
+    cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = 8,
+        classes: Sequence[str] = ("interactive", "batch"),
+        tenant_weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            provider: Provider to admit requests to
+            max_concurrency: Maximum in-flight requests on the provider
+            classes: Priority class names, highest priority first
+            tenant_weights: Relative share of each tenant within a class
+            default_weight: Weight of tenants not listed in ``tenant_weights``
+        """
+        super().__init__(provider)
+        self.max_concurrency = max_concurrency
+        self.tenant_weights = dict(tenant_weights or {})
+        self.default_weight = default_weight
+        self._classes = {name: _PriorityClass(name) for name in classes}
+        self._order = list(self._classes.values())
+        self._sequence = itertools.count()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return queue depth and wait-time statistics per priority class."""
+        return {
+            c.name: {
+                "queued": sum(1 for entry in c.heap if not entry[3].done()),
+                "dispatched": c.dispatched,
+                "total_wait": c.total_wait,
+                "mean_wait": c.total_wait / c.dispatched if c.dispatched else 0.0,
+                "max_wait": c.max_wait,
+            }
+            for c in self._order
+        }
+
+    def _enqueue(self, key: Tuple[str, str], waiter: asyncio.Future) -> None:
+        """Queue a waiter in its priority class, tagged with its tenant's fair-share start time."""
+        priority, tenant = key
+        try:
+            queue = self._classes[priority]
+        except KeyError:
+            raise ValueError(
+                f"Unknown priority class {priority!r}; choose from {', '.join(self._classes)}"
+            ) from None
+
+        if not queue.heap and queue.last_finish:
+            # Idle class: no tenant has anything queued, so none keeps a head start
+            queue.advance(max(queue.last_finish.values()))
+
+        now = asyncio.get_running_loop().time()
+        start = max(queue.virtual_time, queue.last_finish.get(tenant, 0.0))
+        weight = self.tenant_weights.get(tenant, self.default_weight)
+        queue.last_finish[tenant] = start + 1.0 / weight
+        heapq.heappush(queue.heap, (start, next(self._sequence), now, waiter))
+
+    def _dispatch(self) -> None:
+        """Admit queued requests while slots are free."""
+        now = asyncio.get_running_loop().time()
+        for queue in self._order:
+            while queue.heap and self._in_flight < self.max_concurrency:
+                start, _, enqueued_at, future = heapq.heappop(queue.heap)
+                if future.done():
+                    continue  # cancelled while queued
+
+                if start > queue.virtual_time:
+                    queue.advance(start)
+                wait = now - enqueued_at
+                queue.dispatched += 1
+                queue.total_wait += wait
+                queue.max_wait = max(queue.max_wait, wait)
+
+                self._grant(future)
+            if self._in_flight >= self.max_concurrency:
+                return
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        deadline: DeadlineLike = None,
+        priority: Optional[str] = None,
+        tenant: str = "default",
+        **kwargs
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        """Queue a chat request and send it once admitted.
+
+        Args:
+            priority: Priority class, defaults to the highest
+            tenant: Tenant the request is accounted to
+        """
+        deadline = Deadline.coerce(deadline)
+        key = (priority or self._order[0].name, tenant)
+        return await self._run(key, stream, deadline, lambda: self.provider.chat(
+            messages, model=model, temperature=temperature, stream=stream,
+            deadline=deadline, **kwargs
+        ))
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        deadline: DeadlineLike = None,
+        priority: Optional[str] = None,
+        tenant: str = "default",
+        **kwargs
+    ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
+        """Queue a completion request and send it once admitted.
+
+        Args:
+            priority: Priority class, defaults to the highest
+            tenant: Tenant the request is accounted to
+        """
+        deadline = Deadline.coerce(deadline)
+        key = (priority or self._order[0].name, tenant)
+        return await self._run(key, stream, deadline, lambda: self.provider.complete(
+            prompt, model=model, temperature=temperature, stream=stream,
+            deadline=deadline, **kwargs
+        ))
+
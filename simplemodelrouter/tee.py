@@ -0,0 +1,172 @@
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Deque, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+POLICIES = ("block", "drop", "detach")
+
+class ConsumerDetached(Exception):
+    """Raised to a ``detach`` consumer that fell too far behind the stream."""
+
+class TeeConsumer(Generic[T]):
+    """One consumer of a StreamTee, iterating the stream at its own pace."""
+
+    def __init__(self, tee: "StreamTee[T]", policy: str, position: int):
+        self.policy = policy
+        self.dropped = 0
+        self.detached = False
+        self.closed = False
+        self._tee = tee
+        self._position = position
+
+    @property
+    def active(self) -> bool:
+        """Whether the consumer still holds items in the buffer."""
+        return not (self.closed or self.detached)
+
+    def __aiter__(self) -> "TeeConsumer[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        return await self._tee._next(self)
+
+    async def aclose(self) -> None:
+        """Stop consuming; the upstream is closed once every consumer has stopped."""
+        if not self.closed:
+            self.closed = True
+            await self._tee._leave()
+
+class StreamTee(Generic[T]):
+    """Fan one async stream out to several consumers through a bounded buffer.
+
+    A background task reads the upstream into a ring buffer of at most
+    ``buffer_size`` items, which each consumer reads at its own pace. When the
+    buffer is full and the oldest item has not been read by everyone, the
+    lagging consumers' policies decide what happens:
+
+    - ``block``: the upstream waits until the consumer catches up
+    - ``drop``: the oldest item is discarded and counted in ``dropped``
+    - ``detach``: the consumer is removed and its next read raises ConsumerDetached
+
+    A slow ``drop`` or ``detach`` sink therefore never delays the others.
+    Consumers should be created before iteration starts; a consumer added
+    later starts at the oldest buffered item.
+    """
+
+    def __init__(self, source: AsyncIterator[T], buffer_size: int = 64):
+        """Initialize the tee.
+
+        Args:
+            source: Stream to fan out. It is closed when the tee finishes.
+            buffer_size: Maximum number of items buffered between the fastest
+                and slowest consumer
+        """
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self.buffer_size = buffer_size
+        self._source = source
+        self._buffer: Deque[T] = deque()
+        self._base = 0  # stream position of self._buffer[0]
+        self._consumers: List[TeeConsumer[T]] = []
+        self._changed = asyncio.Event()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    def consumer(self, policy: str = "block") -> TeeConsumer[T]:
+        """Add a consumer with the given slow-consumer policy."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; choose from {', '.join(POLICIES)}")
+        consumer = TeeConsumer(self, policy, self._base)
+        self._consumers.append(consumer)
+        return consumer
+
+    def _notify(self) -> None:
+        """Wake everything waiting for the buffer to change."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _trim(self) -> None:
+        """Discard buffered items every active consumer has read."""
+        positions = [c._position for c in self._consumers if c.active]
+        oldest = min(positions) if positions else self._base + len(self._buffer)
+        while self._buffer and self._base < oldest:
+            self._buffer.popleft()
+            self._base += 1
+
+    def _make_room(self) -> bool:
+        """Free the oldest buffered item unless a blocking consumer still needs it."""
+        laggards = [c for c in self._consumers if c.active and c._position == self._base]
+        if any(c.policy == "block" for c in laggards):
+            return False
+        for consumer in laggards:
+            if consumer.policy == "detach":
+                consumer.detached = True
+        self._buffer.popleft()
+        self._base += 1
+        return True
+
+    async def _pump(self) -> None:
+        """Read the upstream into the buffer."""
+        try:
+            async with aclosing(self._source):
+                async for item in self._source:
+                    while len(self._buffer) >= self.buffer_size and not self._make_room():
+                        await self._changed.wait()
+                    self._buffer.append(item)
+                    self._notify()
+                    if not any(c.active for c in self._consumers):
+                        break
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+
+    async def _next(self, consumer: TeeConsumer[T]) -> T:
+        """Return the next item for a consumer."""
+        while True:
+            if consumer.detached:
+                raise ConsumerDetached("Consumer fell behind and was detached from the stream")
+            if consumer.closed:
+                raise StopAsyncIteration
+            if consumer._position < self._base:
+                consumer.dropped += self._base - consumer._position
+                consumer._position = self._base
+
+            index = consumer._position - self._base
+            if index < len(self._buffer):
+                item = self._buffer[index]
+                consumer._position += 1
+                self._trim()
+                self._notify()
+                return item
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+
+            if self._pump_task is None:
+                self._pump_task = asyncio.create_task(self._pump())
+            await self._changed.wait()
+
+    async def _leave(self) -> None:
+        """Release a closed consumer's items and stop the upstream if nobody is left."""
+        self._trim()
+        self._notify()
+        if not any(c.active for c in self._consumers):
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop reading the upstream and close it."""
+        if self._pump_task is not None and not self._pump_task.done():
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+        elif self._pump_task is None:
+            self._done = True
+            await self._source.aclose()
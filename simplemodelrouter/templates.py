@@ -0,0 +1,156 @@
+import hashlib
+from string import Formatter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .base import Message
+from .codec import get_codec
+from .conversation import Conversation
+
+# A replacement field: (field name, conversion, format spec)
+Field = Tuple[str, Optional[str], str]
+
+_formatter = Formatter()
+
+def _compile(source: str) -> List[Union[str, Field]]:
+    """Split a ``str.format`` template into literal text and replacement fields."""
+    segments: List[Union[str, Field]] = []
+    for literal, name, spec, conversion in _formatter.parse(source):
+        if literal:
+            segments.append(literal)
+        if name is None:
+            continue
+        if name == "" or name.isdigit():
+            raise ValueError(f"Positional field in template {source!r}; use named fields")
+        if "{" in spec:
+            raise ValueError(f"Nested replacement field in template {source!r}")
+        segments.append((name, conversion, spec))
+    return segments
+
+def _field_formatter(field: Field) -> Callable[[Dict[str, Any]], str]:
+    """Return a function formatting one replacement field like ``str.format`` would."""
+    name, conversion, spec = field
+    if conversion is None and name.isidentifier():
+        return lambda values: format(values[name], spec)
+
+    def format_field(values: Dict[str, Any]) -> str:
+        value, _ = _formatter.get_field(name, (), values)
+        return format(_formatter.convert_field(value, conversion), spec)
+    return format_field
+
+class _MessageTemplate:
+    """One compiled message of a PromptTemplate."""
+
+    def __init__(self, role: str, source: str):
+        codec = get_codec()
+        self.role = role
+        self.source = source
+        self.segments = _compile(source)
+        self.fields = [s for s in self.segments if isinstance(s, tuple)]
+        self.head = codec.encode({"role": role, "content": ""})[:-3]
+        if self.fields:
+            self.message = None
+            self.fragment = None
+        else:
+            self.message = Message(role=role, content="".join(self.segments))
+            self.fragment = codec.encode({"role": role, "content": self.message.content})
+
+    def render(self, formatted: Dict[Field, str]) -> Tuple[Message, Optional[bytes]]:
+        """Render the message and its encoding from pre-formatted field values."""
+        content = "".join([s if isinstance(s, str) else formatted[s] for s in self.segments])
+        message = Message(role=self.role, content=content)
+        if len(content) > Conversation.cache_limit:
+            return message, None
+        return message, self.head + get_codec().encode(content) + b"}"
+
+class PromptTemplate:
+    """Message templates compiled once and rendered into Conversations.
+
+    Message contents use ``str.format`` syntax with named fields. Templates are
+    parsed once and messages without fields are built and encoded once, so
+    rendering only formats the field values and encodes the messages that use
+    them.
+
+    The leading messages without fields form the stable prefix. Rendered
+    conversations share its encodings and set ``cache_prefix`` so providers
+    with explicit prompt caching can mark it. ``prefix_hash`` identifies that
+    prefix, and ``cache_key`` derives a key for a rendered request from a
+    precomputed hash of the template, hashing only the field values.
+    """
+
+    def __init__(self, messages: Iterable[Union[Message, Tuple[str, str]]]):
+        """Compile the template.
+
+        Args:
+            messages: Messages whose contents are templates, as Message objects
+                or ``(role, template)`` pairs
+
+        Raises:
+            ValueError: If a template uses positional or nested fields
+        """
+        self._messages = [
+            _MessageTemplate(m.role, m.content) if isinstance(m, Message) else _MessageTemplate(*m)
+            for m in messages
+        ]
+        self.fields: List[Field] = list(dict.fromkeys(f for m in self._messages for f in m.fields))
+        self._formatters = [(field, _field_formatter(field)) for field in self.fields]
+
+        self._prefix = Conversation()
+        for message in self._messages:
+            if message.fields:
+                break
+            self._prefix._append_encoded(message.message, message.fragment)
+        self._prefix.cache_prefix = len(self._prefix)
+        self._rest = self._messages[len(self._prefix):]
+
+        self.prefix_hash = hashlib.blake2b(self._prefix.encoded(), digest_size=16).hexdigest()
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self._hasher.update(get_codec().encode([[m.role, m.source] for m in self._messages]))
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the values the template needs."""
+        return list(dict.fromkeys(name for name, _, _ in self.fields))
+
+    def _format(self, values: Dict[str, Any]) -> Dict[Field, str]:
+        return {field: format_field(values) for field, format_field in self._formatters}
+
+    def render(self, **values: Any) -> Conversation:
+        """Render the template.
+
+        Args:
+            **values: Values of the template fields
+
+        Returns:
+            A new Conversation; further messages may be added to it
+
+        Raises:
+            KeyError: If a field value is missing
+        """
+        formatted = self._format(values)
+        conversation = self._prefix.copy()
+        for message in self._rest:
+            if message.fields:
+                conversation._append_encoded(*message.render(formatted))
+            else:
+                conversation._append_encoded(message.message, message.fragment)
+        return conversation
+
+    def cache_key(self, **values: Any) -> str:
+        """Return a key identifying the request the template renders for these values.
+
+        Only the formatted field values are hashed; the template itself is
+        covered by a hash computed at compile time.
+
+        Args:
+            **values: Values of the template fields
+
+        Returns:
+            A hex digest, equal for equal rendered conversations of this template
+        """
+        hasher = self._hasher.copy()
+        # Length-prefixed so that values cannot run into each other
+        hasher.update(b"".join([
+            b"%d:%s" % (len(data), data)
+            for data in [format_field(values).encode("utf-8") for _, format_field in self._formatters]
+        ]))
+        return hasher.hexdigest()
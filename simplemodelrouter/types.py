@@ -1,43 +1,171 @@
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel
 from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
+def _check(value: Any, types: Any, name: str) -> Any:
+    """Raise TypeError unless a value has one of the given types."""
+    if not isinstance(value, types):
+        raise TypeError(f"{name} must be {getattr(types, '__name__', types)}, not {type(value).__name__}")
+    return value
 
-@dataclass
-class Message:
-    content: str
+def _usage(data: Any) -> Dict[str, int]:
+    usage = _check(data if data is not None else {}, dict, "usage")
+    for key, value in usage.items():
+        _check(value, int, f"usage[{key!r}]")
+    return dict(usage)
+
+# Request and response types are slotted dataclasses shared by the providers and
+# normalizers. Constructing one validates nothing and allocates no instance
+# __dict__, keeping streamed chunks cheap; data from outside the library is
+# checked explicitly with from_dict where it enters.
+
+def _plain(value: Any) -> Any:
+    """Convert nested serializable objects, alone or in lists, to dicts."""
+    if isinstance(value, _Serializable):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+class _Serializable:
+    """Mixin adding dict and JSON serialization to slotted dataclasses."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return every field, in declaration order, with nested types converted to dicts."""
+        # The __slots__ of a slots=True dataclass are its field names, in order
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+    def to_json(self) -> str:
+        """Serialize to a compact JSON string with the selected codec."""
+        from .codec import get_codec
+
+        return get_codec().encode(self.to_dict()).decode("utf-8")
+
+@dataclass(slots=True)
+class Message(_Serializable):
+    """Represents a chat message."""
     role: str
+    content: str
 
-@dataclass
-class NormalizedRequest:
-    messages: List[Message]
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """Build a message from untrusted data, checking its fields.
+
+        Raises:
+            TypeError: If a field is missing or has the wrong type
+        """
+        _check(data, dict, "message")
+        return cls(
+            role=_check(data.get("role"), str, "role"),
+            content=_check(data.get("content"), str, "content")
+        )
+
+@dataclass(slots=True)
+class CompletionResponse(_Serializable):
+    """Represents a completion response from an LLM."""
+    text: str
     model: str
-    stream: bool = True
-    options: Dict[str, Any] = field(default_factory=dict)
+    usage: Dict[str, int]
 
-class ChatResponse(BaseModel):
-    id: str
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompletionResponse":
+        """Build a completion response from untrusted data, checking its fields."""
+        _check(data, dict, "completion response")
+        return cls(
+            text=_check(data.get("text"), str, "text"),
+            model=_check(data.get("model"), str, "model"),
+            usage=_usage(data.get("usage"))
+        )
+
+@dataclass(slots=True)
+class ChatResponse(_Serializable):
+    """Represents a chat response from an LLM."""
+    message: Message
+    model: str
+    usage: Dict[str, int]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChatResponse":
+        """Build a chat response from untrusted data, checking its fields."""
+        _check(data, dict, "chat response")
+        return cls(
+            message=Message.from_dict(data.get("message")),
+            model=_check(data.get("model"), str, "model"),
+            usage=_usage(data.get("usage"))
+        )
+
+@dataclass(slots=True)
+class NormalizedRequest(_Serializable):
+    """A chat request in the router's provider-independent form."""
     messages: List[Message]
-    created: int  # Unix timestamp
     model: str
-    done: bool = False
+    stream: bool = True
+    options: Dict[str, Any] = field(default_factory=dict)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NormalizedRequest":
+        """Build a request from untrusted data, checking its fields."""
+        _check(data, dict, "request")
+        return cls(
+            messages=[Message.from_dict(m) for m in _check(data.get("messages"), list, "messages")],
+            model=_check(data.get("model"), str, "model"),
+            stream=_check(data.get("stream", True), bool, "stream"),
+            options=dict(_check(data.get("options", {}), dict, "options"))
+        )
 
-class Delta(BaseModel):
+@dataclass(slots=True)
+class Delta(_Serializable):
     """Delta represents a change in content for streaming responses."""
     content: Optional[str] = None
     role: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        if self.content is not None:
+            data["content"] = self.content
+        if self.role is not None:
+            data["role"] = self.role
+        return data
 
-class Choice(BaseModel):
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Delta":
+        """Build a delta from untrusted data, checking its fields."""
+        _check(data, dict, "delta")
+        return cls(
+            content=_check(data.get("content"), (str, type(None)), "content"),
+            role=_check(data.get("role"), (str, type(None)), "role")
+        )
+
+@dataclass(slots=True)
+class Choice(_Serializable):
     """Choice represents a single completion choice from the model."""
+    delta: Delta
     finish_reason: Optional[str] = None
     index: int = 0
-    delta: Delta
     logprobs: Optional[Any] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"index": self.index, "delta": self.delta.to_dict()}
+        if self.finish_reason is not None:
+            data["finish_reason"] = self.finish_reason
+        if self.logprobs is not None:
+            data["logprobs"] = self.logprobs
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Choice":
+        """Build a choice from untrusted data, checking its fields."""
+        _check(data, dict, "choice")
+        return cls(
+            delta=Delta.from_dict(data.get("delta", {})),
+            finish_reason=_check(data.get("finish_reason"), (str, type(None)), "finish_reason"),
+            index=_check(data.get("index", 0), int, "index"),
+            logprobs=data.get("logprobs")
+        )
 
-class Response(BaseModel):
+@dataclass(slots=True)
+class Response(_Serializable):
     """Response represents a model's response to a prompt."""
     id: str
     choices: List[Choice]
@@ -48,9 +176,22 @@ class Response(BaseModel):
 
     def json(self) -> str:
         """Convert the response to a JSON string."""
-        return self.model_dump_json(exclude_none=True)
+        return self.to_json()
 
     @property
     def message(self) -> Optional[Choice]:
         """Get the first choice from the response."""
-        return self.choices[0] if self.choices else None
\ No newline at end of file
+        return self.choices[0] if self.choices else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Response":
+        """Build a response from untrusted data, checking its fields."""
+        _check(data, dict, "response")
+        return cls(
+            id=_check(data.get("id"), str, "id"),
+            choices=[Choice.from_dict(c) for c in _check(data.get("choices"), list, "choices")],
+            created=_check(data.get("created"), int, "created"),
+            model=_check(data.get("model"), str, "model"),
+            object=_check(data.get("object", "chat.completion.chunk"), str, "object"),
+            stream=_check(data.get("stream", False), bool, "stream")
+        )
@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import aclosing
+from typing import (
+    Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+)
+
+from .base import LLMProvider, Message, ChatResponse, CompletionResponse
+from .conversation import Conversation
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", ChatResponse, CompletionResponse)
+
+_COLUMNS = ("bucket", "tenant", "provider", "model")
+_COUNTERS = ("requests", "prompt_tokens", "completion_tokens", "total_tokens")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    bucket INTEGER NOT NULL,
+    tenant TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    PRIMARY KEY (bucket, tenant, provider, model)
+)
+"""
+
+_UPSERT = """
+INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket, tenant, provider, model) DO UPDATE SET
+    requests = requests + excluded.requests,
+    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+    completion_tokens = completion_tokens + excluded.completion_tokens,
+    total_tokens = total_tokens + excluded.total_tokens
+"""
+
+class QuotaExceeded(Exception):
+    """Raised when a tenant has used up its token quota."""
+
+class UsageLedger:
+    """Token usage accounting by tenant, provider and model.
+
+    Recording a request only updates in-memory counters. Counters are written
+    to SQLite in batches by ``flush()``, which ``start()`` runs periodically in
+    a worker thread so the request path never touches the database. Usage is
+    aggregated into time buckets of ``bucket_seconds``.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        flush_interval: float = 10.0,
+        bucket_seconds: int = 3600
+    ):
+        """Initialize the ledger.
+
+        Args:
+            path: SQLite database file, or ":memory:"
+            flush_interval: Seconds between background flushes
+            bucket_seconds: Width of the time buckets usage is aggregated into
+        """
+        self.flush_interval = flush_interval
+        self.bucket_seconds = bucket_seconds
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._pending: Dict[Tuple[int, str, str, str], List[int]] = {}
+        self._quotas: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._windows: Dict[str, Tuple[int, int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        usage: Dict[str, int],
+        tenant: str = "default",
+        provider: str = "",
+        model: str = ""
+    ) -> None:
+        """Add the usage of one request to the in-memory counters."""
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+        total = usage.get("total_tokens") or prompt + completion
+        now = time.time()
+
+        key = (int(now // self.bucket_seconds) * self.bucket_seconds, tenant, provider, model)
+        counters = self._pending.get(key)
+        if counters is None:
+            self._pending[key] = [1, prompt, completion, total]
+        else:
+            counters[0] += 1
+            counters[1] += prompt
+            counters[2] += completion
+            counters[3] += total
+
+        if tenant in self._quotas:
+            start, used = self._window(tenant, now)
+            self._windows[tenant] = (start, used + total)
+
+    async def track(
+        self,
+        stream: AsyncIterator[T],
+        tenant: str = "default",
+        provider: str = ""
+    ) -> AsyncIterator[T]:
+        """Yield from a stream and record its end-of-stream usage when it finishes."""
+        usage: Dict[str, int] = {}
+        model = ""
+        try:
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if chunk.usage and any(chunk.usage.values()):
+                        usage = chunk.usage
+                    model = chunk.model
+                    yield chunk
+        finally:
+            self.record(usage, tenant, provider, model)
+
+    def set_quota(self, tenant: str, max_tokens: int, period: Optional[int] = None) -> None:
+        """Limit a tenant's token usage.
+
+        Args:
+            tenant: Tenant to limit
+            max_tokens: Tokens allowed per period
+            period: Period length in seconds (aligned to the epoch), or None for
+                a lifetime quota
+
+        Raises:
+            ValueError: If the period is not a multiple of ``bucket_seconds``,
+                since usage is only known per bucket
+        """
+        if period is not None and (period <= 0 or period % self.bucket_seconds):
+            raise ValueError(
+                f"Quota period must be a positive multiple of the {self.bucket_seconds}s bucket, not {period}"
+            )
+        self._quotas[tenant] = (max_tokens, period)
+        self._windows.pop(tenant, None)
+        start, _ = self._window(tenant, time.time())
+        self.flush()
+        with self._db_lock:
+            (used,) = self._db.execute(
+                "SELECT COALESCE(SUM(total_tokens), 0) FROM usage WHERE tenant = ? AND bucket >= ?",
+                (tenant, start)
+            ).fetchone()
+        self._windows[tenant] = (start, used)
+
+    def _window(self, tenant: str, now: float) -> Tuple[int, int]:
+        """Return the start of the tenant's current quota window and its usage."""
+        _, period = self._quotas[tenant]
+        start = 0 if period is None else int(now // period) * period
+        window = self._windows.get(tenant)
+        if window is None or window[0] != start:
+            return start, 0
+        return window
+
+    def remaining(self, tenant: str) -> Optional[int]:
+        """Tokens left in the tenant's quota, or None if it has no quota."""
+        if tenant not in self._quotas:
+            return None
+        max_tokens, _ = self._quotas[tenant]
+        _, used = self._window(tenant, time.time())
+        return max(0, max_tokens - used)
+
+    def check_quota(self, tenant: str) -> None:
+        """Raise QuotaExceeded if the tenant has no tokens left."""
+        remaining = self.remaining(tenant)
+        if remaining is not None and remaining <= 0:
+            raise QuotaExceeded(f"Tenant {tenant!r} has exhausted its token quota")
+
+    def _take_pending(self) -> List[Tuple]:
+        """Detach the pending counters as rows ready to be written."""
+        pending, self._pending = self._pending, {}
+        return [(*key, *counters) for key, counters in pending.items()]
+
+    def _write(self, rows: List[Tuple]) -> int:
+        """Add rows of counters to the database."""
+        if rows:
+            with self._db_lock, self._db:
+                self._db.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def flush(self) -> int:
+        """Write pending counters to SQLite and return the number of rows written."""
+        return self._write(self._take_pending())
+
+    async def aflush(self) -> int:
+        """Flush pending counters, writing them from a worker thread."""
+        # Counters are detached on the event loop thread, where they are updated
+        return await asyncio.to_thread(self._write, self._take_pending())
+
+    def start(self) -> None:
+        """Flush pending counters in the background every ``flush_interval`` seconds."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.aflush()
+            except sqlite3.Error as e:
+                logger.warning("Failed to flush usage ledger: %s", e)
+
+    def rollup(
+        self,
+        group_by: Sequence[str] = ("tenant",),
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        tenant: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate recorded usage.
+
+        Args:
+            group_by: Columns to group by, from "bucket", "tenant", "provider", "model"
+            since: Only include buckets starting at or after this Unix time
+            until: Only include buckets starting before this Unix time
+            tenant: Only include this tenant
+
+        Returns:
+            One dict per group with the group columns and summed counters
+        """
+        unknown = set(group_by) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(sorted(unknown))}")
+
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("bucket >= ?")
+            params.append(int(since // self.bucket_seconds) * self.bucket_seconds)
+        if until is not None:
+            conditions.append("bucket < ?")
+            params.append(until)
+        if tenant is not None:
+            conditions.append("tenant = ?")
+            params.append(tenant)
+
+        columns = ", ".join(group_by)
+        sums = ", ".join(f"SUM({c})" for c in _COUNTERS)
+        query = f"SELECT {columns + ', ' if columns else ''}{sums} FROM usage"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if columns:
+            query += f" GROUP BY {columns} ORDER BY {columns}"
+
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [
+            dict(zip((*group_by, *_COUNTERS), row))
+            for row in rows if row[len(group_by)] is not None
+        ]
+
+    async def close(self) -> None:
+        """Stop background flushing, flush pending counters and close the database."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.aflush()
+        self._db.close()
+
+class MeteredProvider(LLMProvider):
+    """Provider wrapper that enforces quotas and records usage in a ledger."""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        ledger: UsageLedger,
+        provider_name: Optional[str] = None
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            provider: Provider to meter
+            ledger: Ledger to record usage in
+            provider_name: Name usage is recorded under, derived from the class by default
+        """
+        super().__init__(provider.api_key, provider.base_url, provider.default_model)
+        self.provider = provider
+        self.ledger = ledger
+        self.provider_name = provider_name or provider.name
+
+    async def chat(
+        self,
+        messages: Union[List[Message], Conversation],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        tenant: str = "default",
+        **kwargs
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        """Check the tenant's quota, send a chat request and record its usage."""
+        self.ledger.check_quota(tenant)
+        response = await self.provider.chat(
+            messages, model=model, temperature=temperature, stream=stream, **kwargs
+        )
+        if stream:
+            return self.ledger.track(response, tenant, self.provider_name)
+        self.ledger.record(response.usage, tenant, self.provider_name, response.model)
+        return response
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        tenant: str = "default",
+        **kwargs
+    ) -> Union[CompletionResponse, AsyncIterator[CompletionResponse]]:
+        """Check the tenant's quota, send a completion request and record its usage."""
+        self.ledger.check_quota(tenant)
+        response = await self.provider.complete(
+            prompt, model=model, temperature=temperature, stream=stream, **kwargs
+        )
+        if stream:
+            return self.ledger.track(response, tenant, self.provider_name)
+        self.ledger.record(response.usage, tenant, self.provider_name, response.model)
+        return response
+
+    async def close(self) -> None:
+        """Close the underlying provider."""
+        await self.provider.close()
@@ -0,0 +1,59 @@
+import pytest
+import asyncio
+from typing import List, Optional, Tuple
+
+from simplemodelrouter.base import LLMProvider, Message, ChatResponse, CompletionResponse
+
+class FakeProvider(LLMProvider):
+    """Provider recording the calls it admits and answering once its gate is open.
+
+    The gate starts open; clear it to hold calls until it is set again. Chat
+    calls answer with the last message and completions with the prompt, and
+    streams yield that text one character per chunk.
+    """
+
+    def __init__(self):
+        super().__init__(api_key="", default_model="test-model")
+        self.calls: List[Tuple[str, Optional[str]]] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    @property
+    def prompts(self) -> List[str]:
+        """Prompts of the calls in the order they were made."""
+        return [prompt for prompt, _ in self.calls]
+
+    @property
+    def models(self) -> List[Optional[str]]:
+        """Models of the calls in the order they were made."""
+        return [model for _, model in self.calls]
+
+    async def _respond(self, text: str, model: Optional[str], stream: bool, make):
+        self.calls.append((text, model))
+        await asyncio.sleep(0)
+        await self.gate.wait()
+        if stream:
+            return self._stream(text, make)
+        return make(text)
+
+    async def _stream(self, text: str, make):
+        for char in text:
+            yield make(char)
+
+    async def chat(self, messages, model=None, temperature=0.7, stream=False, **kwargs):
+        return await self._respond(messages[-1].content, model, stream, lambda text: ChatResponse(
+            message=Message(role="assistant", content=text), model=model or self.default_model, usage={}
+        ))
+
+    async def complete(self, prompt, model=None, temperature=0.7, stream=False, **kwargs):
+        return await self._respond(prompt, model, stream, lambda text: CompletionResponse(
+            text=text, model=model or self.default_model, usage={}
+        ))
+
+    async def close(self):
+        pass
+
+@pytest.fixture
+def fake_provider() -> FakeProvider:
+    """A FakeProvider with its gate open."""
+    return FakeProvider()
@@ -0,0 +1,44 @@
+import pytest
+import asyncio
+
+from simplemodelrouter.affinity import ModelAffinityScheduler
+from simplemodelrouter.base import Message
+
+@pytest.mark.asyncio
+async def test_requests_are_grouped_by_model(fake_provider):
+    """Test interleaved requests are served in same-model runs."""
+    scheduler = ModelAffinityScheduler(fake_provider, max_batch=100, max_wait=60.0)
+
+    models = ["llama2", "mistral"] * 5
+    await asyncio.gather(*(scheduler.complete("hi", model=m) for m in models))
+
+    assert fake_provider.models == ["llama2"] * 5 + ["mistral"] * 5
+    assert scheduler.stats()["model_switches"] == 1
+    assert scheduler.stats()["requests"] == 10
+
+@pytest.mark.asyncio
+async def test_max_batch_bounds_run_length(fake_provider):
+    """Test a model run is cut short when other models are waiting."""
+    scheduler = ModelAffinityScheduler(fake_provider, max_batch=2, max_wait=60.0)
+
+    models = ["a", "a", "a", "b", "b"]
+    await asyncio.gather(*(scheduler.complete("hi", model=m) for m in models))
+
+    assert fake_provider.models == ["a", "a", "b", "b", "a"]
+    assert scheduler.model_switches == 2
+
+@pytest.mark.asyncio
+async def test_streaming_holds_slot_until_consumed(fake_provider):
+    """Test a streamed response keeps its slot until the stream is closed."""
+    scheduler = ModelAffinityScheduler(fake_provider)
+    messages = [Message(role="user", content="hi")]
+
+    stream = await scheduler.chat(messages, model="a", stream=True)
+    waiting = asyncio.ensure_future(scheduler.chat(messages, model="b", stream=True))
+    await asyncio.sleep(0)
+    assert fake_provider.models == ["a"]
+
+    assert "".join([c.message.content async for c in stream]) == "hi"
+    await (await waiting).aclose()
+    assert fake_provider.models == ["a", "b"]
+    assert scheduler.in_flight == 0
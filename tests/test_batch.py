@@ -0,0 +1,110 @@
+import pytest
+import json
+
+from simplemodelrouter import registry
+from simplemodelrouter.base import LLMProvider, ChatResponse, CompletionResponse, Message
+from simplemodelrouter.batch import BatchRunner, count_lines, main
+
+class EchoProvider(LLMProvider):
+    """Provider echoing its input, failing on prompts containing "fail"."""
+
+    fail = True
+
+    def __init__(self, api_key="", default_model="echo"):
+        super().__init__(api_key=api_key, default_model=default_model)
+        self.calls = []
+
+    async def chat(self, messages, model=None, temperature=0.7, stream=False, **kwargs):
+        self.calls.append(messages[-1].content)
+        return ChatResponse(
+            message=Message(role="assistant", content=messages[-1].content.upper()),
+            model=model or self.default_model, usage={"total_tokens": 1}
+        )
+
+    async def complete(self, prompt, model=None, temperature=0.7, stream=False, **kwargs):
+        self.calls.append(prompt)
+        if "fail" in prompt and self.fail:
+            raise RuntimeError("upstream error")
+        return CompletionResponse(text=prompt[::-1], model=model or self.default_model, usage={})
+
+    async def close(self):
+        pass
+
+def write_input(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+RECORDS = [
+    {"id": "a", "messages": [{"role": "user", "content": "hello"}], "model": "m1"},
+    {"id": "b", "prompt": "abc"},
+    {"id": "c", "prompt": "please fail"},
+    {"prompt": "no id"},
+]
+
+@pytest.mark.asyncio
+async def test_run_and_resume(tmp_path):
+    """Test results are written per record and a rerun only retries failures."""
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(source, RECORDS)
+    provider = EchoProvider()
+    reports = []
+
+    stats = await BatchRunner(provider, concurrency=2, on_progress=reports.append).run(str(source), str(output))
+    assert (stats.total, stats.completed, stats.failed, stats.skipped) == (4, 3, 1, 0)
+    results = {r["id"]: r for r in read_output(output)}
+    assert results["a"]["response"]["message"] == {"role": "assistant", "content": "HELLO"}
+    assert results["a"]["response"]["model"] == "m1"
+    assert results["b"]["response"]["text"] == "cba"
+    assert results["c"]["error"] == "RuntimeError: upstream error"
+    assert results["4"]["response"]["text"] == "di on"
+    assert reports[-1] is stats
+
+    provider = EchoProvider()
+    provider.fail = False
+    stats = await BatchRunner(provider).run(str(source), str(output))
+    assert provider.calls == ["please fail"]
+    assert (stats.completed, stats.failed, stats.skipped) == (1, 0, 3)
+    assert read_output(output)[-1] == {"id": "c", "response": {"text": "liaf esaelp", "model": "echo", "usage": {}}}
+
+def test_count_lines(tmp_path):
+    """Test line counting with and without a trailing newline, skipping blank lines."""
+    path = tmp_path / "f"
+    path.write_bytes(b"a\nb\nc")
+    assert count_lines(str(path)) == 3
+    path.write_bytes(b"a\nb\n")
+    assert count_lines(str(path)) == 2
+    path.write_bytes(b"a\n\n  \nb\n\n")
+    assert count_lines(str(path), block_size=2) == 2
+
+@pytest.mark.asyncio
+async def test_invalid_lines_are_reported(tmp_path):
+    """Test lines that are not JSON objects are written as errors and the run continues."""
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    source.write_text(
+        '{"id": "a", "prompt": "abc"}\n'
+        '{"id": "b", "prompt": \n'
+        '\n'
+        '["not", "an", "object"]\n'
+        '{"id": "c", "prompt": "xyz"}\n'
+    )
+
+    stats = await BatchRunner(EchoProvider(), concurrency=2).run(str(source), str(output))
+    assert (stats.total, stats.completed, stats.failed) == (4, 2, 2)
+    results = {r["id"]: r for r in read_output(output)}
+    assert results["a"]["response"]["text"] == "cba"
+    assert results["c"]["response"]["text"] == "zyx"
+    assert "DecodeError" in results["2"]["error"] and "response" not in results["2"]
+    assert results["4"]["error"] == "TypeError: record must be an object, not list"
+
+def test_cli(tmp_path, capsys, monkeypatch):
+    """Test the command line entry point runs a file through a registered provider."""
+    monkeypatch.setitem(registry._providers, "echo", EchoProvider)
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(source, RECORDS[:2])
+
+    assert main([str(source), str(output), "--provider", "echo", "--model", "big"]) == 0
+    assert [r["response"]["model"] for r in read_output(output)] == ["m1", "big"]
+    assert (tmp_path / "out.jsonl.done").read_text().split() == ["a", "b"]
+    assert "2/2 done" in capsys.readouterr().err
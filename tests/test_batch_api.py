@@ -0,0 +1,142 @@
+import pytest
+import httpx
+import json
+
+from simplemodelrouter import AnthropicProvider, Message, OllamaProvider, OpenAIProvider
+from simplemodelrouter.batch_api import (
+    AnthropicBatch, BatchError, BatchRequest, LocalBatch, OpenAIBatch, batch_backend
+)
+
+REQUESTS = [
+    BatchRequest("r1", [Message(role="user", content="one")], params={"max_tokens": 10}),
+    BatchRequest("r2", [Message(role="system", content="Be brief."), Message(role="user", content="two")], params={"max_tokens": 10}),
+    BatchRequest("r3", [Message(role="user", content="three")], params={"max_tokens": 10}),
+]
+
+class MockOpenAI:
+    """In-memory OpenAI files and batches endpoints."""
+
+    def __init__(self, final_status="completed"):
+        self.final_status = final_status
+        self.uploaded = []
+        self.polls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v1/files":
+            assert request.headers["content-type"].startswith("multipart/form-data")
+            body = request.read()
+            assert b'name="purpose"' in body
+            self.uploaded = [json.loads(line) for line in body.splitlines() if line.startswith(b'{"custom_id"')]
+            return httpx.Response(200, json={"id": "file-in"})
+        if path == "/v1/batches":
+            assert json.loads(request.content) == {
+                "input_file_id": "file-in", "endpoint": "/v1/chat/completions", "completion_window": "24h"
+            }
+            return httpx.Response(200, json={"id": "batch-1", "status": "validating"})
+        if path == "/v1/batches/batch-1":
+            self.polls += 1
+            if self.polls < 3:
+                return httpx.Response(200, json={"id": "batch-1", "status": "in_progress"})
+            return httpx.Response(200, json={
+                "id": "batch-1", "status": self.final_status,
+                "output_file_id": "file-out", "error_file_id": "file-err",
+                "errors": {"data": [{"message": "invalid model"}]},
+            })
+        if path == "/v1/files/file-out/content":
+            lines = [
+                {"custom_id": r["custom_id"], "error": None, "response": {"status_code": 200, "body": {
+                    "model": r["body"]["model"],
+                    "choices": [{"message": {"role": "assistant", "content": r["body"]["messages"][0]["content"].upper()}}],
+                    "usage": {"total_tokens": 3},
+                }}}
+                for r in self.uploaded[:2]
+            ]
+            return httpx.Response(200, content="\n".join(json.dumps(l) for l in lines))
+        if path == "/v1/files/file-err/content":
+            line = {"custom_id": "r3", "response": {"status_code": 400, "body": {"error": {"message": "too long"}}}}
+            return httpx.Response(200, content=json.dumps(line))
+        return httpx.Response(404)
+
+@pytest.mark.asyncio
+async def test_openai_batch():
+    """Test requests are uploaded as JSONL, polled and mapped back by id."""
+    upstream = MockOpenAI()
+    provider = OpenAIProvider(api_key="key", default_model="gpt-4o-mini", transport=httpx.MockTransport(upstream))
+    backend = batch_backend(provider, poll_interval=0.001)
+    assert isinstance(backend, OpenAIBatch)
+
+    results = {r.id: r async for r in backend.run(REQUESTS)}
+    assert upstream.uploaded[0] == {
+        "custom_id": "r1", "method": "POST", "url": "/v1/chat/completions",
+        "body": {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "one"}],
+                 "temperature": 0.7, "max_tokens": 10},
+    }
+    assert upstream.polls == 3
+    assert results["r1"].response.message.content == "ONE"
+    assert results["r2"].response.usage == {"total_tokens": 3}
+    assert "too long" in results["r3"].error
+
+    upstream = MockOpenAI(final_status="failed")
+    provider = OpenAIProvider(api_key="key", transport=httpx.MockTransport(upstream))
+    with pytest.raises(BatchError, match="invalid model"):
+        [r async for r in OpenAIBatch(provider, poll_interval=0.001).run(REQUESTS)]
+
+@pytest.mark.asyncio
+async def test_anthropic_batch():
+    """Test Message Batches results are mapped back by id, including missing ones."""
+    polls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v1/messages/batches":
+            body = json.loads(request.content)
+            assert [r["custom_id"] for r in body["requests"]] == ["r1", "r2", "r3"]
+            assert body["requests"][0]["params"]["max_tokens"] == 10
+            assert body["requests"][1]["params"]["system"] == [{"type": "text", "text": "Be brief."}]
+            assert body["requests"][1]["params"]["messages"] == [{"role": "user", "content": "two"}]
+            return httpx.Response(200, json={"id": "msgbatch_1", "processing_status": "in_progress"})
+        if path == "/v1/messages/batches/msgbatch_1":
+            polls.append(1)
+            return httpx.Response(200, json={"id": "msgbatch_1", "processing_status": "ended" if len(polls) > 1 else "in_progress"})
+        if path == "/v1/messages/batches/msgbatch_1/results":
+            lines = [
+                {"custom_id": "r2", "result": {"type": "succeeded", "message": {
+                    "model": "claude", "content": [{"type": "text", "text": "Two"}],
+                    "usage": {"input_tokens": 2, "output_tokens": 1},
+                }}},
+                {"custom_id": "r1", "result": {"type": "expired"}},
+            ]
+            return httpx.Response(200, content="\n".join(json.dumps(l) for l in lines))
+        return httpx.Response(404)
+
+    provider = AnthropicProvider(api_key="key", transport=httpx.MockTransport(handler))
+    backend = batch_backend(provider, poll_interval=0.001)
+    assert isinstance(backend, AnthropicBatch)
+
+    results = [r async for r in backend.run(REQUESTS)]
+    assert [r.id for r in results] == ["r2", "r1", "r3"]
+    assert results[0].response.message.content == "Two"
+    assert results[0].response.usage["prompt_tokens"] == 2
+    assert results[1].error == "expired"
+    assert "No result" in results[2].error
+
+@pytest.mark.asyncio
+async def test_local_fallback():
+    """Test providers without a batch API run batches concurrently."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][-1]["content"]
+        if content == "two":
+            return httpx.Response(500)
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": content[::-1]}})
+
+    backend = batch_backend(OllamaProvider(transport=httpx.MockTransport(handler)), concurrency=2)
+    assert isinstance(backend, LocalBatch)
+
+    results = {r.id: r async for r in backend.run(REQUESTS)}
+    assert results["r1"].response.message.content == "eno"
+    assert results["r2"].error.startswith("HTTPStatusError")
+    assert results["r3"].response.message.content == "eerht"
+
+    with pytest.raises(ValueError):
+        [r async for r in backend.run(REQUESTS + REQUESTS[:1])]
@@ -0,0 +1,61 @@
+import pytest
+import httpx
+import json
+import tracemalloc
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.conversation import Conversation, encode_body, iter_encode_body
+
+class DrainTransport(httpx.AsyncBaseTransport):
+    """Transport consuming the request body chunk by chunk without keeping it."""
+
+    def __init__(self):
+        self.received = 0
+        self.chunked = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.chunked = "content-length" not in request.headers
+        async for chunk in request.stream:
+            self.received += len(chunk)
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "ok"}})
+
+def test_incremental_encoding_matches():
+    """Test the incremental encoder produces the same JSON as encoding in one go."""
+    content = 'Long "quoted"\ntext with é and 😀 ' * 50
+    messages = [Message(role="system", content="Be brief."), Message(role="user", content=content)]
+    payload = {"model": "m", "stream": True, "options": {"temperature": 0.5}}
+    expected = {**payload, "messages": [{"role": m.role, "content": m.content} for m in messages]}
+
+    for value in (messages, Conversation(messages), expected["messages"]):
+        body = b"".join(iter_encode_body({**payload, "messages": value}, chunk_size=7))
+        assert json.loads(body) == expected
+    assert json.loads(b"".join(iter_encode_body({"model": "m"}))) == {"model": "m"}
+
+def test_large_messages_are_not_cached():
+    """Test conversations skip the encoding cache for very large messages."""
+    conversation = Conversation([Message(role="user", content="x" * (Conversation.cache_limit + 1))])
+    assert conversation._encoded == [None]
+    assert json.loads(encode_body({"messages": conversation}))["messages"][0]["content"][:3] == "xxx"
+
+@pytest.mark.asyncio
+async def test_peak_memory_is_bounded():
+    """Test a huge context is uploaded without a full copy of the body in memory."""
+    content = "All work and no play. " * (1 << 20)  # 22 MiB
+    messages = [Message(role="user", content=content)]
+    transport = DrainTransport()
+    provider = OllamaProvider(transport=transport)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        response = await provider.chat(messages)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert response.message.content == "ok"
+    assert transport.chunked
+    assert transport.received > len(content)
+    assert peak - start < 2 * 1024 * 1024
+    await provider.close()
@@ -0,0 +1,61 @@
+import pytest
+import asyncio
+import httpx
+import time
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.cassette import (
+    CassetteError, RecordingTransport, ReplayTransport, load_cassette
+)
+
+class ChunkedBody(httpx.AsyncByteStream):
+    """Streamed NDJSON body delivered in two chunks with a delay between them."""
+
+    async def __aiter__(self):
+        yield b'{"message": {"role": "assistant", "content": "Hel"}, "done": false}\n'
+        await asyncio.sleep(0.1)
+        yield b'{"message": {"role": "assistant", "content": "lo"}, "done": false}\n{"done": true}\n'
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, stream=ChunkedBody())
+
+async def stream_text(provider: OllamaProvider) -> list:
+    stream = await provider.chat([Message(role="user", content="Hi")], stream=True)
+    return [chunk.message.content async for chunk in stream]
+
+@pytest.mark.asyncio
+async def test_record_and_replay(tmp_path):
+    """Test a recorded streaming exchange replays with its chunk boundaries."""
+    path = str(tmp_path / "ollama.jsonl")
+    recorder = OllamaProvider(transport=RecordingTransport(path, httpx.MockTransport(upstream)))
+    assert await stream_text(recorder) == ["Hel", "lo"]
+    await recorder.close()
+
+    [exchange] = load_cassette(path)
+    assert exchange["request"]["url"] == "http://localhost:11434/api/chat"
+    assert len(exchange["response"]["chunks"]) == 2
+    first, second = (t for t, _ in exchange["response"]["chunks"])
+    assert second - first >= 0.1
+
+    replayer = OllamaProvider(base_url="http://other-host:1234", transport=ReplayTransport(path))
+    start = time.monotonic()
+    assert await stream_text(replayer) == ["Hel", "lo"]
+    assert time.monotonic() - start < 0.1
+    with pytest.raises(CassetteError):
+        await stream_text(replayer)
+    await replayer.close()
+
+@pytest.mark.asyncio
+async def test_realtime_replay(tmp_path):
+    """Test realtime replay reproduces the recorded timing, scaled by speed."""
+    path = str(tmp_path / "ollama.jsonl")
+    recorder = OllamaProvider(transport=RecordingTransport(path, httpx.MockTransport(upstream)))
+    await stream_text(recorder)
+    await recorder.close()
+
+    replayer = OllamaProvider(transport=ReplayTransport(path, realtime=True, speed=2.0, loop=True))
+    for _ in range(2):
+        start = time.monotonic()
+        assert await stream_text(replayer) == ["Hel", "lo"]
+        assert 0.04 <= time.monotonic() - start < 0.5
+    await replayer.close()
@@ -0,0 +1,90 @@
+import pytest
+import asyncio
+import httpx
+import json
+
+from simplemodelrouter import Message, OllamaProvider, OpenAIProvider
+from simplemodelrouter.catalog import UnknownModelError
+from simplemodelrouter.router import Router
+
+messages = [Message(role="user", content="Hi")]
+
+class MockOpenAI:
+    """OpenAI-style API listing two models and echoing the requested model."""
+
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if request.url.path == "/v1/models":
+            return httpx.Response(200, json={"data": [
+                {"id": "gpt-4o-mini"},
+                {"id": "local-llama", "max_model_len": 8192},
+            ]})
+        model = json.loads(request.content)["model"]
+        return httpx.Response(200, json={
+            "model": model, "usage": {},
+            "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+        })
+
+@pytest.mark.asyncio
+async def test_validation_and_aliases():
+    """Test unknown models fail locally and aliases resolve once the catalog is loaded."""
+    upstream = MockOpenAI()
+    provider = OpenAIProvider(api_key="key", transport=httpx.MockTransport(upstream))
+    catalog = provider.enable_catalog(aliases={"fast": "gpt-4o-mini"})
+
+    # Not loaded yet: requests pass through and a refresh starts in the background
+    assert (await provider.chat(messages, model="gpt-4o")).model == "gpt-4o"
+    await asyncio.sleep(0.01)
+    assert catalog.loaded
+    upstream.paths.clear()
+
+    with pytest.raises(UnknownModelError) as error:
+        await provider.chat(messages, model="gpt-4o-mni")
+    assert error.value.suggestions == ["gpt-4o-mini"]
+    assert upstream.paths == []
+
+    assert (await provider.chat(messages, model="fast")).model == "gpt-4o-mini"
+    assert catalog.context_window("gpt-4o-mini") == 128000
+    assert catalog.context_window("local-llama") == 8192
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_stale_catalog_refreshes_in_background():
+    """Test lookups on a stale catalog answer immediately and refresh asynchronously."""
+    upstream = MockOpenAI()
+    provider = OpenAIProvider(api_key="key", transport=httpx.MockTransport(upstream))
+    catalog = provider.enable_catalog(refresh_interval=0.0)
+    await catalog.refresh()
+    upstream.paths.clear()
+
+    assert catalog.contains("gpt-4o-mini") is True
+    assert upstream.paths == []
+    await asyncio.sleep(0.01)
+    assert upstream.paths == ["/v1/models"]
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_ollama_tags_and_router_eligibility():
+    """Test Ollama names match without tags and the Router skips nodes lacking a model."""
+    def node(models):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": [{"name": m} for m in models]})
+            return httpx.Response(200, json={"message": {"role": "assistant", "content": request.url.host}})
+        return handler
+
+    a = OllamaProvider(base_url="http://a:11434", transport=httpx.MockTransport(node(["llama3:latest"])))
+    b = OllamaProvider(base_url="http://b:11434", transport=httpx.MockTransport(node(["mistral:7b"])))
+    for provider in (a, b):
+        await provider.enable_catalog().refresh()
+
+    assert a.catalog.resolve("llama3") == "llama3:latest"
+    router = Router([a, b], prefer_resident=False)
+    assert {router.select("mistral:7b").base_url for _ in range(2)} == {"http://b:11434"}
+    assert (await router.chat(messages, model="llama3")).message.content == "a"
+    with pytest.raises(UnknownModelError, match="mistral:7b"):
+        router.select("mistral")
+    await router.close()
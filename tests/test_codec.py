@@ -0,0 +1,33 @@
+import pytest
+
+from simplemodelrouter import codec
+from simplemodelrouter.codec import StdlibCodec, available_codecs, get_codec, set_codec
+
+DOCUMENT = {"model": "llama2", "messages": [{"role": "user", "content": "Héllo \"🌍\"\n"}], "n": 1.5}
+
+@pytest.fixture(autouse=True)
+def restore_codec(monkeypatch):
+    """Reset codec selection after each test."""
+    monkeypatch.setattr(codec, "_codec", None)
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_round_trip(name):
+    """Test every installed codec encodes compact UTF-8 and decodes bytes and str."""
+    selected = set_codec(name)
+    encoded = selected.encode(DOCUMENT)
+
+    assert isinstance(encoded, bytes)
+    assert encoded == StdlibCodec().encode(DOCUMENT)
+    assert selected.decode(encoded) == DOCUMENT
+    assert selected.decode(encoded.decode("utf-8")) == DOCUMENT
+    assert get_codec() is selected
+
+def test_auto_selects_fastest_installed():
+    """Test the first installed codec in preference order is selected."""
+    assert get_codec().name == available_codecs()[0]
+    assert "json" in available_codecs()
+
+def test_unknown_codec():
+    """Test selecting an unknown codec fails."""
+    with pytest.raises(ValueError):
+        set_codec("yaml")
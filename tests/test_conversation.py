@@ -0,0 +1,77 @@
+import pytest
+import httpx
+import json
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.conversation import Conversation, encode_body
+
+def test_encoded_matches_json():
+    """Test the spliced encoding matches encoding the whole message list."""
+    conversation = Conversation([Message(role="system", content="Be brief.")])
+    conversation.add("user", "Héllo \"there\"\n")
+
+    expected = [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Héllo \"there\"\n"},
+    ]
+    assert json.loads(conversation.encoded()) == expected
+    assert len(conversation) == 2
+    assert [m.role for m in conversation] == ["system", "user"]
+
+def test_slices_share_encodings():
+    """Test slicing returns a Conversation sharing fragments and the remaining cache prefix."""
+    conversation = Conversation([Message(role="system", content="Be brief.")])
+    conversation.add("user", "Hi")
+    conversation.add("assistant", "Hello")
+    conversation.cache_prefix = 2
+
+    rest = conversation[1:]
+    assert conversation[0].content == "Be brief."
+    assert [m.content for m in rest] == ["Hi", "Hello"]
+    assert rest._encoded[0] is conversation._encoded[1]
+    assert rest.cache_prefix == 1
+    assert conversation[2:].cache_prefix == 0
+    with pytest.raises(ValueError):
+        conversation[::2]
+
+def test_messages_are_encoded_once():
+    """Test appending a message leaves earlier fragments untouched."""
+    conversation = Conversation()
+    conversation.add("user", "first")
+    fragment = conversation._encoded[0]
+
+    conversation.add("assistant", "second")
+
+    assert conversation._encoded[0] is fragment
+
+def test_encode_body_splices_messages():
+    """Test request bodies embed the pre-encoded messages."""
+    conversation = Conversation([Message(role="user", content="Hi")])
+
+    body = json.loads(encode_body({"model": "m", "stream": False, "messages": conversation}))
+    assert body == {"model": "m", "stream": False, "messages": [{"role": "user", "content": "Hi"}]}
+
+    assert json.loads(encode_body({"messages": conversation})) == {
+        "messages": [{"role": "user", "content": "Hi"}]
+    }
+    assert json.loads(encode_body({"model": "m"})) == {"model": "m"}
+
+@pytest.mark.asyncio
+async def test_provider_accepts_conversation():
+    """Test providers send a Conversation as the request's messages."""
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "Hey"}})
+
+    provider = OllamaProvider(transport=httpx.MockTransport(handler))
+    conversation = Conversation([Message(role="user", content="Hi")])
+
+    response = await provider.chat(conversation)
+    conversation.append(response.message)
+    conversation.add("user", "Again")
+    await provider.chat(conversation)
+
+    assert [m["content"] for m in bodies[1]["messages"]] == ["Hi", "Hey", "Again"]
+    await provider.close()
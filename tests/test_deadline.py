@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+import httpx
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.deadline import Deadline, DeadlineExceeded
+
+class SlowStream(httpx.AsyncByteStream):
+    """Response body yielding one line per delay, recording when it is closed."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.closed = False
+
+    async def __aiter__(self):
+        for delay in self.delays:
+            await asyncio.sleep(delay)
+            yield b'{"message": {"role": "assistant", "content": "tok"}, "done": false}\n'
+        yield b'{"done": true}\n'
+
+    async def aclose(self):
+        self.closed = True
+
+def make_provider(handler) -> OllamaProvider:
+    """Create an Ollama provider backed by a mock transport."""
+    return OllamaProvider(transport=httpx.MockTransport(handler))
+
+def test_coerce():
+    """Test deadlines can be given as seconds."""
+    assert Deadline.coerce(None) is None
+    deadline = Deadline.coerce(5)
+    assert 4.9 < deadline.remaining() <= 5
+    assert Deadline.coerce(deadline) is deadline
+    assert Deadline().remaining() is None
+
+@pytest.mark.asyncio
+async def test_idle_timeout_closes_stream():
+    """Test a stalled stream raises DeadlineExceeded and releases the response."""
+    body = SlowStream([0, 0, 10])
+    provider = make_provider(lambda request: httpx.Response(200, stream=body))
+
+    stream = await provider.chat(
+        [Message(role="user", content="Hi")],
+        stream=True,
+        deadline=Deadline(timeout=5, idle=0.05)
+    )
+    chunks = []
+    with pytest.raises(DeadlineExceeded):
+        async for chunk in stream:
+            chunks.append(chunk)
+
+    assert len(chunks) == 2
+    assert body.closed
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_ttft_timeout():
+    """Test the first-token timeout applies before the first chunk."""
+    body = SlowStream([10])
+    provider = make_provider(lambda request: httpx.Response(200, stream=body))
+
+    stream = await provider.chat(
+        [Message(role="user", content="Hi")], stream=True, deadline=Deadline(ttft=0.05)
+    )
+    with pytest.raises(DeadlineExceeded):
+        await stream.__anext__()
+
+    assert body.closed
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_consumer_stop_closes_stream():
+    """Test closing the stream early releases the upstream response."""
+    body = SlowStream([0] * 100)
+    provider = make_provider(lambda request: httpx.Response(200, stream=body))
+
+    stream = await provider.chat([Message(role="user", content="Hi")], stream=True)
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert body.closed
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_total_deadline_non_streaming():
+    """Test the total deadline bounds a non-streaming call."""
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    provider = make_provider(handler)
+
+    with pytest.raises(DeadlineExceeded):
+        await provider.complete("Hi", deadline=0.05)
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_unbounded_wait_passes_errors_through():
+    """Test a timeout raised by the awaited call itself is not reported as the deadline's."""
+    async def timing_out():
+        raise asyncio.TimeoutError("upstream")
+
+    with pytest.raises(asyncio.TimeoutError, match="upstream") as info:
+        await Deadline(idle=1).wait(timing_out())
+    assert not isinstance(info.value, DeadlineExceeded)
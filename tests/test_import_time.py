@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import simplemodelrouter
+from simplemodelrouter import registry
+from simplemodelrouter.base import LLMProvider
+
+# Cumulative `import simplemodelrouter` time budget, in microseconds, measured
+# with `python -X importtime`. Raise it deliberately, not to make a failure go away.
+IMPORT_BUDGET_US = int(os.environ.get("SIMPLEMODELROUTER_IMPORT_BUDGET_US", 30_000))
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter with the repository on the path."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+def import_time_us() -> int:
+    """Return the cumulative import time of the package from `-X importtime`."""
+    result = run_python("-X", "importtime", "-c", "import simplemodelrouter")
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == "simplemodelrouter":
+            return int(cumulative)
+    raise AssertionError("simplemodelrouter missing from -X importtime output")
+
+def test_import_time_budget():
+    """Test importing the package stays within the import-time budget."""
+    best = min(import_time_us() for _ in range(3))
+    assert best <= IMPORT_BUDGET_US, (
+        f"import simplemodelrouter took {best}us, budget is {IMPORT_BUDGET_US}us"
+    )
+
+def test_import_does_not_load_heavy_dependencies():
+    """Test httpx, pydantic and the providers are only imported on first use."""
+    result = run_python("-c", (
+        "import sys, simplemodelrouter; "
+        "print(','.join(m for m in ('httpx', 'pydantic', 'asyncio', "
+        "'simplemodelrouter.providers.openai') if m in sys.modules))"
+    ))
+    assert result.stdout.strip() == ""
+
+def test_lazy_attributes():
+    """Test providers resolve through module attributes and the registry."""
+    from simplemodelrouter.providers.openai import OpenAIProvider
+
+    assert simplemodelrouter.OpenAIProvider is OpenAIProvider
+    assert registry.get_provider("openai") is OpenAIProvider
+    assert "OllamaProvider" in dir(simplemodelrouter)
+    with pytest.raises(AttributeError):
+        simplemodelrouter.MissingProvider
+
+def test_entry_point_providers(monkeypatch):
+    """Test third-party providers are discovered through entry points."""
+
+    class EntryPoint:
+        name = "custom"
+        value = "simplemodelrouter.providers.ollama:OllamaProvider"
+
+    monkeypatch.setattr(registry, "_providers", dict(registry._providers))
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points",
+        lambda group: [EntryPoint()] if group == registry.ENTRY_POINT_GROUP else []
+    )
+
+    assert "custom" in registry.available_providers()
+    provider_class = registry.get_provider("custom")
+    assert issubclass(provider_class, LLMProvider)
+    with pytest.raises(KeyError):
+        registry.get_provider("missing")
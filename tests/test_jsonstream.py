@@ -0,0 +1,89 @@
+import pytest
+import json
+
+from simplemodelrouter.base import LLMProvider, Message, ChatResponse
+from simplemodelrouter.jsonstream import JSONStreamError, JSONStreamParser
+
+DOCUMENT = (
+    '{"items": [{"name": "caf\\u00e9 \\"one\\"", "tags": ["a", "b"]}, '
+    '{"name": "two", "score": -1.5e2, "ok": true, "none": null}, []], "count": 2}'
+)
+
+def parse(pieces):
+    parser = JSONStreamParser()
+    events = [event for piece in pieces for event in parser.feed(piece)]
+    parser.close()
+    return parser, events
+
+def test_split_anywhere():
+    """Test every split of the document parses to the same value and items."""
+    expected = json.loads(DOCUMENT)
+    for split in range(1, len(DOCUMENT)):
+        parser, events = parse([DOCUMENT[:split], DOCUMENT[split:]])
+        assert parser.value == expected
+        items = [(e.path, e.value) for e in events if e.kind == "item"]
+        assert items == [
+            (("items", 0, "tags", 0), "a"),
+            (("items", 0, "tags", 1), "b"),
+            (("items", 0), expected["items"][0]),
+            (("items", 1), expected["items"][1]),
+            (("items", 2), []),
+        ]
+        assert events[-1].kind == "done"
+
+def test_partial_values_and_items_arrive_early():
+    """Test completed array elements are reported before the document ends."""
+    parser = JSONStreamParser()
+    events = parser.feed('```json\n[{"id": 1}, {"id": ')
+    assert [(e.kind, e.value) for e in events] == [
+        ("item", {"id": 1}),
+        ("partial", [{"id": 1}, {}]),
+    ]
+    assert [e.kind for e in parser.feed('2}]\n```')] == ["item", "done"]
+    assert parser.value == [{"id": 1}, {"id": 2}]
+
+@pytest.mark.parametrize("text", ['{"a" 1}', '[1,]', '{"a": tru}', '[1 2]', '{"a": -}'])
+def test_invalid_json(text):
+    """Test malformed documents raise JSONStreamError."""
+    with pytest.raises(JSONStreamError):
+        parse(list(text))
+
+def test_incomplete_json():
+    """Test a stream ending mid-document raises JSONStreamError."""
+    with pytest.raises(JSONStreamError):
+        parse(['{"a": [1, 2'])
+
+class ScriptedProvider(LLMProvider):
+    """Provider streaming a fixed list of content deltas."""
+
+    def __init__(self, deltas):
+        super().__init__(api_key="", default_model="test-model")
+        self.deltas = deltas
+        self.sent = 0
+
+    async def chat(self, messages, model=None, temperature=0.7, stream=False, **kwargs):
+        return self._stream()
+
+    async def _stream(self):
+        for delta in self.deltas:
+            self.sent += 1
+            yield ChatResponse(message=Message(role="assistant", content=delta), model="m", usage={})
+
+    async def complete(self, prompt, model=None, temperature=0.7, stream=False, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_stream_json():
+    """Test stream_json yields items while the reply is still streaming."""
+    deltas = ['[{"n"', ': 1}', ', {"n": 2}', ', {"n": 3}]']
+    provider = ScriptedProvider(deltas)
+    seen = []
+    async for event in provider.stream_json([Message(role="user", content="List")]):
+        if event.kind == "item":
+            seen.append((event.value["n"], provider.sent))
+        final = event
+    assert seen == [(1, 2), (2, 3), (3, 4)]
+    assert final.kind == "done"
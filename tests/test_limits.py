@@ -0,0 +1,107 @@
+import pytest
+import asyncio
+import httpx
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.limits import (
+    AIMDLimit, GradientLimit, LimitExceeded, LimitedProvider
+)
+
+def test_aimd_limit():
+    """Test AIMD grows under load and backs off on drops and slow requests."""
+    limit = AIMDLimit(initial=10, max_limit=11, timeout=1.0)
+    limit.on_sample(0.1, in_flight=2, dropped=False)
+    assert limit.limit == 10  # mostly idle, no evidence more is needed
+    limit.on_sample(0.1, in_flight=5, dropped=False)
+    limit.on_sample(0.1, in_flight=5, dropped=False)
+    assert limit.limit == 11
+    limit.on_sample(0.1, in_flight=11, dropped=True)
+    assert limit.limit == 9
+    limit.on_sample(2.0, in_flight=9, dropped=False)
+    assert limit.limit == 8
+
+def test_gradient_limit():
+    """Test the gradient limit grows at stable latency and shrinks as latency rises."""
+    limit = GradientLimit(initial=20)
+    for _ in range(20):
+        limit.on_sample(0.1, in_flight=limit.limit, dropped=False)
+    grown = limit.limit
+    assert grown > 20
+
+    limit.on_sample(0.1, in_flight=1, dropped=False)
+    assert limit.limit == grown
+
+    for _ in range(10):
+        limit.on_sample(0.5, in_flight=limit.limit, dropped=False)
+    assert limit.limit < grown
+
+@pytest.mark.asyncio
+async def test_rejects_or_waits_beyond_the_limit(fake_provider):
+    """Test requests over the limit are rejected, or wait up to max_wait."""
+    provider = fake_provider
+    provider.gate.clear()
+    limited = LimitedProvider(provider, AIMDLimit(initial=2))
+    running = [asyncio.ensure_future(limited.complete("a")) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(LimitExceeded):
+        await limited.complete("b")
+    assert limited.metrics()["in_flight"] == 2
+    assert limited.metrics()["rejections"] == 1
+
+    limited.max_wait = 1.0
+    waiting = asyncio.ensure_future(limited.complete("c"))
+    await asyncio.sleep(0)
+    assert limited.metrics()["queued"] == 1
+    provider.gate.set()
+    assert (await waiting).text == "c"
+    await asyncio.gather(*running)
+    assert limited.metrics()["in_flight"] == 0
+    assert limited.metrics()["requests"] == 3
+
+@pytest.mark.asyncio
+async def test_streams_hold_their_slot(fake_provider):
+    """Test a stream occupies a slot until it is consumed."""
+    limited = LimitedProvider(fake_provider, AIMDLimit(initial=1))
+
+    stream = await limited.complete("hi", stream=True)
+    with pytest.raises(LimitExceeded):
+        await limited.complete("x")
+    assert "".join([c.text async for c in stream]) == "hi"
+    assert limited.metrics()["in_flight"] == 0
+    assert limited.metrics()["rtt"] is not None
+
+    stream = await limited.complete("unread", stream=True)
+    await stream.aclose()
+    assert limited.metrics()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_throttling_lowers_the_limit():
+    """Test 429 responses count as drops, streamed or not."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429)
+
+    limited = LimitedProvider(OllamaProvider(transport=httpx.MockTransport(handler)), AIMDLimit(initial=10))
+    messages = [Message(role="user", content="Hi")]
+    with pytest.raises(httpx.HTTPStatusError):
+        await limited.chat(messages)
+    with pytest.raises(httpx.HTTPStatusError):
+        [c async for c in await limited.chat(messages, stream=True)]
+
+    assert limited.metrics()["drops"] == 2
+    assert limited.metrics()["limit"] == 8
+    await limited.close()
+
+@pytest.mark.asyncio
+async def test_transport_timeouts_count_as_drops():
+    """Test httpx timeouts raised by a wrapped provider count as drops."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    limited = LimitedProvider(OllamaProvider(transport=httpx.MockTransport(handler)), AIMDLimit(initial=10))
+    with pytest.raises(httpx.ReadTimeout):
+        await limited.chat([Message(role="user", content="Hi")])
+
+    assert limited.metrics()["drops"] == 1
+    assert limited.metrics()["limit"] == 9
+    await limited.close()
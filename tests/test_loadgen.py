@@ -0,0 +1,95 @@
+import pytest
+import asyncio
+import httpx
+import json
+import os
+
+from simplemodelrouter import OllamaProvider
+from simplemodelrouter.loadgen import Arrival, LoadGenerator, load_trace, main, percentile, poisson_arrivals
+
+CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "openai_chat_stream.jsonl")
+
+def test_arrival_schedules(tmp_path):
+    """Test Poisson arrivals match their rate and traces are read relative to their start."""
+    arrivals = list(poisson_arrivals(rate=100.0, duration=20.0, seed=1))
+    assert 1800 < len(arrivals) < 2200
+    assert all(a.at <= b.at for a, b in zip(arrivals, arrivals[1:]))
+    assert len(list(poisson_arrivals(rate=5.0, count=7))) == 7
+
+    trace = tmp_path / "trace.jsonl"
+    trace.write_text(
+        '{"timestamp": 1700000010.5, "prompt_tokens": 8, "stream": false}\n'
+        '{"timestamp": 1700000010.0, "model": "llama3", "params": {"top_p": 0.5}}\n'
+    )
+    first, second = load_trace(str(trace))
+    assert (first.at, first.stream, first.model, first.params) == (0.0, True, "llama3", {"top_p": 0.5})
+    assert (second.at, second.prompt_tokens, second.stream) == (0.5, 8, False)
+
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([], 99) is None
+
+@pytest.mark.asyncio
+async def test_open_loop_reports_queueing_and_errors():
+    """Test arrivals are sent on schedule while earlier requests are still running."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if len(body["messages"][0]["content"].split()) > 100:
+            return httpx.Response(503)
+        await asyncio.sleep(0.1)
+        lines = b'{"message": {"content": "a"}, "done": false}\n{"message": {"content": ""}, "done": true}\n'
+        return httpx.Response(200, content=lines)
+
+    provider = OllamaProvider(transport=httpx.MockTransport(handler))
+    arrivals = [Arrival(at=i * 0.01, prompt_tokens=500 if i % 5 == 4 else 10) for i in range(10)]
+    report = await LoadGenerator(provider).run(arrivals)
+    data = report.to_dict()
+
+    # Closed-loop, the eight successful requests alone would take 0.8s
+    assert report.duration < 0.4
+    assert data["completed"] == 8
+    assert data["errors"] == {"HTTP 503": 2}
+    assert 0.1 <= data["ttft"]["p50"] <= data["latency"]["p99"] < 0.3
+    assert "errors   HTTP 503: 2" in report.summary()
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_ttft_waits_for_text():
+    """Test time to first token is measured at the first chunk with text, not an empty one."""
+    async def body():
+        yield b'{"message": {"role": "assistant", "content": ""}, "done": false}\n'
+        await asyncio.sleep(0.1)
+        yield b'{"message": {"content": "a"}, "done": false}\n{"done": true}\n'
+
+    provider = OllamaProvider(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body())))
+    report = await LoadGenerator(provider).run([Arrival(at=0.0)])
+
+    assert report.results[0].chunks == 2
+    assert report.results[0].ttft >= 0.1
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_offered_rate_follows_speed():
+    """Test the offered rate is measured on the sped-up schedule, not the trace's clock."""
+    provider = OllamaProvider(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"message": {"role": "assistant", "content": "a"}})
+    ))
+    arrivals = [Arrival(at=i * 0.1, stream=False) for i in range(5)]
+    data = (await LoadGenerator(provider, speed=4.0).run(arrivals)).to_dict()
+
+    assert data["offered_rate"] == pytest.approx(5 / 0.1)
+    await provider.close()
+
+def test_cli_with_cassette(tmp_path, capsys):
+    """Test the command line replays a trace against a recorded provider."""
+    trace, output = tmp_path / "trace.jsonl", tmp_path / "report.json"
+    trace.write_text("".join(f'{{"timestamp": {i * 0.01}}}\n' for i in range(5)))
+
+    assert main([
+        "--provider", "openai", "--api-key", "test", "--cassette", CASSETTE, "--cassette-speed", "10",
+        "--trace", str(trace), "--output", str(output),
+    ]) == 0
+
+    report = json.loads(output.read_text())
+    assert report["completed"] == 5
+    assert 0.02 < report["ttft"]["p50"] < report["latency"]["p50"]
+    assert "5 requests" in capsys.readouterr().err
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+import httpx
+import json
+
+from simplemodelrouter import OllamaProvider, Router, Message, ChatResponse
+
+def make_provider(handler, **kwargs) -> OllamaProvider:
+    """Create an Ollama provider backed by a mock transport."""
+    return OllamaProvider(transport=httpx.MockTransport(handler), **kwargs)
+
+def node_handler(loaded, requests=None):
+    """Mock Ollama node with a fixed set of loaded models."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"name": m} for m in loaded]})
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": "llama2:latest"}, {"name": "mistral:7b"}]})
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={"model": "llama2", "response": "", "done": True})
+        return httpx.Response(200, json={
+            "message": {"role": "assistant", "content": "Hi"},
+            "prompt_eval_count": 3,
+            "eval_count": 2,
+            "done": True
+        })
+    return handler
+
+@pytest.mark.asyncio
+async def test_refresh_models():
+    """Test loaded and available models are read from /api/ps and /api/tags."""
+    provider = make_provider(node_handler(["mistral:7b"]))
+
+    await provider.refresh_models()
+
+    assert provider.loaded_models == ["mistral:7b"]
+    assert provider.available_models == ["llama2:latest", "mistral:7b"]
+    assert provider.is_loaded("mistral:7b")
+    assert not provider.is_loaded("llama2")
+
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_keep_alive_and_preload():
+    """Test per-model keep_alive is sent and preload marks the model resident."""
+    requests = []
+    provider = make_provider(node_handler([], requests), keep_alive="5m")
+    provider.set_keep_alive("llama2", -1)
+
+    await provider.preload()
+    response = await provider.chat([Message(role="user", content="Hello")], model="mistral:7b")
+
+    assert json.loads(requests[0].content) == {"model": "llama2", "keep_alive": -1}
+    assert json.loads(requests[1].content)["keep_alive"] == "5m"
+    assert isinstance(response, ChatResponse)
+    assert provider.is_loaded("llama2")
+    assert provider.is_loaded("mistral:7b")
+
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_router_prefers_resident_node():
+    """Test the router sends requests to nodes where the model is loaded."""
+    cold = make_provider(node_handler([]))
+    warm = make_provider(node_handler(["llama2:latest"]))
+    await cold.refresh_models()
+    await warm.refresh_models()
+
+    router = Router([cold, warm])
+
+    assert router.select("llama2") is warm
+    assert router.select("llama2") is warm
+    assert {router.select("mistral:7b"), router.select("mistral:7b")} == {cold, warm}
+
+    await router.close()
+
+@pytest.mark.asyncio
+async def test_polling_survives_malformed_responses():
+    """Test a response missing the expected keys is logged and polling continues."""
+    polls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/ps":
+            polls.append(request)
+            if len(polls) == 1:
+                return httpx.Response(200, json={"models": [{"model": "no-name"}]})
+        return node_handler(["mistral:7b"])(request)
+
+    provider = make_provider(handler)
+    provider.start_polling(interval=0.001)
+    for _ in range(100):
+        if provider.loaded_models:
+            break
+        await asyncio.sleep(0.005)
+
+    assert len(polls) >= 2
+    assert provider.loaded_models == ["mistral:7b"]
+
+    await provider.stop_polling()
+    await provider.close()
@@ -0,0 +1,92 @@
+import pytest
+import random
+
+from simplemodelrouter.base import ChatResponse, Message
+from simplemodelrouter.pipeline import (
+    PatternMatcher, ProfanityStage, RedactStage, ReplaceStage, StopStage, StreamPipeline
+)
+
+TEXT = "Key sk-live-1234 leaked, darn it. Darned bugs; sk-live-1234!\n\nUser: ignored"
+
+def make_pipeline():
+    return StreamPipeline([
+        StopStage(["\n\nUser:"]),
+        RedactStage(["sk-live-1234"]),
+        ProfanityStage(["darn"]),
+    ])
+
+def test_chunking_does_not_change_output():
+    """Test the output is the same however the stream is split into chunks."""
+    pipeline = make_pipeline()
+    expected = "Key [REDACTED] leaked, **** it. Darned bugs; [REDACTED]!"
+    assert pipeline.process(TEXT) == expected
+
+    rng = random.Random(0)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(TEXT)), rng.randint(1, 20)))
+        chunks = [TEXT[a:b] for a, b in zip([0] + cuts, cuts + [len(TEXT)])]
+        stages = [stage.fork() for stage in pipeline.stages]
+        output = ""
+        for chunk in chunks:
+            text, stopped = pipeline._feed(stages, chunk)
+            output += text
+            if stopped:
+                break
+        else:
+            output += pipeline._flush(stages)
+        assert output == expected
+
+def test_only_possible_match_prefix_is_held():
+    """Test the scanner releases everything but the suffix that could still match."""
+    scanner = PatternMatcher(["secret", "set"]).scanner()
+    assert scanner.feed("the se") == ["the "]
+    assert scanner.feed("cre") == []
+    events = scanner.feed("tive sec")
+    assert events[0].text == "secret" and events[0].start == 4
+    assert events[1:] == ["ive "]
+    assert scanner.flush() == ["sec"]
+
+def test_whole_words_and_case():
+    """Test whole-word matching waits for the next character and ignores case."""
+    stage = ReplaceStage(["ass"], "#", ignore_case=True, whole_words=True)
+    assert stage.feed("A class, an A") == "A class, an "
+    assert stage.feed("SS") == ""
+    assert stage.feed("!") == "#!"
+    assert stage.feed(" ass") == " "
+    assert stage.flush() == "#"
+
+def test_whole_words_fall_back_to_shorter_patterns():
+    """Test a shorter pattern on a word boundary matches where a longer one does not."""
+    pipeline = StreamPipeline([ProfanityStage(["bad word", "word"])])
+    assert pipeline.process("xbad word here") == "xbad **** here"
+    assert pipeline.process("a bad word here") == "a ******** here"
+
+@pytest.mark.asyncio
+async def test_stop_closes_upstream():
+    """Test a stop sequence ends the stream and closes the provider stream."""
+    closed = []
+
+    async def upstream():
+        try:
+            for piece in ["Answer: 4", "2\n\nUs", "er: next", " question", "more"]:
+                yield ChatResponse(message=Message(role="assistant", content=piece), model="m", usage={})
+        finally:
+            closed.append(True)
+
+    chunks = [c async for c in make_pipeline().apply(upstream())]
+
+    assert [c.message.content for c in chunks] == ["Answer: 4", "2"]
+    assert closed == [True]
+
+@pytest.mark.asyncio
+async def test_usage_chunk_follows_held_text():
+    """Test a textless usage chunk is passed on after the text held back before it."""
+    async def upstream():
+        yield ChatResponse(message=Message(role="assistant", content=""), model="m", usage={})
+        yield ChatResponse(message=Message(role="assistant", content="oh da"), model="m", usage={})
+        yield ChatResponse(message=Message(role="assistant", content=""), model="m", usage={"total_tokens": 3})
+
+    chunks = [c async for c in make_pipeline().apply(upstream())]
+
+    assert [c.message.content for c in chunks] == ["", "oh ", "da", ""]
+    assert chunks[-1].usage == {"total_tokens": 3}
@@ -0,0 +1,65 @@
+import pytest
+import asyncio
+import logging
+
+from simplemodelrouter.base import Message
+from simplemodelrouter.policy import ModelInfo, ModelRegistry, PolicyEngine
+from simplemodelrouter.router import Router
+
+REGISTRY = ModelRegistry([
+    ModelInfo("small", "ollama", 0.0, 0.0, 4096),
+    ModelInfo("mid", "openai", 0.5, 1.5, 16385, frozenset({"tools"})),
+    ModelInfo("large", "anthropic", 15.0, 75.0, 200000, frozenset({"tools", "vision"})),
+])
+
+def test_chooses_cheapest_eligible_model():
+    """Test the cheapest model with enough context and capabilities is chosen."""
+    engine = PolicyEngine(REGISTRY)
+    messages = [Message(role="user", content="Hello")]
+
+    assert engine.choose(messages).name == "small"
+    assert engine.choose(messages, capabilities=["tools"]).name == "mid"
+    assert engine.choose(messages, max_tokens=50000).name == "large"
+    assert engine.choose(messages, capabilities=["audio"]) is None
+
+def test_latency_slo_skips_slow_models():
+    """Test models observed to miss the SLO are skipped, falling back to the fastest."""
+    engine = PolicyEngine(REGISTRY, latency_slo=1.0)
+    engine.observe("small", 3.0)
+    engine.observe("mid", 2.0)
+    messages = [Message(role="user", content="Hello")]
+
+    assert engine.choose(messages).name == "large"
+
+    engine.observe("large", 5.0)
+    assert engine.choose(messages).name == "mid"
+
+def test_dry_run_logs_choice(caplog):
+    """Test dry-run mode logs the choice but returns the default model."""
+    engine = PolicyEngine(REGISTRY, dry_run=True)
+
+    with caplog.at_level(logging.INFO, logger="simplemodelrouter.policy"):
+        choice = engine.choose([Message(role="user", content="Hello")], default="large")
+
+    assert choice.name == "large"
+    assert "would choose small" in caplog.text
+
+@pytest.mark.asyncio
+async def test_router_feeds_latency_to_policy(fake_provider):
+    """Test the router routes by the policy and feeds it observed latencies."""
+    engine = PolicyEngine(REGISTRY, latency_slo=0.05)
+    router = Router([fake_provider], policy=engine)
+    messages = [Message(role="user", content="Hello")]
+
+    fake_provider.gate.clear()
+    asyncio.get_running_loop().call_later(0.1, fake_provider.gate.set)
+    await router.chat(messages)
+    assert engine.stats.estimate("small") >= 0.1
+
+    stream = await router.chat(messages, stream=True)
+    assert "".join([c.message.content async for c in stream]) == "Hello"
+    assert engine.stats.estimate("mid") is not None
+
+    response = await router.chat(messages, model="small")
+    assert response.model == "small"
+    assert fake_provider.models == ["small", "mid", "small"]
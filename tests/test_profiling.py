@@ -0,0 +1,94 @@
+import pytest
+import asyncio
+import httpx
+import time
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.profiling import PhaseTimers, SamplingProfiler, profile_for
+
+messages = [Message(role="user", content="Hi")]
+
+def ollama_stream(request: httpx.Request) -> httpx.Response:
+    lines = [b'{"message": {"role": "assistant", "content": "tok"}, "done": false}\n'] * 3
+    lines.append(b'{"message": {"role": "assistant", "content": ""}, "done": true, "eval_count": 3}\n')
+    return httpx.Response(200, content=b"".join(lines))
+
+@pytest.mark.asyncio
+async def test_phase_timers():
+    """Test request phases are timed, including the time chunks spend with the consumer."""
+    provider = OllamaProvider(transport=httpx.MockTransport(ollama_stream))
+    assert provider.profile is None
+    timers = provider.enable_profiling()
+
+    async for _ in await provider.chat(messages, stream=True):
+        await asyncio.sleep(0.02)
+    stats = timers.snapshot()
+
+    assert stats["yield"]["count"] == 4
+    assert stats["yield"]["seconds"] >= 0.07
+    assert stats["construct"]["count"] == 4
+    assert stats["decode"]["count"] == 4
+    for phase in ("build", "send", "read"):
+        assert stats[phase]["count"] >= 1
+    assert sum(s["seconds"] for s in stats.values()) < 1.0
+
+    timers.reset()
+    provider.disable_profiling()
+    async for _ in await provider.chat(messages, stream=True):
+        pass
+    assert timers.snapshot()["build"]["count"] == 0
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_shared_timers_for_complete_responses():
+    """Test non-streamed requests record every phase but yield into shared timers."""
+    timers = PhaseTimers()
+    provider = OllamaProvider(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"message": {"role": "assistant", "content": "ok"}})
+    ))
+    provider.enable_profiling(timers)
+
+    await provider.chat(messages)
+    await provider.chat(messages)
+
+    counts = {phase: stats["count"] for phase, stats in timers.snapshot().items()}
+    assert counts == {"build": 2, "send": 2, "read": 2, "decode": 2, "construct": 2, "yield": 0}
+    await provider.close()
+
+def spin_for(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampling_profiler(tmp_path):
+    """Test the sampling profiler writes collapsed stacks of the profiled thread."""
+    path = tmp_path / "profile.folded"
+    profiler = profile_for(0.2, str(path), interval=0.002)
+    assert profiler.running
+    spin_for(0.3)
+    profiler.stop()
+
+    lines = path.read_text().splitlines()
+    assert profiler.samples > 10
+    assert any("spin_for" in line for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("MainThread;") and int(count) > 0
+
+    with pytest.raises(RuntimeError):
+        profiler.start()
+        profiler.start()
+    profiler.stop()
+
+def test_restart_discards_earlier_samples():
+    """Test each run of a profiler starts from empty stacks."""
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start(0.05)
+    spin_for(0.1)
+    profiler.stop()
+    assert any("spin_for" in line for line in profiler.collapsed())
+
+    profiler.start()
+    profiler.stop()
+    assert profiler.samples <= 1
+    assert not any("spin_for" in line for line in profiler.collapsed())
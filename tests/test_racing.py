@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+import httpx
+import json
+from typing import Optional
+
+from simplemodelrouter import OllamaProvider, OpenAIProvider
+from simplemodelrouter.base import LLMProvider, Message, ChatResponse
+from simplemodelrouter.racing import RacingProvider
+
+class DelayedProvider(LLMProvider):
+    """Provider streaming two tokens after a fixed time to first token."""
+
+    def __init__(self, delay: float, error: Optional[Exception] = None):
+        super().__init__(api_key="", default_model="test-model")
+        self.delay = delay
+        self.error = error
+        self.closed = False
+
+    async def chat(self, messages, model=None, temperature=0.7, stream=False, **kwargs):
+        return self._stream(model or self.default_model)
+
+    async def _stream(self, model):
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for token in ("Hel", "lo"):
+                yield ChatResponse(message=Message(role="assistant", content=token), model=model, usage={})
+            yield ChatResponse(
+                message=Message(role="assistant", content=""), model=model,
+                usage={"prompt_tokens": 3, "completion_tokens": 2}
+            )
+        finally:
+            self.closed = True
+
+    async def complete(self, prompt, model=None, temperature=0.7, stream=False, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+messages = [Message(role="user", content="Hi")]
+
+@pytest.mark.asyncio
+async def test_first_token_wins():
+    """Test the fastest contender wins and the others are closed immediately."""
+    fast, slow = DelayedProvider(0.01), DelayedProvider(5.0)
+    racer = RacingProvider([(slow, "slow-model"), (fast, "fast-model")])
+
+    stream = await asyncio.wait_for(racer.chat(messages, stream=True), 1.0)
+    assert slow.closed
+    assert stream.report.winner == "delayed#2"
+    assert stream.report.cancelled == ["delayed"]
+    assert [c.message.content async for c in stream] == ["Hel", "lo", ""]
+    assert fast.closed
+
+@pytest.mark.asyncio
+async def test_non_streaming_race_and_ttft_saved():
+    """Test a non-streaming race returns the winner's full reply and TTFT saved."""
+    a, b = DelayedProvider(0.01), DelayedProvider(0.2)
+    racer = RacingProvider([a, b])
+    racer.ttft.record("delayed#2", 0.2)
+
+    response = await racer.chat(messages, model="m")
+    assert response.message.content == "Hello"
+    assert response.model == "m"
+    assert response.usage == {"prompt_tokens": 3, "completion_tokens": 2}
+    assert racer.last_report.ttft_saved == pytest.approx(0.19, abs=0.05)
+    assert racer.stats()["contenders"]["delayed"]["wins"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_contenders():
+    """Test a failing contender loses, and the race fails only if all fail."""
+    broken = DelayedProvider(0.0, error=ConnectionError("refused"))
+    racer = RacingProvider([broken, DelayedProvider(0.05)])
+    assert (await racer.chat(messages)).message.content == "Hello"
+    assert racer.last_report.failed == {"delayed": "refused"}
+
+    racer = RacingProvider([broken, DelayedProvider(0.0, error=ValueError("bad"))])
+    with pytest.raises(ConnectionError):
+        await racer.chat(messages)
+    assert racer.stats()["contenders"]["delayed#2"]["failures"] == 1
+
+class TimedBody(httpx.AsyncByteStream):
+    """Response body yielding each line after a delay."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    async def __aiter__(self):
+        for delay, line in self.lines:
+            await asyncio.sleep(delay)
+            yield line
+
+@pytest.mark.asyncio
+async def test_empty_first_chunk_does_not_win():
+    """Test an empty role chunk does not decide the race and is replayed to the winner's caller."""
+    def openai_handler(request: httpx.Request) -> httpx.Response:
+        chunk = {"model": "gpt", "choices": [{"delta": {"role": "assistant", "content": ""}}]}
+        text = {"model": "gpt", "choices": [{"delta": {"content": "slow"}}]}
+        return httpx.Response(200, stream=TimedBody([
+            (0, f"data: {json.dumps(chunk)}\n\n".encode()),
+            (0.5, f"data: {json.dumps(text)}\n\n".encode()),
+            (0, b"data: [DONE]\n\n"),
+        ]))
+
+    def ollama_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=TimedBody([
+            (0.05, b'{"message": {"role": "assistant", "content": "fast"}, "done": false}\n'),
+            (0, b'{"message": {"role": "assistant", "content": ""}, "done": true}\n'),
+        ]))
+
+    openai = OpenAIProvider(api_key="test", transport=httpx.MockTransport(openai_handler))
+    ollama = OllamaProvider(transport=httpx.MockTransport(ollama_handler))
+    racer = RacingProvider([openai, ollama])
+
+    stream = await racer.chat(messages, stream=True)
+    assert stream.report.winner == "ollama"
+    assert stream.report.ttft >= 0.05
+    assert [c.message.content async for c in stream] == ["fast"]
+
+    racer = RacingProvider([openai, OllamaProvider(transport=httpx.MockTransport(
+        lambda request: httpx.Response(500)
+    ))])
+    stream = await racer.chat(messages, stream=True)
+    assert stream.report.winner == "openai"
+    assert stream.report.ttft >= 0.5
+    assert [c.message.content async for c in stream] == ["", "slow"]
+    await racer.close()
@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+from typing import List, Tuple
+
+from simplemodelrouter.deadline import DeadlineExceeded
+from simplemodelrouter.scheduler import FairScheduler
+
+async def run(scheduler: FairScheduler, provider, requests: List[Tuple[str, str, str]]):
+    """Occupy the single slot, queue the requests, then let everything through."""
+    provider.gate.clear()
+    blocker = asyncio.ensure_future(scheduler.complete("blocker"))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.ensure_future(scheduler.complete(name, priority=priority, tenant=tenant))
+        for name, priority, tenant in requests
+    ]
+    await asyncio.sleep(0)
+    provider.gate.set()
+    await asyncio.gather(blocker, *tasks)
+    return provider.prompts[1:]
+
+@pytest.mark.asyncio
+async def test_priority_classes_served_first(fake_provider):
+    """Test interactive requests jump ahead of queued batch requests."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1)
+
+    order = await run(scheduler, fake_provider, [
+        ("b1", "batch", "backfill"),
+        ("b2", "batch", "backfill"),
+        ("i1", "interactive", "web"),
+    ])
+
+    assert order == ["i1", "b1", "b2"]
+    stats = scheduler.stats()
+    assert stats["batch"]["dispatched"] == 2
+    assert stats["batch"]["max_wait"] >= stats["interactive"]["max_wait"]
+
+@pytest.mark.asyncio
+async def test_weighted_fair_share_between_tenants(fake_provider):
+    """Test tenants in one class share slots in proportion to their weights."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1, tenant_weights={"a": 2.0})
+
+    order = await run(scheduler, fake_provider, [
+        *((f"a{i}", "batch", "a") for i in range(4)),
+        *((f"b{i}", "batch", "b") for i in range(2)),
+    ])
+
+    assert order == ["a0", "b0", "a1", "a2", "b1", "a3"]
+
+@pytest.mark.asyncio
+async def test_unknown_priority_class(fake_provider):
+    """Test requests for an unknown priority class are rejected."""
+    scheduler = FairScheduler(fake_provider)
+
+    with pytest.raises(ValueError):
+        await scheduler.complete("x", priority="urgent")
+
+@pytest.mark.asyncio
+async def test_deadline_expiring_in_queue(fake_provider):
+    """Test a request whose deadline expires while queued gives up its place."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1)
+    fake_provider.gate.clear()
+    blocker = asyncio.ensure_future(scheduler.complete("blocker"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(DeadlineExceeded):
+        await scheduler.complete("late", deadline=0.01)
+    assert scheduler.stats()["interactive"]["queued"] == 0
+
+    fake_provider.gate.set()
+    await blocker
+    assert scheduler.in_flight == 0
+    assert (await scheduler.complete("next")).text == "next"
+    assert fake_provider.prompts == ["blocker", "next"]
+
+@pytest.mark.asyncio
+async def test_streams_hold_their_slot(fake_provider):
+    """Test a stream occupies its slot until it is consumed."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1)
+
+    stream = await scheduler.complete("hi", stream=True)
+    waiting = asyncio.ensure_future(scheduler.complete("next"))
+    await asyncio.sleep(0)
+    assert fake_provider.prompts == ["hi"]
+
+    assert "".join([c.text async for c in stream]) == "hi"
+    assert (await waiting).text == "next"
+    assert scheduler.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_unstarted_streams_release_their_slot(fake_provider):
+    """Test a stream closed or dropped before it is iterated gives its slot back."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1)
+
+    stream = await scheduler.complete("closed", stream=True)
+    await stream.aclose()
+    await stream.aclose()
+    assert scheduler.in_flight == 0
+
+    stream = await scheduler.complete("dropped", stream=True)
+    del stream
+    assert scheduler.in_flight == 0
+    assert (await scheduler.complete("next")).text == "next"
+
+@pytest.mark.asyncio
+async def test_idle_tenants_are_forgotten(fake_provider):
+    """Test tenants whose finish tags virtual time has passed are pruned."""
+    scheduler = FairScheduler(fake_provider, max_concurrency=1)
+
+    await run(scheduler, fake_provider, [(f"t{i}", "batch", f"tenant-{i}") for i in range(5)])
+    await run(scheduler, fake_provider, [("late", "batch", "web")])
+    assert list(scheduler._classes["batch"].last_finish) == ["web"]
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+
+from simplemodelrouter.tee import ConsumerDetached, StreamTee
+
+class Source:
+    """Upstream yielding numbered items, recording whether it was closed."""
+
+    def __init__(self, count: int, error: Exception = None):
+        self.count = count
+        self.error = error
+        self.closed = False
+
+    async def stream(self):
+        try:
+            for i in range(self.count):
+                await asyncio.sleep(0)
+                yield i
+            if self.error:
+                raise self.error
+        finally:
+            self.closed = True
+
+async def read(consumer, limit=None):
+    items = []
+    async for item in consumer:
+        items.append(item)
+        if len(items) == limit:
+            break
+    return items
+
+@pytest.mark.asyncio
+async def test_every_consumer_sees_every_item():
+    """Test blocking consumers all receive the full stream in order."""
+    source = Source(20)
+    tee = StreamTee(source.stream(), buffer_size=4)
+    consumers = [tee.consumer() for _ in range(3)]
+
+    results = await asyncio.gather(*(read(c) for c in consumers))
+    assert results == [list(range(20))] * 3
+    assert source.closed
+
+@pytest.mark.asyncio
+async def test_blocking_consumer_bounds_the_buffer():
+    """Test a stalled blocking consumer holds the others at most buffer_size ahead."""
+    tee = StreamTee(Source(10).stream(), buffer_size=3)
+    fast, slow = tee.consumer(), tee.consumer()
+
+    fast_task = asyncio.ensure_future(read(fast))
+    await asyncio.sleep(0.05)
+    assert not fast_task.done()
+    assert len(tee._buffer) == 3
+
+    assert await read(slow) == list(range(10))
+    assert await fast_task == list(range(10))
+
+@pytest.mark.asyncio
+async def test_slow_sinks_drop_or_detach():
+    """Test drop and detach consumers never delay the user-facing consumer."""
+    tee = StreamTee(Source(10).stream(), buffer_size=2)
+    user = tee.consumer()
+    logger = tee.consumer(policy="drop")
+    moderation = tee.consumer(policy="detach")
+
+    assert await asyncio.wait_for(read(user), 1.0) == list(range(10))
+    assert await read(logger) == [8, 9]
+    assert logger.dropped == 8
+    assert moderation.detached
+    with pytest.raises(ConsumerDetached):
+        await read(moderation)
+
+    with pytest.raises(ValueError):
+        tee.consumer(policy="ignore")
+
+@pytest.mark.asyncio
+async def test_errors_and_closing():
+    """Test upstream errors reach every consumer and closing all consumers closes the upstream."""
+    tee = StreamTee(Source(2, error=ConnectionError("reset")).stream())
+    a, b = tee.consumer(), tee.consumer()
+    for consumer in (a, b):
+        with pytest.raises(ConnectionError):
+            await read(consumer)
+
+    source = Source(100)
+    tee = StreamTee(source.stream(), buffer_size=4)
+    a, b = tee.consumer(), tee.consumer(policy="drop")
+    assert await read(a, limit=3) == [0, 1, 2]
+    await a.aclose()
+    assert not source.closed
+    await b.aclose()
+    assert source.closed
@@ -0,0 +1,91 @@
+import pytest
+import httpx
+import json
+
+from simplemodelrouter import AnthropicProvider, Message
+from simplemodelrouter.conversation import encode_body
+from simplemodelrouter.templates import PromptTemplate
+
+SYSTEM = "You are a support agent for {{ACME}}. Answer in \"plain\" English."
+
+def make_template():
+    return PromptTemplate([
+        ("system", SYSTEM),
+        Message(role="user", content="Ticket #{ticket:05d} from {customer!r}:\n{body}"),
+        ("assistant", "Understood."),
+    ])
+
+def test_render_matches_format():
+    """Test rendered messages and their encodings match plain str.format."""
+    template = make_template()
+    values = {"ticket": 42, "customer": "Zoë", "body": 'It says "error" 😀'}
+    conversation = template.render(**values)
+
+    expected = [
+        {"role": "system", "content": SYSTEM.format()},
+        {"role": "user", "content": "Ticket #{ticket:05d} from {customer!r}:\n{body}".format(**values)},
+        {"role": "assistant", "content": "Understood."},
+    ]
+    assert [{"role": m.role, "content": m.content} for m in conversation] == expected
+    assert json.loads(encode_body({"messages": conversation}))["messages"] == expected
+    assert template.names == ["ticket", "customer", "body"]
+
+    # Static messages are encoded once and shared by every render
+    other = template.render(ticket=1, customer="Al", body="Hi")
+    assert other._encoded[0] is conversation._encoded[0]
+    assert other._encoded[2] is conversation._encoded[2]
+    assert conversation.cache_prefix == 1
+
+def test_cache_keys():
+    """Test cache keys depend on the template and the rendered values only."""
+    template = make_template()
+    key = template.cache_key(ticket=42, customer="Zoë", body="Hi")
+
+    assert template.cache_key(body="Hi", customer="Zoë", ticket=42) == key
+    assert make_template().cache_key(ticket=42, customer="Zoë", body="Hi") == key
+    assert template.cache_key(ticket=42, customer="Zoë", body="Hi!") != key
+
+    other = PromptTemplate([("system", SYSTEM), ("user", "{body}")])
+    assert other.prefix_hash == template.prefix_hash
+    assert other.cache_key(body="Hi") != key
+
+def test_invalid_templates():
+    """Test positional fields are rejected and missing values raise KeyError."""
+    with pytest.raises(ValueError):
+        PromptTemplate([("user", "Hello {}")])
+    with pytest.raises(KeyError):
+        make_template().render(ticket=1)
+
+@pytest.mark.asyncio
+async def test_anthropic_marks_stable_prefix():
+    """Test Anthropic requests carry a cache breakpoint at the end of the static prefix."""
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"model": "claude", "content": [{"text": "ok"}]})
+
+    provider = AnthropicProvider(api_key="key", transport=httpx.MockTransport(handler))
+    conversation = make_template().render(ticket=7, customer="Al", body="Hi")
+    await provider.chat(conversation)
+    await provider.chat([Message(role="user", content="Hi")])
+
+    marked, plain = bodies
+    assert marked["system"] == [
+        {"type": "text", "text": SYSTEM.format(), "cache_control": {"type": "ephemeral"}}
+    ]
+    assert marked["messages"] == [{"role": m.role, "content": m.content} for m in list(conversation)[1:]]
+    assert "system" not in plain
+    assert plain["messages"] == [{"role": "user", "content": "Hi"}]
+
+    # A stable prefix reaching past the system prompt marks its last message
+    few_shot = PromptTemplate([("system", "Be brief."), ("user", "2+2?"), ("assistant", "4"), ("user", "{q}")])
+    await provider.chat(few_shot.render(q="3+3?"))
+    assert bodies[-1]["system"] == [{"type": "text", "text": "Be brief."}]
+    assert bodies[-1]["messages"][:2] == [
+        {"role": "user", "content": "2+2?"},
+        {"role": "assistant", "content": [
+            {"type": "text", "text": "4", "cache_control": {"type": "ephemeral"}}
+        ]},
+    ]
+    await provider.close()
@@ -0,0 +1,76 @@
+import pytest
+import asyncio
+import httpx
+import json
+import sys
+
+from simplemodelrouter import OllamaProvider, Message
+
+LINES = [
+    b'{"message": {"role": "assistant", "content": "Hel"}, "done": false}\n',
+    b'{"message": {"role": "assistant", "content": "lo"}, "done": false}\n',
+    b'{"done": true}\n',
+]
+
+async def serve_ndjson(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal keep-alive HTTP/1.1 server streaming a chunked NDJSON reply."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(
+                int(line.split(b":")[1]) for line in head.lower().split(b"\r\n")
+                if line.startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: application/x-ndjson\r\ntransfer-encoding: chunked\r\n\r\n")
+            for line in LINES:
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+messages = [Message(role="user", content="Hi")]
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets")
+@pytest.mark.asyncio
+async def test_unix_domain_socket(tmp_path):
+    """Test a provider streams from a server listening on a Unix domain socket."""
+    path = str(tmp_path / "ollama.sock")
+    server = await asyncio.start_unix_server(serve_ndjson, path)
+    provider = OllamaProvider(uds=path)
+
+    for _ in range(2):
+        stream = await provider.chat(messages, stream=True)
+        assert "".join([c.message.content async for c in stream]) == "Hello"
+
+    await provider.close()
+    server.close()
+    await server.wait_closed()
+
+def test_transport_and_uds_are_exclusive():
+    """Test passing both a transport and a socket path is rejected."""
+    with pytest.raises(ValueError):
+        OllamaProvider(transport=httpx.MockTransport(lambda r: httpx.Response(200)), uds="/tmp/x.sock")
+
+@pytest.mark.asyncio
+async def test_asgi_transport():
+    """Test a provider can call an in-process ASGI app."""
+    async def app(scope, receive, send):
+        body = b""
+        while True:
+            event = await receive()
+            body += event.get("body", b"")
+            if not event.get("more_body"):
+                break
+        content = json.loads(body)["messages"][0]["content"]
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps(
+            {"message": {"role": "assistant", "content": content.upper()}}
+        ).encode()})
+
+    provider = OllamaProvider(transport=httpx.ASGITransport(app=app))
+    assert (await provider.chat(messages)).message.content == "HI"
+    await provider.close()
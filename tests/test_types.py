@@ -0,0 +1,44 @@
+import pytest
+import json
+
+from simplemodelrouter import base, types
+from simplemodelrouter.types import ChatResponse, Choice, Delta, Message, NormalizedRequest, Response
+
+def test_single_type_system():
+    """Test providers and normalizers share one set of slotted types."""
+    assert base.Message is types.Message
+    assert base.ChatResponse is types.ChatResponse
+    assert base.CompletionResponse is types.CompletionResponse
+
+    chunk = ChatResponse(message=Message(role="assistant", content="Hi"), model="m", usage={})
+    assert not hasattr(chunk, "__dict__")
+    with pytest.raises(AttributeError):
+        chunk.extra = 1
+
+def test_serialization_round_trip():
+    """Test to_dict and to_json round-trip through from_dict."""
+    chunk = ChatResponse(message=Message(role="assistant", content="Hé \"x\""), model="m", usage={"total_tokens": 3})
+    assert json.loads(chunk.to_json()) == chunk.to_dict()
+    assert ChatResponse.from_dict(chunk.to_dict()) == chunk
+
+    request = NormalizedRequest(messages=[Message(role="user", content="Hi")], model="m")
+    assert NormalizedRequest.from_dict(json.loads(request.to_json())) == request
+
+    response = Response(id="r1", choices=[Choice(delta=Delta(content="Hi"))], created=1, model="m")
+    assert json.loads(response.json()) == {
+        "id": "r1", "created": 1, "model": "m", "object": "chat.completion.chunk", "stream": False,
+        "choices": [{"index": 0, "delta": {"content": "Hi"}}],
+    }
+    assert Response.from_dict(response.to_dict()) == response
+    assert response.message.delta.content == "Hi"
+
+def test_validation_at_boundaries():
+    """Test from_dict rejects malformed data while constructors do not validate."""
+    with pytest.raises(TypeError, match="content"):
+        Message.from_dict({"role": "user"})
+    with pytest.raises(TypeError, match="usage"):
+        ChatResponse.from_dict({"message": {"role": "assistant", "content": ""}, "model": "m", "usage": {"x": "1"}})
+    with pytest.raises(TypeError, match="choices"):
+        Response.from_dict({"id": "r", "created": 1, "model": "m"})
+
+    assert Message(role="user", content=None).content is None
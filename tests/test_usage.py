@@ -0,0 +1,91 @@
+import pytest
+import httpx
+import json
+
+from simplemodelrouter import OllamaProvider, Message
+from simplemodelrouter.usage import MeteredProvider, QuotaExceeded, UsageLedger
+
+def ollama_handler(request: httpx.Request) -> httpx.Response:
+    """Mock Ollama answering with token counts, streamed or not."""
+    if json.loads(request.content)["stream"]:
+        body = (
+            b'{"message": {"role": "assistant", "content": "Hi"}, "done": false}\n'
+            b'{"message": {"role": "assistant", "content": ""}, "done": true, '
+            b'"prompt_eval_count": 7, "eval_count": 3}\n'
+        )
+        return httpx.Response(200, content=body)
+    return httpx.Response(200, json={
+        "message": {"role": "assistant", "content": "Hi"},
+        "prompt_eval_count": 10,
+        "eval_count": 5,
+    })
+
+def test_rollups(tmp_path):
+    """Test usage aggregates by tenant, provider and model and persists on flush."""
+    path = str(tmp_path / "usage.db")
+    ledger = UsageLedger(path)
+    ledger.record({"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}, "a", "openai", "gpt-4o")
+    ledger.record({"prompt_tokens": 1, "completion_tokens": 1}, "a", "anthropic", "claude")
+    ledger.record({"prompt_tokens": 2, "completion_tokens": 2, "total_tokens": 4}, "b", "openai", "gpt-4o")
+
+    assert ledger.flush() == 3
+    assert ledger.rollup() == [
+        {"tenant": "a", "requests": 2, "prompt_tokens": 11, "completion_tokens": 6, "total_tokens": 17},
+        {"tenant": "b", "requests": 1, "prompt_tokens": 2, "completion_tokens": 2, "total_tokens": 4},
+    ]
+    assert [r["total_tokens"] for r in UsageLedger(path).rollup(["provider", "model"])] == [2, 19]
+    assert UsageLedger(path).rollup([], tenant="b")[0]["requests"] == 1
+    with pytest.raises(ValueError):
+        ledger.rollup(["total_tokens; DROP TABLE usage"])
+
+def test_quota(tmp_path):
+    """Test quotas account for persisted and new usage."""
+    path = str(tmp_path / "usage.db")
+    ledger = UsageLedger(path)
+    ledger.record({"total_tokens": 60}, "a")
+    ledger.flush()
+
+    ledger = UsageLedger(path)
+    ledger.set_quota("a", 100)
+    assert ledger.remaining("a") == 40
+    ledger.check_quota("a")
+
+    ledger.record({"total_tokens": 40}, "a")
+    with pytest.raises(QuotaExceeded):
+        ledger.check_quota("a")
+    assert ledger.remaining("b") is None
+
+def test_quota_period_must_cover_whole_buckets(tmp_path):
+    """Test periods that would split a bucket are rejected and whole ones count the current bucket."""
+    ledger = UsageLedger(str(tmp_path / "usage.db"), bucket_seconds=60)
+    for period in (30, 90, 0):
+        with pytest.raises(ValueError):
+            ledger.set_quota("a", 100, period=period)
+
+    ledger.record({"total_tokens": 70}, "a")
+    ledger.flush()
+    ledger.set_quota("a", 100, period=120)
+    assert ledger.remaining("a") == 30
+
+@pytest.mark.asyncio
+async def test_metered_provider():
+    """Test metered calls record usage, including end-of-stream usage."""
+    ledger = UsageLedger()
+    provider = MeteredProvider(OllamaProvider(transport=httpx.MockTransport(ollama_handler)), ledger)
+    messages = [Message(role="user", content="Hello")]
+
+    await provider.chat(messages, tenant="web")
+    stream = await provider.chat(messages, stream=True, tenant="web")
+    assert "".join([c.message.content async for c in stream]) == "Hi"
+
+    [row] = ledger.rollup(["tenant", "provider", "model"])
+    assert row == {
+        "tenant": "web", "provider": "ollama", "model": "llama2",
+        "requests": 2, "prompt_tokens": 17, "completion_tokens": 8, "total_tokens": 25,
+    }
+
+    ledger.set_quota("web", 25)
+    with pytest.raises(QuotaExceeded):
+        await provider.chat(messages, tenant="web")
+    await provider.close()
+    await ledger.close()
@@ -0,0 +1,54 @@
+import pytest
+import asyncio
+import httpx
+
+from simplemodelrouter import AnthropicProvider, OllamaProvider, OpenAIProvider
+
+def recorder(paths, status=200):
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(status, json={})
+    return httpx.MockTransport(handler)
+
+@pytest.mark.asyncio
+async def test_warmup_hits_cheap_endpoints():
+    """Test warmup opens the requested connections plus one warm request."""
+    paths = []
+    providers = [
+        OpenAIProvider(api_key="key", transport=recorder(paths)),
+        AnthropicProvider(api_key="key", transport=recorder(paths, status=401)),
+        OllamaProvider(transport=recorder(paths)),
+    ]
+    reports = [await provider.warmup(connections=2) for provider in providers]
+
+    assert paths == ["/v1/models"] * 6 + ["/api/tags"] * 3
+    for report in reports:
+        assert report["connections"] == 2
+        assert report["errors"] == 0
+        assert report["cold"] >= 0 and report["warm"] >= 0
+    for provider in providers:
+        await provider.close()
+
+@pytest.mark.asyncio
+async def test_warmup_reports_connect_failures():
+    """Test unreachable endpoints are counted as errors rather than raised."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    provider = OllamaProvider(transport=httpx.MockTransport(handler))
+    assert await provider.warmup(connections=3) == {"connections": 0, "cold": None, "warm": None, "errors": 3}
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_keep_warm():
+    """Test keep-warm requests repeat until the provider is closed."""
+    paths = []
+    provider = OllamaProvider(transport=recorder(paths))
+    provider.start_keep_warm(interval=0.01)
+    await asyncio.sleep(0.05)
+    await provider.close()
+
+    sent = len(paths)
+    assert sent >= 4
+    await asyncio.sleep(0.03)
+    assert len(paths) == sent